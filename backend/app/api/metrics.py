@@ -0,0 +1,118 @@
+"""
+📈 Prometheus scrape endpoint
+
+GET /metrics (outside the /api/v1 prefix, where scrapers look by default)
+renders the process registry from app.core.metrics. The collectors below
+turn the stats() of existing components into gauges and counters at scrape
+time, so nothing extra is tracked on the request path.
+
+The endpoint is unauthenticated like /health; restrict it at the reverse
+proxy or set METRICS_ENABLED=false when it must not be reachable.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from ..core.executors import auth_executor, db_executor, inference_executor
+from ..core.http_cache import response_cache
+from ..core.metrics import CONTENT_TYPE, registry
+from ..database.allergen_database import database_manager
+from ..database.statistics import statistics_reconciler
+from ..database.write_behind import prediction_writer
+from ..models.inference.predictor import predictor
+from .v1.routes.auth import token_cache
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def _collect_executors():
+    pools = [executor.stats() for executor in (db_executor, inference_executor, auth_executor)]
+    yield ("allerscan_executor_in_flight", "gauge", "Jobs running or queued per executor",
+           [({"pool": pool["name"]}, pool["in_flight"]) for pool in pools])
+    yield ("allerscan_executor_max_workers", "gauge", "Worker threads per executor",
+           [({"pool": pool["name"]}, pool["max_workers"]) for pool in pools])
+
+
+def _collect_caches():
+    prediction = predictor.prediction_cache.stats()
+    yield ("allerscan_prediction_cache_entries", "gauge", "Cached prediction results",
+           [({}, prediction["size"])])
+    yield ("allerscan_prediction_cache_requests_total", "counter", "Prediction cache lookups by result",
+           [({"result": "hit"}, prediction["hits"]), ({"result": "miss"}, prediction["misses"])])
+    yield ("allerscan_prediction_cache_evictions_total", "counter", "Prediction cache LRU evictions",
+           [({}, prediction["evictions"])])
+
+    rendered = response_cache.stats()
+    yield ("allerscan_http_cache_responses_total", "counter", "Conditional GET answers by kind",
+           [({"result": "render"}, rendered["renders"]), ({"result": "hit"}, rendered["hits"]),
+            ({"result": "not_modified"}, rendered["not_modified"])])
+
+    tokens = token_cache.stats()
+    yield ("allerscan_token_cache_requests_total", "counter", "Verified-token cache lookups by result",
+           [({"result": "hit"}, tokens["hits"]), ({"result": "miss"}, tokens["misses"])])
+
+
+def _collect_write_behind():
+    writer = prediction_writer.stats()
+    yield ("allerscan_write_behind_queue_depth", "gauge", "Prediction records waiting to be inserted",
+           [({}, writer["queue_depth"])])
+    yield ("allerscan_write_behind_records_total", "counter", "Prediction records flushed by outcome",
+           [({"outcome": "saved"}, writer["flushed_records"]), ({"outcome": "failed"}, writer["failed_records"])])
+    yield ("allerscan_write_behind_backpressure_waits_total", "counter", "Enqueues that waited for a full queue",
+           [({}, writer["backpressure_waits"])])
+    yield ("allerscan_write_behind_retries_total", "counter", "Batch retries after transient DB errors",
+           [({}, writer["retries"])])
+    yield ("allerscan_write_behind_dead_lettered_total", "counter", "Failed records kept in the dead-letter file",
+           [({}, writer["dead_lettered"])])
+
+
+def _collect_statistics():
+    reconciler = statistics_reconciler.stats()
+    yield ("allerscan_stats_reconcile_runs_total", "counter", "Statistics rebuilds by outcome",
+           [({"outcome": "ok"}, reconciler["runs"] - reconciler["failures"] - reconciler["skipped"]),
+            ({"outcome": "skipped"}, reconciler["skipped"]),
+            ({"outcome": "failed"}, reconciler["failures"])])
+    yield ("allerscan_stats_reconcile_last_duration_seconds", "gauge", "Duration of the last statistics rebuild",
+           [({}, reconciler["last_duration_ms"] / 1000)])
+
+
+def _collect_db_pool():
+    pool = database_manager.engine.pool if database_manager.db_available else None
+    if pool is None or not hasattr(pool, "checkedout"):
+        return
+    yield ("allerscan_db_pool_checked_out", "gauge", "Connections currently checked out of the pool",
+           [({}, pool.checkedout())])
+    yield ("allerscan_db_pool_checked_in", "gauge", "Idle connections kept in the pool",
+           [({}, pool.checkedin())])
+    yield ("allerscan_db_pool_size", "gauge", "Configured pool size (without overflow)",
+           [({}, pool.size())])
+
+
+def _collect_model():
+    yield ("allerscan_model_loaded", "gauge", "1 when a model snapshot is active",
+           [({}, predictor.is_loaded)])
+    if predictor.is_loaded:
+        yield ("allerscan_model_info", "gauge", "Active model version and inference engine",
+               [({"version": predictor.model_version or "", "engine": predictor.active_engine}, 1)])
+
+
+for _collector in (
+    _collect_executors, _collect_caches, _collect_write_behind,
+    _collect_statistics, _collect_db_pool, _collect_model
+):
+    registry.add_collector(_collector)
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Request, per-stage prediction, model, database and cache metrics of this worker in the Prometheus text format",
+    response_class=Response
+)
+async def metrics():
+    """Render all metrics of this worker process"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+# Export
+__all__ = ["router"]
@@ -6,11 +6,15 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 import bcrypt
+import hashlib
 import jwt
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from ....core.config import settings
+from ....core.executors import run_auth
 from ....core.logger import api_logger
 
 # Create router
@@ -47,12 +51,68 @@ class LoginResponse(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
 
+class VerifiedTokenCache:
+    """
+    Tokens that already passed signature and expiry checks
+    
+    Keyed by SHA-256 of the token (the token itself is never stored) and
+    mapped to (username, exp). An entry is only trusted until the token's
+    own exp, so caching never extends a token's lifetime. Least recently
+    used entries are evicted beyond max_size. Only touched from the event
+    loop (async dependencies), so no lock is needed.
+    """
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+    
+    def get(self, token: str) -> Optional[str]:
+        """Username for a cached, unexpired token"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, token: str, username: str, expires_at: float) -> None:
+        if self.max_size <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (username, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+token_cache = VerifiedTokenCache(settings.token_cache_size)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 def authenticate_user(username: str, password: str) -> Optional[dict]:
-    """Authenticate user credentials"""
+    """Authenticate user credentials (bcrypt, blocking: call through run_auth)"""
     user = ADMIN_CREDENTIALS.get(username)
     if not user:
         return None
@@ -72,38 +132,44 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token"""
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        
-        if username is None:
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Verify JWT token (decoded once, then served from token_cache until exp)"""
+    token = credentials.credentials
+    username = token_cache.get(token)
+    
+    if username is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except jwt.PyJWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        username = payload.get("sub")
         
-        # Verify user still exists
-        if username not in ADMIN_CREDENTIALS:
+        if username is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
+                detail="Invalid authentication credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return ADMIN_CREDENTIALS[username]
-        
-    except jwt.PyJWTError:
+        # exp is always set by create_access_token; without it, do not cache
+        if payload.get("exp") is not None:
+            token_cache.put(token, username, float(payload["exp"]))
+    
+    # Verify user still exists
+    if username not in ADMIN_CREDENTIALS:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
+            detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    return ADMIN_CREDENTIALS[username]
 
-def require_admin(current_user: dict = Depends(verify_token)):
+async def require_admin(current_user: dict = Depends(verify_token)):
     """Require admin role"""
     if current_user.get("role") != "admin":
         raise HTTPException(
@@ -121,8 +187,8 @@ async def login(request: LoginRequest):
     Default credentials: username=admin, password=admin123
     """
     try:
-        # Authenticate user
-        user = authenticate_user(request.username, request.password)
+        # Authenticate user (bcrypt in the bounded auth executor, off the event loop)
+        user = await run_auth(authenticate_user, request.username, request.password)
         
         if not user:
             raise HTTPException(
@@ -196,4 +262,4 @@ async def get_current_user_info(current_user: dict = Depends(verify_token)):
     }
 
 # Export
-__all__ = ["router", "require_admin"]
+__all__ = ["router", "require_admin", "token_cache"]
@@ -18,18 +18,24 @@ Architecture:
 @updated 2025-08-09
 """
 
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+import asyncio
+
+import anyio
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
 from fastapi.responses import StreamingResponse
 from typing import List, Dict, Optional
 from pydantic import BaseModel
-import pandas as pd
-from io import BytesIO
-from datetime import datetime
-from pathlib import Path
+from datetime import date, datetime, time, timedelta
 
-TRAINING_DATA_PATH = Path(__file__).parents[5] / 'data' / 'raw' / 'Dataset Bahan Makanan & Alergen.xlsx'
 
 from ....database.allergen_database import database_manager
+from ....database.statistics import statistics_reconciler
+from ....database.export import (
+    EXCEL_MEDIA_TYPE, STREAM_MEDIA_TYPES, file_size, iter_file, iter_stream_export, write_excel_export
+)
+from ....core.config import settings
+from ....core.executors import run_db
+from ....core.http_cache import response_cache
 from ....core.logger import api_logger
 from ....schemas.request_schemas import ErrorResponse
 from .auth import require_admin
@@ -101,25 +107,30 @@ class StatisticsCalculator:
 async def get_prediction_history(
     page: int = Query(1, ge=1, description="Page number (1-based)"),
     limit: int = Query(10, ge=1, le=1000, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Continuation token (next_cursor/prev_cursor of a previous page); takes precedence over page"),
     include_stats: bool = Query(True, description="Include statistics in response")
 ):
     """
     Get paginated prediction history for dataset display
     
     Args:
-        page: Page number (1-based indexing)
+        page: Page number (1-based indexing), used when no cursor is given
         limit: Maximum items per page
+        cursor: Opaque keyset pagination token; constant cost at any depth
         include_stats: Whether to include summary statistics
     
     Returns:
         Paginated prediction records with optional statistics
     """
     try:
-        # Calculate offset for pagination
-        offset = (page - 1) * limit
+        # Calculate offset for pagination (ignored when a cursor is given)
+        offset = 0 if cursor else (page - 1) * limit
         
         # Get prediction records with pagination metadata
-        result = database_manager.get_prediction_history(limit=limit, offset=offset)
+        try:
+            result = await run_db(database_manager.get_prediction_history, limit=limit, offset=offset, cursor=cursor)
+        except ValueError as e:
+            raise DatasetResponseBuilder.error_response(str(e), 400)
         
         # Build response data with proper pagination
         response_data = {
@@ -132,14 +143,17 @@ async def get_prediction_history(
                 "has_more": result['pagination']['has_more'],
                 "has_previous": result['pagination']['has_previous'],
                 "showing_from": result['pagination']['showing_from'],
-                "showing_to": result['pagination']['showing_to']
+                "showing_to": result['pagination']['showing_to'],
+                "next_cursor": result['pagination']['next_cursor'],
+                "prev_cursor": result['pagination']['prev_cursor']
             }
         }
         
         # Add statistics if requested (based on CURRENT PAGE data for consistency)
         if include_stats:
             # Get global stats
-            global_stats = database_manager.get_statistics()
+            global_stats = await run_db(database_manager.get_statistics)
+            top_allergens = await run_db(database_manager.get_top_allergens, 6)
             
             # Calculate page-specific stats for consistency between table and chart
             page_records = result['records']
@@ -165,7 +179,7 @@ async def get_prediction_history(
                         {"name": "Terdeteksi Alergen", "count": global_stats['detected_count'], "color": "#EF4444"},
                         {"name": "Tidak Terdeteksi", "count": global_stats['not_detected_count'], "color": "#10B981"}
                     ],
-                    "allergens_distribution": database_manager.get_top_allergens(6)
+                    "allergens_distribution": top_allergens
                 },
                 "model_info": global_stats['model_info']
             }
@@ -178,9 +192,11 @@ async def get_prediction_history(
                 "page_average_confidence": round(page_avg_confidence * 100, 2)
             }
         
-        api_logger.info(f"📊 Served dataset page {page} with {len(result['records'])} records ({result['pagination']['showing_from']}-{result['pagination']['showing_to']} of {result['pagination']['total_items']})")
+        api_logger.info(f"📊 Served dataset page {result['pagination']['current_page']} with {len(result['records'])} records ({result['pagination']['showing_from']}-{result['pagination']['showing_to']} of {result['pagination']['total_items']})")
         return DatasetResponseBuilder.success_response(response_data, "Dataset retrieved successfully")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise DatasetResponseBuilder.error_response(f"Failed to retrieve dataset: {str(e)}")
 
@@ -189,213 +205,300 @@ async def get_prediction_history(
     summary="Get comprehensive dataset statistics",
     description="Get detailed statistics about prediction results for dashboard display"
 )
-async def get_dataset_statistics():
+async def get_dataset_statistics(request: Request):
     """
     Get comprehensive dataset statistics
     
+    Conditional GET: the ETag follows the history write counter in
+    prediction_stats, so polls between writes get a 304 or the cached body.
+    
     Returns:
         Detailed statistics including detection rates, confidence metrics, and charts data
     """
     try:
-        # Get basic statistics
-        stats = database_manager.get_statistics()
+        history = await run_db(database_manager.get_history_version)
+        version = history['write_count'] if history else None
+        last_modified = history['updated_at'] if history else None
+        
+        async def render():
+            # Get basic statistics
+            stats = await run_db(database_manager.get_statistics)
+            top_allergens = await run_db(database_manager.get_top_allergens, 6)
+            
+            # Build comprehensive response
+            response_data = {
+                "overview": {
+                    "total_predictions": stats['total_predictions'],
+                    "detection_rate": stats['detection_rate'],
+                    "average_confidence": stats['average_confidence'],
+                    "model_algorithm": stats['model_info']['algorithm']
+                },
+                "detection_breakdown": {
+                    "detected_count": stats['detected_count'],
+                    "not_detected_count": stats['not_detected_count'],
+                    "detection_percentage": stats['detection_rate']
+                },
+                "performance_metrics": {
+                    "average_processing_time": stats['average_processing_time'],
+                    "confidence_distribution": stats['average_confidence'],
+                    "risk_level_distribution": stats['risk_distribution']
+                },
+                "chart_data": {
+                    "detection_pie": [
+                        {"name": "Terdeteksi Alergen", "count": stats['detected_count'], "color": "#EF4444"},
+                        {"name": "Tidak Terdeteksi", "count": stats['not_detected_count'], "color": "#10B981"}
+                    ],
+                    "allergens_distribution": top_allergens,
+                    "risk_distribution": [
+                        {"level": level, "count": count} 
+                        for level, count in stats['risk_distribution'].items()
+                    ]
+                },
+                "model_info": stats['model_info'],
+                "last_updated": datetime.now().isoformat()
+            }
+            
+            api_logger.info("📈 Dataset statistics calculated and served")
+            return DatasetResponseBuilder.success_response(response_data, "Statistics retrieved successfully")
         
-        # Get recent predictions for trend analysis
-        recent_data = database_manager.get_prediction_history(limit=100)
-        recent_records = recent_data['records']  # Extract records from pagination structure
-        # trend_metrics = StatisticsCalculator.calculate_detection_metrics(recent_records)  # Skip for now
+        return await response_cache.respond(request, "dataset-statistics", version, render, last_modified)
         
-        # Build comprehensive response
+    except Exception as e:
+        raise DatasetResponseBuilder.error_response(f"Failed to calculate statistics: {str(e)}")
+
+@router.post(
+    "/statistics/reconcile",
+    summary="Rebuild statistics aggregates",
+    description="Recompute the running statistics aggregates from the full prediction history (admin only)"
+)
+async def reconcile_statistics(_admin: dict = Depends(require_admin)):
+    """
+    Rebuild the prediction_stats aggregate row and report any drift
+    
+    Returns:
+        Reconciliation result with corrected drift per aggregate
+    """
+    if not database_manager.db_available:
+        raise DatasetResponseBuilder.error_response("Database tidak tersedia", 503)
+    
+    try:
+        result = await statistics_reconciler.reconcile()
+        return DatasetResponseBuilder.success_response(result, "Statistics aggregates reconciled")
+    except Exception as e:
+        raise DatasetResponseBuilder.error_response(f"Failed to reconcile statistics: {str(e)}")
+
+@router.get(
+    "/allergens/top",
+    summary="Get most frequently detected allergens",
+    description="Top-N allergens across all predictions, counted from the prediction_allergens index"
+)
+async def get_top_allergens(limit: int = Query(10, ge=1, le=50, description="Number of allergens")):
+    """
+    Get the most frequently detected allergens
+    
+    Returns:
+        Allergen names with detection counts, most frequent first
+    """
+    try:
+        top_allergens = await run_db(database_manager.get_top_allergens, limit)
+        return DatasetResponseBuilder.success_response({"allergens": top_allergens}, "Top allergens retrieved successfully")
+    except Exception as e:
+        raise DatasetResponseBuilder.error_response(f"Failed to retrieve top allergens: {str(e)}")
+
+@router.get(
+    "/allergens/{allergen}/predictions",
+    summary="Get predictions containing an allergen",
+    description="Prediction records in which the given allergen was detected, newest first"
+)
+async def get_predictions_by_allergen(
+    allergen: str,
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page")
+):
+    """
+    Filter prediction history by detected allergen
+    
+    Returns:
+        Matching records with pagination metadata
+    """
+    try:
+        offset = (page - 1) * limit
+        result = await run_db(database_manager.get_predictions_by_allergen, allergen, limit, offset)
+        total = result['total_count']
         response_data = {
-            "overview": {
-                "total_predictions": stats['total_predictions'],
-                "detection_rate": stats['detection_rate'],
-                "average_confidence": stats['average_confidence'],
-                "model_algorithm": stats['model_info']['algorithm']
-            },
-            "detection_breakdown": {
-                "detected_count": stats['detected_count'],
-                "not_detected_count": stats['not_detected_count'],
-                "detection_percentage": stats['detection_rate']
-            },
-            "performance_metrics": {
-                "average_processing_time": stats['average_processing_time'],
-                "confidence_distribution": stats['average_confidence'],
-                "risk_level_distribution": stats['risk_distribution']
-            },
-            "chart_data": {
-                "detection_pie": [
-                    {"name": "Terdeteksi Alergen", "count": stats['detected_count'], "color": "#EF4444"},
-                    {"name": "Tidak Terdeteksi", "count": stats['not_detected_count'], "color": "#10B981"}
-                ],
-                "allergens_distribution": database_manager.get_top_allergens(6),
-                "risk_distribution": [
-                    {"level": level, "count": count} 
-                    for level, count in stats['risk_distribution'].items()
-                ]
-            },
-            "model_info": stats['model_info'],
-            "last_updated": datetime.now().isoformat()
+            "allergen": allergen,
+            "records": result['records'],
+            "pagination": {
+                "total_items": total,
+                "total_pages": (total + limit - 1) // limit,
+                "current_page": page,
+                "items_per_page": limit,
+                "has_more": offset + limit < total
+            }
         }
-        
-        api_logger.info("📈 Dataset statistics calculated and served")
-        return DatasetResponseBuilder.success_response(response_data, "Statistics retrieved successfully")
-        
+        return DatasetResponseBuilder.success_response(response_data, f"Predictions with {allergen} retrieved successfully")
     except Exception as e:
-        raise DatasetResponseBuilder.error_response(f"Failed to calculate statistics: {str(e)}")
+        raise DatasetResponseBuilder.error_response(f"Failed to retrieve predictions for allergen: {str(e)}")
+
+@router.get(
+    "/allergens/{allergen}/trend",
+    summary="Get daily detection trend for an allergen",
+    description="Number of predictions per day in which the allergen was detected"
+)
+async def get_allergen_trend(
+    allergen: str,
+    days: int = Query(30, ge=1, le=365, description="Number of days, including today")
+):
+    """
+    Daily detection counts for one allergen (days without detections are omitted)
+    """
+    try:
+        trend = await run_db(database_manager.get_allergen_trend, allergen, days)
+        return DatasetResponseBuilder.success_response(
+            {"allergen": allergen, "days": days, "trend": trend},
+            f"Trend for {allergen} retrieved successfully"
+        )
+    except Exception as e:
+        raise DatasetResponseBuilder.error_response(f"Failed to retrieve allergen trend: {str(e)}")
+
+async def _stream_from_executor(chunks, first: bytes):
+    """
+    Advance a blocking byte generator in the DB executor, one chunk per step
+
+    When the client disconnects, Starlette cancels this stream while a
+    next() may still run in the executor. The cleanup is shielded from that
+    cancellation: it waits for the pending step, then closes the generator,
+    which closes the server-side cursor and returns its connection to the pool.
+    """
+    pending = None
+    try:
+        yield first
+        while True:
+            # Shielded so a cancelled await leaves the step running and awaitable
+            pending = asyncio.ensure_future(run_db(next, chunks, None))
+            chunk = await asyncio.shield(pending)
+            pending = None
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        with anyio.CancelScope(shield=True):
+            if pending is not None:
+                await asyncio.wait([pending])
+            await run_db(chunks.close)
+
+@router.get(
+    "/export",
+    summary="Export dataset as CSV, NDJSON or Parquet",
+    description="Stream prediction history from a server-side cursor in an analytics format (admin only)"
+)
+async def export_dataset(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson or parquet"),
+    date_from: Optional[date] = Query(None, description="Only predictions on or after this date (YYYY-MM-DD)"),
+    date_to: Optional[date] = Query(None, description="Only predictions on or before this date (YYYY-MM-DD)"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum records to export (default: all)"),
+    _admin: dict = Depends(require_admin)
+):
+    """
+    Export prediction history for analytics pipelines
+    
+    Rows are encoded and sent chunk by chunk as the cursor produces them,
+    oldest first; nothing is materialized beyond one chunk.
+    
+    Returns:
+        Streaming file response
+    """
+    if date_from and date_to and date_from > date_to:
+        raise DatasetResponseBuilder.error_response("date_from must not be after date_to", 400)
+    
+    start = datetime.combine(date_from, time.min) if date_from else None
+    end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+    chunks = iter_stream_export(export_format, date_from=start, date_to=end, limit=limit)
+    
+    # The first chunk is produced before responding, so setup errors still get a status code
+    try:
+        first = await run_db(next, chunks, b"")
+    except ValueError as e:
+        raise DatasetResponseBuilder.error_response(str(e), 400)
+    except Exception as e:
+        api_logger.error(f"❌ Error starting {export_format} export: {e}")
+        raise DatasetResponseBuilder.error_response(f"Failed to export dataset: {str(e)}")
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"superboost_allerscan_dataset_{timestamp}.{export_format}"
+    api_logger.info(f"📤 Streaming {export_format} export (from={date_from}, to={date_to}, limit={limit or 'all'})")
+    
+    return StreamingResponse(
+        _stream_from_executor(chunks, first),
+        media_type=STREAM_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "no-cache, no-store, must-revalidate"
+        }
+    )
 
 @router.get(
     "/export/excel",
     summary="Export dataset as Excel file",
-    description="Export prediction history as Excel file for analysis (optimized for large datasets)"
+    description="Export prediction history as Excel file for analysis (streamed, memory stays flat for any size)"
 )
 async def export_dataset_excel(
-    limit: int = Query(1000, ge=1, le=10000, description="Maximum records to export"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum records to export (default: all)"),
     _admin: dict = Depends(require_admin)
 ):
     """
-    Export prediction dataset as Excel file with performance optimization
+    Export prediction dataset as Excel file
+    
+    Rows are read from the database in chunks into a write-only workbook
+    backed by a spooled temp file, which is then streamed to the client.
     
     Args:
-        limit: Maximum number of records to include
+        limit: Maximum number of records to include (None = whole history)
     
     Returns:
         Excel file as streaming response
     """
     try:
         # Add logging for monitoring
-        api_logger.info(f"📥 Starting Excel export for {limit} records...")
+        api_logger.info(f"📥 Starting Excel export for {limit or 'all'} records...")
         start_time = datetime.now()
         
-        # Get prediction records with better error handling
+        # Workbook generation reads the DB and writes disk, keep it off the event loop
         try:
-            data = database_manager.get_prediction_history(limit=limit)
-            records = data['records']  # Extract records from pagination structure
+            excel_file, exported = await run_db(write_excel_export, limit)
         except Exception as db_error:
-            api_logger.error(f"❌ Database error during export: {db_error}")
-            raise DatasetResponseBuilder.error_response("Database connection failed during export", 503)
+            api_logger.error(f"❌ Error generating Excel export: {db_error}")
+            raise DatasetResponseBuilder.error_response("Error generating Excel file", 500)
         
-        if not records:
+        if not exported:
+            excel_file.close()
             api_logger.warning("⚠️ No prediction data available for export")
             raise DatasetResponseBuilder.error_response("No prediction data available for export", 404)
         
-        api_logger.info(f"📊 Retrieved {len(records)} records for export")
-        
-        # Convert to DataFrame with format sesuai dataset dosen
-        try:
-            df = pd.DataFrame(records)
-        except Exception as df_error:
-            api_logger.error(f"❌ Error creating DataFrame: {df_error}")
-            raise DatasetResponseBuilder.error_response("Error processing data for export", 500)
-        
-        # Rename kolom agar sesuai format dataset dosen
-        df = df.rename(columns={
-            'product_name': 'Nama Produk Makanan',
-            'bahan_utama': 'Bahan Utama',
-            'pemanis': 'Pemanis',
-            'lemak_minyak': 'Lemak/Minyak',
-            'penyedap_rasa': 'Penyedap Rasa',
-            'keterangan': 'Keterangan',
-            'confidence_score': 'Tingkat Kepercayaan (%)',
-            'created_at': 'Tanggal Prediksi',
-        })
-
-        # Kolom Alergen: daftar alergen terdeteksi, atau "Tidak Ada"
-        def format_allergens(val):
-            if not val or str(val).strip().lower() in ('', 'nan', 'none', 'tidak terdeteksi'):
-                return 'Tidak Ada'
-            return str(val)
-
-        alergen_source = 'detected_allergens' if 'detected_allergens' in df.columns else 'predicted_allergens'
-        df['Alergen'] = df[alergen_source].apply(format_allergens) if alergen_source in df.columns else 'Tidak Ada'
-
-        # Kolom Prediksi: label sesuai CSV dosen
-        df['Prediksi'] = df.get('allergen_count', 0).apply(
-            lambda x: 'Mengandung Alergen' if (x or 0) > 0 else 'Tidak Mengandung Alergen'
-        )
-
-        # Konversi confidence ke persen
-        if 'Tingkat Kepercayaan (%)' in df.columns:
-            df['Tingkat Kepercayaan (%)'] = (df['Tingkat Kepercayaan (%)'] * 100).round(2)
-
-        # Urutan kolom: format dosen dulu, lalu info teknis
-        ordered_columns = [
-            'Nama Produk Makanan', 'Bahan Utama', 'Pemanis', 'Lemak/Minyak', 'Penyedap Rasa',
-            'Alergen', 'Prediksi', 'Keterangan',
-            'Tingkat Kepercayaan (%)', 'Tanggal Prediksi',
-        ]
-        available_columns = [col for col in ordered_columns if col in df.columns]
-        df = df[available_columns]
-        
-        # Create Excel file in memory with optimization for better performance
-        try:
-            excel_buffer = BytesIO()
-
-            # Use openpyxl for better performance with large datasets
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                # Main data sheet - Format sesuai Dataset Dosen
-                df.to_excel(writer, sheet_name='Dataset Prediksi Alergen', index=False)
-
-                # Training data sheet - 399 records dari dataset asli
-                if TRAINING_DATA_PATH.exists():
-                    try:
-                        training_df = pd.read_excel(TRAINING_DATA_PATH)
-                        training_df.to_excel(writer, sheet_name='Dataset Training (399 Data)', index=False)
-                        api_logger.info(f"✅ Training data ({len(training_df)} records) included in export")
-                    except Exception as te:
-                        api_logger.warning(f"⚠️ Could not load training data: {te}")
-
-                # Summary statistics sheet (optional, can be skipped for large exports)
-                if len(records) < 2000:  # Only add summary for smaller datasets
-                    stats = database_manager.get_statistics()
-                    summary_df = pd.DataFrame([
-                        ['Total Prediksi', stats['total_predictions']],
-                        ['Alergen Terdeteksi', stats['detected_count']],
-                        ['Tidak Terdeteksi', stats['not_detected_count']],
-                        ['Tingkat Deteksi (%)', stats['detection_rate']],
-                        ['Kepercayaan Rata-rata (%)', stats['average_confidence']],
-                        ['Algoritma Model', stats['model_info']['algorithm']],
-                        ['Jumlah Records Exported', len(records)],
-                        ['Tanggal Export', datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-                    ], columns=['Metrik', 'Nilai'])
-
-                    summary_df.to_excel(writer, sheet_name='Ringkasan Statistik', index=False)
-
-            excel_buffer.seek(0)
-            
-        except Exception as excel_error:
-            api_logger.error(f"❌ Error creating Excel file: {excel_error}")
-            raise DatasetResponseBuilder.error_response("Error generating Excel file", 500)
-        
         # Generate filename with timestamp - menggunakan nama yang jelas
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"superboost_allerscan_dataset_{timestamp}.xlsx"
+        size = file_size(excel_file)
         
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
-        api_logger.info(f"📥 Excel export completed: {len(records)} records in {processing_time:.2f}s")
-        
-        # Create a generator for streaming the Excel content (memory efficient)
-        def generate_excel():
-            excel_content = excel_buffer.getvalue()
-            # Stream in chunks for large files
-            chunk_size = 8192  # 8KB chunks
-            for i in range(0, len(excel_content), chunk_size):
-                yield excel_content[i:i+chunk_size]
+        api_logger.info(f"📥 Excel export completed: {exported} records, {size} bytes in {processing_time:.2f}s")
         
-        # Return as streaming response with proper headers
+        # The file is read chunk by chunk in the threadpool and closed (deleted) at the end
         return StreamingResponse(
-            generate_excel(),
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            iter_file(excel_file),
+            media_type=EXCEL_MEDIA_TYPE,
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Length": str(len(excel_buffer.getvalue())),
+                "Content-Length": str(size),
                 "Cache-Control": "no-cache, no-store, must-revalidate",
                 "Pragma": "no-cache",
                 "Expires": "0"
             }
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         api_logger.error(f"❌ Unexpected error during Excel export: {e}")
         raise DatasetResponseBuilder.error_response(f"Failed to export Excel file: {str(e)}")
@@ -416,16 +519,10 @@ async def delete_prediction(prediction_id: int, _admin: dict = Depends(require_a
         Success confirmation or error response
     """
     try:
-        # Check if record exists
-        existing_record = database_manager.get_prediction_by_id(prediction_id)
-        if not existing_record:
-            raise DatasetResponseBuilder.error_response(f"Prediction with ID {prediction_id} not found", 404)
-        
-        # Delete the record
-        success = database_manager.delete_prediction(prediction_id)
+        deleted = await run_db(database_manager.delete_prediction, prediction_id)
         
-        if not success:
-            raise DatasetResponseBuilder.error_response(f"Failed to delete prediction {prediction_id}", 500)
+        if not deleted:
+            raise DatasetResponseBuilder.error_response(f"Prediction with ID {prediction_id} not found", 404)
         
         api_logger.info(f"🗑️ Deleted prediction record ID: {prediction_id}")
         
@@ -461,22 +558,17 @@ async def bulk_delete_predictions(
         if not prediction_ids:
             raise DatasetResponseBuilder.error_response("No prediction IDs provided", 400)
         
-        if len(prediction_ids) > 100:  # Safety limit
-            raise DatasetResponseBuilder.error_response("Cannot delete more than 100 records at once", 400)
-        
-        deleted_count = 0
-        failed_ids = []
+        if len(prediction_ids) > settings.bulk_delete_max_ids:  # Safety limit
+            raise DatasetResponseBuilder.error_response(
+                f"Cannot delete more than {settings.bulk_delete_max_ids} records at once", 400
+            )
         
-        for pred_id in prediction_ids:
-            try:
-                success = database_manager.delete_prediction(pred_id)
-                if success:
-                    deleted_count += 1
-                else:
-                    failed_ids.append(pred_id)
-            except Exception as e:
-                api_logger.warning(f"Failed to delete prediction {pred_id}: {str(e)}")
-                failed_ids.append(pred_id)
+        # One transaction: chunked SELECT ... FOR UPDATE + DELETE ... IN
+        result = await run_db(
+            database_manager.delete_predictions, prediction_ids, settings.bulk_delete_chunk_size
+        )
+        deleted_count = len(result['deleted_ids'])
+        failed_ids = result['missing_ids']
         
         result_data = {
             "requested_count": len(prediction_ids),
@@ -489,7 +581,7 @@ async def bulk_delete_predictions(
         
         message = f"Deleted {deleted_count} of {len(prediction_ids)} records"
         if failed_ids:
-            message += f" ({len(failed_ids)} failed)"
+            message += f" ({len(failed_ids)} not found)"
         
         return DatasetResponseBuilder.success_response(result_data, message)
         
@@ -507,13 +599,13 @@ async def dataset_health_check():
     """Health check for dataset API"""
     try:
         # Test database connection
-        is_connected = database_manager.test_connection()
+        is_connected = await run_db(database_manager.test_connection)
         
         if not is_connected:
             raise DatasetResponseBuilder.error_response("Database connection failed", 503)
         
         # Get basic metrics for health status
-        stats = database_manager.get_statistics()
+        stats = await run_db(database_manager.get_statistics)
         
         health_data = {
             "database_status": "connected",
@@ -6,21 +6,130 @@ import time
 import pandas as pd
 from io import BytesIO
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status, Request
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Request, Depends
 from fastapi.responses import JSONResponse, StreamingResponse
 
 from ....schemas.request_schemas import (
     PredictionRequest, 
     PredictionResponse, 
+    BatchPredictionRequest,
+    BatchPredictionItemResult,
+    BatchPredictionResponse,
     ErrorResponse
 )
 from ....models.inference.predictor import predictor
-from ....core.logger import api_logger, log_prediction, log_error
+from ....core.config import settings
+from ....core.executors import run_db, run_inference
+from ....core.http_cache import response_cache
+from ....core.logger import api_logger, log_detail, log_prediction, log_error, sample_request_detail
+from ....core.metrics import PREDICTION_STAGE_SECONDS
 from ....database.allergen_database import database_manager
+from ....database.write_behind import prediction_writer
+from ....models.training.jobs import retrain_jobs, RetrainJobConflict, FINISHED_STATES
+from .auth import require_admin
 
 # Create router
 router = APIRouter(prefix="/predict", tags=["Prediction"])
 
+def _finalize_prediction(
+    request: PredictionRequest,
+    detected_allergens: list,
+    metadata: dict,
+    processing_time: float,
+    client_request: Request
+):
+    """
+    Apply OOV correction and risk scoring to raw predictor output
+    
+    Shared by the single and batch endpoints so both return and persist
+    identical results for the same input.
+    
+    Returns:
+        Tuple of (PredictionResponse, prediction_data for the database)
+    """
+    # Create ingredients string for display
+    ingredients_text = f"{request.bahan_utama}, {request.pemanis}, {request.lemak_minyak}, {request.penyedap_rasa}".strip(", ")
+    
+    overall_confidence = 0.5
+    calculated_risk_level = 'none'
+
+    has_allergens = len(detected_allergens) > 0
+
+    # Deteksi spesifik = hasil keyword matching (bukan label generik "Mengandung Alergen")
+    has_specific_allergens = has_allergens and any(
+        a.allergen != "Mengandung Alergen" for a in detected_allergens
+    )
+
+    # OOV check — hanya untuk mengoreksi deteksi GENERIK dari ML model
+    is_likely_oov = False
+    if 'oov_analysis' in metadata:
+        oov_rate = metadata['oov_analysis'].get('oov_rate', 0)
+        base_confidence = metadata['oov_analysis'].get('base_confidence', 0)
+        if oov_rate >= 90 and abs(base_confidence - 0.6056) < 0.001:
+            is_likely_oov = True
+            log_detail("⚠️ OOV terdeteksi ({:.0f}%), base_confidence={:.4f}", oov_rate, base_confidence)
+
+    if has_specific_allergens or (has_allergens and not is_likely_oov):
+        # Specific keyword detections selalu dipercaya
+        # Generic ML detection hanya dipercaya jika bukan OOV
+        overall_confidence = sum([a.confidence for a in detected_allergens]) / len(detected_allergens)
+
+        max_confidence = max([a.confidence for a in detected_allergens])
+        if max_confidence > 0.8 or len(detected_allergens) > 2:
+            calculated_risk_level = 'high'
+        elif max_confidence > 0.5 or len(detected_allergens) > 1:
+            calculated_risk_level = 'medium'
+        else:
+            calculated_risk_level = 'low'
+    else:
+        # Tidak ada alergen spesifik terdeteksi
+        if is_likely_oov:
+            log_detail("✅ OOV generic detection diabaikan — tidak ada keyword match")
+            detected_allergens = []
+            overall_confidence = 0.78
+        else:
+            overall_confidence = metadata['oov_analysis'].get('adjusted_confidence', 0.82) \
+                if metadata and 'oov_analysis' in metadata else 0.85
+        calculated_risk_level = 'none'
+    
+    # Update allergen display after potential override
+    allergen_display = "tidak terdeteksi" if len(detected_allergens) == 0 else ", ".join([a.allergen for a in detected_allergens])
+    
+    # Create response
+    response = PredictionResponse(
+        success=True,
+        detected_allergens=detected_allergens,
+        total_allergens_detected=len(detected_allergens),
+        processing_time_ms=processing_time,
+        model_version=metadata['model_version'],
+        confidence_threshold=request.confidence_threshold,
+        processed_text=ingredients_text,
+        input_length=len(ingredients_text),
+        overall_risk="",  # Will be auto-computed by validator
+        overall_confidence=overall_confidence  # 🔧 FIX: Send calculated confidence to frontend
+    )
+    
+    # Prepare prediction data for new database structure
+    prediction_data = {
+        'productName': request.nama_produk_makanan,
+        'bahan_utama': request.bahan_utama,
+        'pemanis': request.pemanis,
+        'lemak_minyak': request.lemak_minyak,
+        'penyedap_rasa': request.penyedap_rasa,
+        'ingredients': ingredients_text,
+        'allergens': allergen_display,
+        'allergen_count': len(detected_allergens),
+        'confidence': overall_confidence,  # Menggunakan perhitungan confidence yang konsisten dengan frontend
+        'risk_level': calculated_risk_level,  # Menggunakan perhitungan risk level yang konsisten dengan frontend
+        'processing_time_ms': processing_time,
+        'model_version': metadata.get('model_version', 'SVM+AdaBoost'),
+        'user_ip': client_request.client.host if client_request.client else '',
+        'user_agent': client_request.headers.get('user-agent', '')
+    }
+    
+    return response, prediction_data
+
 @router.post(
     "/",
     response_model=PredictionResponse,
@@ -52,6 +161,8 @@ async def predict_allergens(request: PredictionRequest, client_request: Request)
     Predict allergens from food ingredient data using SVM + AdaBoost
     """
     start_time = time.time()
+    # Per-stage detail lines only for a sampled share of requests
+    sample_request_detail()
     
     try:
         # Check if predictor is loaded
@@ -65,10 +176,11 @@ async def predict_allergens(request: PredictionRequest, client_request: Request)
         # Convert request to model input format
         model_input = request.to_model_input()
         
-        api_logger.info(f"Processing SVM + AdaBoost prediction for: {request.nama_produk_makanan}")
+        log_detail("Processing SVM + AdaBoost prediction for: {}", request.nama_produk_makanan)
         
         # Make prediction using form data
-        detected_allergens, metadata = predictor.predict_allergens(
+        detected_allergens, metadata = await run_inference(
+            predictor.predict_allergens,
             ingredients_data=model_input,
             confidence_threshold=request.confidence_threshold
         )
@@ -76,103 +188,39 @@ async def predict_allergens(request: PredictionRequest, client_request: Request)
         # Calculate processing time
         processing_time = (time.time() - start_time) * 1000  # Convert to milliseconds
         
-        # Create ingredients string for display
-        ingredients_text = f"{request.bahan_utama}, {request.pemanis}, {request.lemak_minyak}, {request.penyedap_rasa}".strip(", ")
-        
-        overall_confidence = 0.5
-        calculated_risk_level = 'none'
-
-        has_allergens = len(detected_allergens) > 0
-
-        # Deteksi spesifik = hasil keyword matching (bukan label generik "Mengandung Alergen")
-        has_specific_allergens = has_allergens and any(
-            a.allergen != "Mengandung Alergen" for a in detected_allergens
-        )
-
-        # OOV check — hanya untuk mengoreksi deteksi GENERIK dari ML model
-        is_likely_oov = False
-        if 'oov_analysis' in metadata:
-            oov_rate = metadata['oov_analysis'].get('oov_rate', 0)
-            base_confidence = metadata['oov_analysis'].get('base_confidence', 0)
-            if oov_rate >= 90 and abs(base_confidence - 0.6056) < 0.001:
-                is_likely_oov = True
-                api_logger.warning(f"⚠️ OOV terdeteksi ({oov_rate:.0f}%), base_confidence={base_confidence:.4f}")
-
-        if has_specific_allergens or (has_allergens and not is_likely_oov):
-            # Specific keyword detections selalu dipercaya
-            # Generic ML detection hanya dipercaya jika bukan OOV
-            overall_confidence = sum([a.confidence for a in detected_allergens]) / len(detected_allergens)
-
-            max_confidence = max([a.confidence for a in detected_allergens])
-            if max_confidence > 0.8 or len(detected_allergens) > 2:
-                calculated_risk_level = 'high'
-            elif max_confidence > 0.5 or len(detected_allergens) > 1:
-                calculated_risk_level = 'medium'
-            else:
-                calculated_risk_level = 'low'
-        else:
-            # Tidak ada alergen spesifik terdeteksi
-            if is_likely_oov:
-                api_logger.info("✅ OOV generic detection diabaikan — tidak ada keyword match")
-                detected_allergens = []
-                overall_confidence = 0.78
-            else:
-                overall_confidence = metadata['oov_analysis'].get('adjusted_confidence', 0.82) \
-                    if metadata and 'oov_analysis' in metadata else 0.85
-            calculated_risk_level = 'none'
-        
-        # Update allergen display after potential override
-        allergen_display = "tidak terdeteksi" if len(detected_allergens) == 0 else ", ".join([a.allergen for a in detected_allergens])
-        
-        # Create response
-        response = PredictionResponse(
-            success=True,
-            detected_allergens=detected_allergens,
-            total_allergens_detected=len(detected_allergens),
-            processing_time_ms=processing_time,
-            model_version=metadata['model_version'],
-            confidence_threshold=request.confidence_threshold,
-            processed_text=ingredients_text,
-            input_length=len(ingredients_text),
-            overall_risk="",  # Will be auto-computed by validator
-            overall_confidence=overall_confidence  # 🔧 FIX: Send calculated confidence to frontend
+        response, prediction_data = _finalize_prediction(
+            request, detected_allergens, metadata, processing_time, client_request
         )
         
-        # Save to database using the new clean database manager
+        # Queue for the write-behind buffer; the INSERT happens in a batch
+        # after the response, so MySQL latency is not part of the prediction
         try:
-            # Prepare prediction data for new database structure
-            prediction_data = {
-                'productName': request.nama_produk_makanan,
-                'bahan_utama': request.bahan_utama,
-                'pemanis': request.pemanis,
-                'lemak_minyak': request.lemak_minyak,
-                'penyedap_rasa': request.penyedap_rasa,
-                'ingredients': ingredients_text,
-                'allergens': allergen_display,
-                'allergen_count': len(detected_allergens),
-                'confidence': overall_confidence,  # Menggunakan perhitungan confidence yang konsisten dengan frontend
-                'risk_level': calculated_risk_level,  # Menggunakan perhitungan risk level yang konsisten dengan frontend
-                'processing_time_ms': processing_time,
-                'model_version': metadata.get('model_version', 'SVM+AdaBoost'),
-                'user_ip': client_request.client.host if client_request.client else '',
-                'user_agent': client_request.headers.get('user-agent', '')
-            }
-            
-            # Save using clean database manager
-            record_id = database_manager.save_prediction_result(prediction_data)
-            api_logger.info(f"✅ Prediction saved with clean architecture - Record ID: {record_id}")
+            with PREDICTION_STAGE_SECONDS.time(stage="db_persist"):
+                await prediction_writer.enqueue(prediction_data)
             
         except Exception as db_error:
-            api_logger.warning(f"Failed to save to database: {db_error}")
+            api_logger.warning(f"Failed to queue prediction for database: {db_error}")
         
-        # Log successful prediction
+        # One summary line per request; the stage details are in its fields
+        oov_analysis = metadata.get('oov_analysis', {})
         log_prediction(
-            input_text=ingredients_text,
-            predictions=detected_allergens,
-            processing_time=processing_time / 1000
+            input_text=response.processed_text,
+            predictions=response.detected_allergens,
+            processing_time=processing_time / 1000,
+            product=request.nama_produk_makanan,
+            allergens=[a.allergen for a in response.detected_allergens],
+            risk_level=prediction_data['risk_level'],
+            confidence=round(prediction_data['confidence'], 4),
+            prediction_label=metadata.get('prediction_label'),
+            oov_rate=oov_analysis.get('oov_rate'),
+            encoding_recognition_rate=oov_analysis.get('encoding_recognition_rate'),
+            inference_engine=metadata.get('inference_engine')
         )
         
-        return response
+        # Rendered here (same bytes as the response_model path) so the
+        # serialization stage is measured on its own
+        with PREDICTION_STAGE_SECONDS.time(stage="serialization"):
+            return JSONResponse(response.model_dump(mode="json", by_alias=True))
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -188,15 +236,125 @@ async def predict_allergens(request: PredictionRequest, client_request: Request)
             detail=f"Prediction failed: {str(e)}"
         )
 
+@router.post(
+    "/batch",
+    response_model=BatchPredictionResponse,
+    summary="Predict allergens for many products in one request",
+    description="""
+    Batch version of `POST /predict/` for ingest jobs and catalog rescans.
+    
+    All items are encoded into one matrix and scored with a single model call,
+    then persisted in one transaction (a single multi-row INSERT when the
+    server's auto-increment lock mode gives consecutive ids). Results are
+    returned in request order; an item that fails is reported with its error
+    instead of failing the whole batch.
+    """,
+    responses={
+        200: {"description": "Batch processed (check per-item success)"},
+        400: {"description": "Invalid input", "model": ErrorResponse},
+        500: {"description": "Internal server error", "model": ErrorResponse},
+    }
+)
+async def predict_allergens_batch(batch: BatchPredictionRequest, client_request: Request):
+    """
+    Predict allergens for a batch of food products using SVM + AdaBoost
+    """
+    start_time = time.time()
+    # Per-item stage details would be several lines per item: DEBUG only
+    sample_request_detail(0)
+    
+    try:
+        if not predictor.is_loaded:
+            api_logger.error("SVM + AdaBoost predictor not loaded")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="ML model not available. Please try again later."
+            )
+        
+        if len(batch.items) > settings.max_batch_size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Batch size {len(batch.items)} exceeds maximum of {settings.max_batch_size}"
+            )
+        
+        api_logger.info(f"Processing SVM + AdaBoost batch prediction for {len(batch.items)} items")
+        
+        outcomes = await run_inference(
+            predictor.predict_allergens_batch,
+            [item.to_model_input() for item in batch.items],
+            [item.confidence_threshold for item in batch.items]
+        )
+        
+        # Model cost is shared by the whole batch, so each item gets an equal share
+        per_item_time = (time.time() - start_time) * 1000 / len(batch.items)
+        
+        results = []
+        records_to_save = []
+        for index, (item, outcome) in enumerate(zip(batch.items, outcomes)):
+            if isinstance(outcome, Exception):
+                results.append(BatchPredictionItemResult(index=index, success=False, error=str(outcome)))
+                continue
+            
+            try:
+                detected_allergens, metadata = outcome
+                response, prediction_data = _finalize_prediction(
+                    item, detected_allergens, metadata, per_item_time, client_request
+                )
+                results.append(BatchPredictionItemResult(index=index, success=True, result=response))
+                records_to_save.append(prediction_data)
+            except Exception as item_error:
+                log_error(item_error, f"batch prediction item {index}")
+                results.append(BatchPredictionItemResult(index=index, success=False, error=str(item_error)))
+        
+        saved_records = 0
+        try:
+            saved_records = await run_db(database_manager.save_prediction_results, records_to_save)
+        except Exception as db_error:
+            api_logger.warning(f"Failed to save batch to database: {db_error}")
+        
+        successful_items = len(records_to_save)
+        processing_time = (time.time() - start_time) * 1000
+        api_logger.info(
+            f"Batch prediction completed | Items: {len(batch.items)} | "
+            f"Failed: {len(batch.items) - successful_items} | Processing time: {processing_time:.1f}ms"
+        )
+        
+        return BatchPredictionResponse(
+            success=True,
+            total_items=len(batch.items),
+            successful_items=successful_items,
+            failed_items=len(batch.items) - successful_items,
+            saved_records=saved_records,
+            processing_time_ms=processing_time,
+            results=results
+        )
+        
+    except HTTPException:
+        raise
+        
+    except Exception as e:
+        log_error(e, "batch prediction endpoint")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch prediction failed: {str(e)}"
+        )
+
+def _model_cache_version() -> tuple:
+    """Version token for responses that only change with the active model"""
+    return (predictor.model_fingerprint, predictor.model_version)
+
 @router.get(
     "/supported-allergens",
     summary="Get list of supported allergen types",
     description="Returns a list of all allergen types that the model can detect",
     response_model=dict
 )
-async def get_supported_allergens():
+async def get_supported_allergens(request: Request):
     """
     Get list of allergen types supported by the model
+    
+    Conditional GET: the ETag follows the model version, and the rendered
+    body is reused until the model changes.
     """
     try:
         if not predictor.is_loaded:
@@ -205,14 +363,16 @@ async def get_supported_allergens():
                 detail="ML model not available"
             )
         
-        allergens = predictor.get_supported_allergens()
+        async def render():
+            allergens = predictor.get_supported_allergens()
+            return {
+                "success": True,
+                "supported_allergens": allergens,
+                "total_count": len(allergens),
+                "model_info": predictor.get_model_info()
+            }
         
-        return {
-            "success": True,
-            "supported_allergens": allergens,
-            "total_count": len(allergens),
-            "model_info": predictor.get_model_info()
-        }
+        return await response_cache.respond(request, "supported-allergens", _model_cache_version(), render)
         
     except HTTPException:
         raise
@@ -230,17 +390,20 @@ async def get_supported_allergens():
     description="Returns detailed information about the loaded ML model",
     response_model=dict
 )
-async def get_model_info():
+async def get_model_info(request: Request):
     """
     Get information about the loaded ML model
+    
+    Conditional GET keyed on the model version, like supported-allergens.
     """
     try:
-        model_info = predictor.get_model_info()
+        async def render():
+            return {
+                "success": True,
+                "model_info": predictor.get_model_info()
+            }
         
-        return {
-            "success": True,
-            "model_info": model_info
-        }
+        return await response_cache.respond(request, "model-info", _model_cache_version(), render)
         
     except Exception as e:
         log_error(e, "model info endpoint")
@@ -249,6 +412,102 @@ async def get_model_info():
             detail=f"Failed to get model info: {str(e)}"
         )
 
+@router.get(
+    "/cache/stats",
+    summary="Get prediction cache statistics",
+    description="Returns hit/miss/eviction counters of the in-process prediction cache and rendered response cache (admin only)",
+    response_model=dict
+)
+async def get_prediction_cache_stats(_admin: dict = Depends(require_admin)):
+    """
+    Get prediction cache counters for this worker
+    """
+    return {
+        "success": True,
+        "model_fingerprint": predictor.model_fingerprint,
+        "cache": predictor.prediction_cache.stats(),
+        "http_cache": response_cache.stats()
+    }
+
+@router.delete(
+    "/cache",
+    summary="Clear prediction cache",
+    description="Drops all cached prediction results in this worker (admin only)",
+    response_model=dict
+)
+async def clear_prediction_cache(_admin: dict = Depends(require_admin)):
+    """
+    Clear the in-process prediction cache
+    """
+    predictor.prediction_cache.invalidate()
+    api_logger.info("🧹 Prediction cache cleared by admin")
+    return {
+        "success": True,
+        "message": "Prediction cache cleared",
+        "cache": predictor.prediction_cache.stats()
+    }
+
+@router.get(
+    "/write-queue/stats",
+    summary="Get prediction write-behind queue statistics",
+    description="Returns queue depth and flush latency of the prediction history write-behind buffer in this worker (admin only)",
+    response_model=dict
+)
+async def get_write_queue_stats(_admin: dict = Depends(require_admin)):
+    """
+    Get write-behind queue metrics for this worker
+    """
+    return {
+        "success": True,
+        "write_queue": prediction_writer.stats()
+    }
+
+@router.get(
+    "/lexicon",
+    summary="Get active allergen keyword lexicon",
+    description="Returns the version and allergens of the keyword lexicon compiled in this worker",
+    response_model=dict
+)
+async def get_allergen_lexicon():
+    """
+    Get information about the active allergen keyword lexicon
+    """
+    try:
+        return {
+            "success": True,
+            "lexicon": predictor.keyword_store.info()
+        }
+    except Exception as e:
+        log_error(e, "lexicon info endpoint")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get lexicon info: {str(e)}"
+        )
+
+@router.post(
+    "/lexicon/reload",
+    summary="Reload allergen keyword lexicon",
+    description="Recompiles the keyword lexicon from disk without restarting the worker (admin only). Other workers pick up file changes automatically.",
+    response_model=dict
+)
+async def reload_allergen_lexicon(_admin: dict = Depends(require_admin)):
+    """
+    Force a reload of the allergen keyword lexicon
+    """
+    reloaded = predictor.keyword_store.reload(force=True)
+    if not reloaded:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Lexicon reload failed, previous version is still active"
+        )
+    
+    api_logger.info("📖 Allergen lexicon reloaded by admin")
+    return {
+        "success": True,
+        "message": "Lexicon reloaded",
+        "lexicon": predictor.keyword_store.info()
+    }
+
 @router.get(
     "/dataset-results",
     summary="Get dataset with detection results",
@@ -261,8 +520,8 @@ async def get_dataset_results(limit: int = 100):
     """
     try:
         # Menggunakan database manager yang tepat untuk prediksi pengguna
-        results = database_manager.get_prediction_history(limit=limit)
-        stats = database_manager.get_statistics()
+        results = await run_db(database_manager.get_prediction_history, limit=limit)
+        stats = await run_db(database_manager.get_statistics)
         
         return {
             "success": True,
@@ -292,39 +551,148 @@ async def get_dataset_results(limit: int = 100):
         
 @router.post(
     "/retrain",
-    summary="Retrain model with original + new DB data",
-    description="Combines the 399 original training records with all saved predictions, then retrains SVM+AdaBoost.",
-    response_model=dict
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Start a background retrain with original + new DB data",
+    description="""
+    Combines the 399 original training records with all saved predictions and
+    retrains SVM+AdaBoost in a separate process (admin only).
+    
+    Returns immediately with a job; poll `GET /predict/retrain/jobs/{job_id}`
+    for stage and fold progress. Only one retrain runs at a time. Predictions
+    keep using the current model until the new one is saved and loaded.
+    """,
+    response_model=dict,
+    responses={409: {"description": "Another retrain job is still running", "model": ErrorResponse}}
 )
-async def retrain_model():
+async def retrain_model(_admin: dict = Depends(require_admin)):
     """
-    Retrain the SVM+AdaBoost model using original training data
-    combined with all prediction records stored in the database.
+    Submit a retrain job using original training data combined with all
+    prediction records stored in the database.
     """
     try:
         api_logger.info("🔄 Retrain request received")
 
-        # Get all prediction records from DB to use as additional training data
-        all_records_result = database_manager.get_prediction_history(limit=10000)
-        all_records = all_records_result.get('records', [])
-
-        api_logger.info(f"📊 Found {len(all_records)} DB records for retraining")
-
-        result = predictor.retrain_with_additional_data(all_records)
+        # Riwayat prediksi ditarik inkremental oleh proses retrain, bukan di sini
+        job = retrain_jobs.submit()
 
         return {
             "success": True,
-            "message": f"Model berhasil diretrain dengan {result['total_samples']} data",
-            "data": result
+            "message": "Retrain dimulai dengan data training asli + riwayat prediksi database",
+            "job": job
         }
 
+    except RetrainJobConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
     except Exception as e:
         log_error(e, "retrain endpoint")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Retrain gagal: {str(e)}"
+            detail=f"Retrain gagal dimulai: {str(e)}"
         )
 
+@router.get(
+    "/retrain/jobs",
+    summary="List recent retrain jobs",
+    description="Returns the active retrain job and recent finished jobs of all workers (admin only)",
+    response_model=dict
+)
+async def list_retrain_jobs(_admin: dict = Depends(require_admin)):
+    """
+    List retrain jobs, newest first
+    """
+    return {
+        "success": True,
+        "active_job": retrain_jobs.active_job(),
+        "jobs": retrain_jobs.list_jobs()
+    }
+
+@router.get(
+    "/retrain/jobs/{job_id}",
+    summary="Get retrain job status",
+    description="Returns status, stage and fold progress of a retrain job (admin only)",
+    response_model=dict
+)
+async def get_retrain_job(job_id: str, _admin: dict = Depends(require_admin)):
+    """
+    Get the status of a retrain job
+    """
+    job = retrain_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Retrain job {job_id} not found")
+    return {"success": True, "job": job}
+
+@router.post(
+    "/retrain/jobs/{job_id}/cancel",
+    summary="Cancel a running retrain job",
+    description="Requests cancellation of a retrain job; the current model stays active (admin only)",
+    response_model=dict
+)
+async def cancel_retrain_job(job_id: str, _admin: dict = Depends(require_admin)):
+    """
+    Cancel a retrain job
+    """
+    job = retrain_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Retrain job {job_id} not found")
+    if job["status"] in FINISHED_STATES:
+        return {"success": False, "message": f"Retrain job already {job['status']}", "job": job}
+    return {"success": True, "message": "Cancellation requested", "job": job}
+
+@router.get(
+    "/model/versions",
+    summary="List saved model versions",
+    description="Returns the model versions kept in the on-disk registry, newest first (admin only)",
+    response_model=dict
+)
+async def list_model_versions(_admin: dict = Depends(require_admin)):
+    """
+    List model versions in the registry
+    """
+    versions = await run_db(predictor.registry.list_versions)
+    return {
+        "success": True,
+        "current_version": predictor.registry.current_version(),
+        "loaded_version": predictor.model_version,
+        "versions": versions
+    }
+
+@router.post(
+    "/model/rollback",
+    summary="Roll back to a previous model version",
+    description="""
+    Publishes an older model version as the active one (admin only).
+    
+    Without `version` the version just before the active one is used. This
+    worker reloads immediately; other workers pick the change up within
+    `MODEL_WATCH_INTERVAL` seconds.
+    """,
+    response_model=dict,
+    responses={404: {"description": "Model version not found", "model": ErrorResponse}}
+)
+async def rollback_model(version: Optional[str] = None, _admin: dict = Depends(require_admin)):
+    """
+    Roll back the active model version
+    """
+    try:
+        target = await run_db(predictor.registry.rollback, version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    await run_inference(predictor.reload_if_changed, target)
+    if predictor.model_version != target:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Model version {target} was published but failed to load"
+        )
+
+    api_logger.info(f"⏪ Model rolled back to version {target} by admin")
+    return {
+        "success": True,
+        "message": f"Model version {target} is now active",
+        "model_version": target
+    }
+
 
 # Export
 __all__ = ["router"]
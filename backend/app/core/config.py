@@ -4,6 +4,7 @@
 
 import os
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -44,13 +45,46 @@ class Settings(BaseSettings):
     feature_names_path: str = str(model_dir / "feature_names.pkl")
     model_metadata_path: str = str(model_dir / "model_metadata.json")
     
+    # Model registry: versioned dirs under model_dir, CURRENT pointer watched by every worker
+    model_registry_keep: int = 5
+    model_watch_interval: float = 2.0
+    
+    # Memory-map model arrays on load so every worker shares one page-cache copy
+    model_mmap: bool = True
+    
+    # Training dataset (Excel); converted once to a columnar cache keyed on its content hash
+    training_dataset_path: Path = base_dir.parent.parent / "data" / "raw" / "Dataset Bahan Makanan & Alergen.xlsx"
+    training_dataset_cache_dir: Optional[Path] = None  # default: <dataset dir>/.cache
+    retrain_fetch_chunk_size: int = 5000  # rows per server-side cursor chunk
+    
+    # Allergen keyword lexicon (versioned JSON, hot-reloaded on mtime change)
+    allergen_lexicon_path: str = str(base_dir / "models" / "lexicon" / "allergen_lexicon.json")
+    lexicon_check_interval: float = 5.0
+    
     # Prediction Settings
     confidence_threshold: float = 0.3
     max_input_length: int = 1000
+    max_batch_size: int = 5000
+    
+    # Inference engine: "linear" (stacked weights, parity-checked) or "sklearn"
+    inference_engine: str = "linear"
+    
+    # In-process LRU cache for prediction results (0 disables)
+    prediction_cache_size: int = 10000
     
     # Logging
     log_level: str = "INFO"
     log_file: str = "logs/allergen_api.log"
+    log_format: str = "text"  # "text" or "json" (one JSON object per line)
+    # Sinks write from a background thread; loguru pickles each record
+    # through a queue, so enable it only for sinks that can block
+    log_enqueue: bool = False
+    log_diagnose: bool = False  # variable values in tracebacks (slow, may leak data)
+    # Share of requests whose per-stage detail lines are logged at INFO
+    # (others only at DEBUG); every request still gets one summary line
+    log_detail_sample_rate: float = 0.01
+    # Prometheus-format GET /metrics and per-request HTTP metrics
+    metrics_enabled: bool = True
     
     # Database Configuration
     mysql_host: str = os.getenv("MYSQL_HOST", "localhost")
@@ -74,6 +108,49 @@ class Settings(BaseSettings):
     database_max_overflow: int = 10
     database_pool_timeout: int = 30
     
+    # Executors for blocking work awaited from async routes
+    # (DB I/O and exports vs. CPU-bound model inference)
+    db_executor_workers: int = 8
+    db_executor_max_pending: int = 256
+    inference_executor_workers: int = 2
+    inference_executor_max_pending: int = 64
+    
+    # bcrypt checks on login: concurrent checks and queued logins beyond them
+    auth_executor_workers: int = 1
+    auth_executor_max_pending: int = 16
+    
+    # Verified JWTs kept per worker (each entry expires with its token)
+    token_cache_size: int = 256
+    
+    # Write-behind buffer for prediction history inserts
+    write_behind_batch_size: int = 200
+    write_behind_flush_interval: float = 1.0
+    write_behind_max_queue: int = 10000
+    # Retries of a batch after transient DB errors (backoff doubles from the
+    # first delay); records that still cannot be written go to the JSONL file
+    write_behind_max_retries: int = 3
+    write_behind_retry_backoff: float = 0.5
+    write_behind_dead_letter_file: str = "logs/prediction_dead_letter.jsonl"
+    
+    # Dataset export: rows per DB chunk and in-memory size before the
+    # spooled export file moves to disk
+    export_chunk_size: int = 1000
+    export_spool_max_bytes: int = 8 * 1024 * 1024
+    
+    # Bulk delete: IDs per request and per DELETE ... IN statement
+    bulk_delete_max_ids: int = 10000
+    bulk_delete_chunk_size: int = 1000
+    
+    # Full rebuild of the prediction_stats aggregate row (seconds, 0 = off)
+    stats_reconcile_interval: float = 3600.0
+    
+    # Training: worker processes for parallel CV folds + final fit (-1 = all cores)
+    training_n_jobs: int = -1
+    
+    # Background retrain jobs (separate process, one at a time)
+    retrain_cancel_grace: float = 10.0
+    retrain_job_history: int = 20
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,136 @@
+"""
+⚙️ Executors for blocking work called from async routes
+
+Routes are `async def`, so any synchronous call (sklearn scoring, MySQL round
+trips, Excel generation) would stall every other connection on the worker.
+Blocking work is sent to one of the dedicated thread pools instead:
+
+- db_executor: database I/O and file exports
+- inference_executor: model scoring, bounded so a prediction burst cannot
+  queue unlimited work
+- auth_executor: bcrypt password checks, kept small so a login burst
+  cannot take CPU or threads away from predictions
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+
+
+class BoundedExecutor:
+    """
+    Thread pool awaited from async code with a cap on queued jobs
+
+    At most max_workers jobs run at once and at most max_pending more wait
+    for a thread; further callers wait on the semaphore (back-pressure)
+    instead of growing the executor queue without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+    def start(self) -> None:
+        """Create the thread pool (called from the application lifespan)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=f"allerscan-{self.name}"
+            )
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_pending)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool, waiting for running jobs by default"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            self._slots = None
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable in the pool and await its result (in a copy of the caller's context)"""
+        if self._executor is None:
+            self.start()
+
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(context.run, func, *args, **kwargs)
+                )
+            finally:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Current pool usage for monitoring"""
+        return {
+            "name": self.name,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "running": self._executor is not None
+        }
+
+
+# Dedicated pools
+db_executor = BoundedExecutor(
+    "db", settings.db_executor_workers, settings.db_executor_max_pending
+)
+inference_executor = BoundedExecutor(
+    "inference", settings.inference_executor_workers, settings.inference_executor_max_pending
+)
+auth_executor = BoundedExecutor(
+    "auth", settings.auth_executor_workers, settings.auth_executor_max_pending
+)
+
+
+async def run_db(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking database / file I/O off the event loop"""
+    return await db_executor.run(func, *args, **kwargs)
+
+
+async def run_inference(func: Callable, *args, **kwargs) -> Any:
+    """Run CPU-bound model work off the event loop"""
+    return await inference_executor.run(func, *args, **kwargs)
+
+
+async def run_auth(func: Callable, *args, **kwargs) -> Any:
+    """Run password hashing / checking off the event loop"""
+    return await auth_executor.run(func, *args, **kwargs)
+
+
+def start_executors() -> None:
+    """Start all executors"""
+    db_executor.start()
+    inference_executor.start()
+    auth_executor.start()
+
+
+def shutdown_executors() -> None:
+    """Stop all executors, letting running jobs finish"""
+    auth_executor.shutdown()
+    inference_executor.shutdown()
+    db_executor.shutdown()
+
+
+# Export
+__all__ = [
+    "BoundedExecutor",
+    "auth_executor",
+    "db_executor",
+    "inference_executor",
+    "run_auth",
+    "run_db",
+    "run_inference",
+    "start_executors",
+    "shutdown_executors"
+]
@@ -0,0 +1,163 @@
+"""
+🏷️ HTTP conditional caching for polled read-only endpoints
+
+The frontend polls model-info, supported-allergens and dataset statistics,
+whose payloads only change when the model or the prediction history does.
+Each such route passes a cheap version token (model fingerprint, history
+write counter) to response_cache.respond():
+
+- ETag is derived from the version, so a client that sends If-None-Match
+  for the current version gets a 304 before anything is rendered
+- Last-Modified is only sent when the route passes a change time that
+  every worker agrees on (e.g. a database timestamp); model endpoints send
+  the ETag alone, since a per-worker render time would make
+  If-Modified-Since answer differently depending on the worker
+- Otherwise the JSON body rendered for that version is served from memory;
+  the render callback only runs when the version changes
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Browsers may keep the body but must revalidate on every poll
+CACHE_CONTROL = "no-cache"
+
+
+class _RenderedEntry(NamedTuple):
+    version: Hashable
+    etag: str
+    last_modified: Optional[datetime]
+    body: bytes
+
+
+class RenderedResponseCache:
+    """
+    Rendered JSON bodies keyed by endpoint, valid for one version each
+
+    Only the latest version per key is kept, so the cache holds one body
+    per endpoint. Entries are per worker process; the ETag depends only on
+    the version, so every worker answers a revalidation the same way.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _RenderedEntry] = {}
+        self._hits = 0
+        self._not_modified = 0
+        self._renders = 0
+
+    @staticmethod
+    def make_etag(key: str, version: Hashable) -> str:
+        digest = hashlib.sha256(f"{key}|{version}".encode("utf-8")).hexdigest()[:20]
+        # Weak: bodies carry render timestamps, equal only semantically
+        return f'W/"{digest}"'
+
+    @staticmethod
+    def _etag_matches(header: str, etag: str) -> bool:
+        """Weak comparison (RFC 9110) against an If-None-Match header"""
+        opaque = etag[2:] if etag.startswith("W/") else etag
+        for candidate in header.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+                return True
+        return False
+
+    @staticmethod
+    def _not_modified_since(header: str, last_modified: datetime) -> bool:
+        try:
+            since = parsedate_to_datetime(header)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    @staticmethod
+    def _headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        return headers
+
+    def _is_not_modified(self, request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+        # If-None-Match takes precedence; If-Modified-Since only without it
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return self._etag_matches(if_none_match, etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        return bool(if_modified_since) and last_modified is not None and \
+            self._not_modified_since(if_modified_since, last_modified)
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        version: Hashable,
+        render: Callable[[], Awaitable[Any]],
+        last_modified: Optional[datetime] = None
+    ) -> Response:
+        """
+        Answer a GET with 304, a cached body or a freshly rendered one
+
+        Args:
+            request: Incoming request (conditional headers are read from it)
+            key: Endpoint identifier
+            version: Token that changes whenever the rendered body would
+            render: Coroutine function returning the JSON-able payload
+            last_modified: Change time of the version, shared by all workers
+                (None: no Last-Modified header, ETag only)
+        """
+        etag = self.make_etag(key, version)
+        entry = self._entries.get(key)
+        if entry is not None and entry.version != version:
+            entry = None
+        if last_modified is not None:
+            # Naive database timestamps are local time; never advertise the future
+            last_modified = min(last_modified.astimezone(timezone.utc), datetime.now(timezone.utc))
+        if entry is not None:
+            last_modified = entry.last_modified
+
+        # The validator is known before rendering, so a 304 costs nothing
+        if self._is_not_modified(request, etag, last_modified):
+            self._not_modified += 1
+            return Response(status_code=304, headers=self._headers(etag, last_modified))
+
+        if entry is None:
+            content = jsonable_encoder(await render())
+            entry = _RenderedEntry(version, etag, last_modified, JSONResponse(content).body)
+            self._entries[key] = entry
+            self._renders += 1
+        else:
+            self._hits += 1
+        return Response(
+            content=entry.body, media_type="application/json",
+            headers=self._headers(entry.etag, entry.last_modified)
+        )
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one endpoint's body, or all of them"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "entries": len(self._entries),
+            "renders": self._renders,
+            "hits": self._hits,
+            "not_modified": self._not_modified
+        }
+
+
+# Shared instance for all routes
+response_cache = RenderedResponseCache()
+
+__all__ = ["CACHE_CONTROL", "RenderedResponseCache", "response_cache"]
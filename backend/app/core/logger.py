@@ -1,10 +1,25 @@
 """
 📝 Logging configuration for AllerScan API
+
+- settings.log_enqueue moves console/file I/O to loguru's background
+  writer; each record is pickled through a queue, which costs more than a
+  local write, so it is meant for sinks that can block (slow disks, piped
+  stderr) or for a preloaded gunicorn master writing the one rotating file
+- settings.log_format = "json" writes one JSON object per line, including
+  the fields bound to a record (e.g. the per-request prediction summary)
+- Per-stage detail lines (OOV analysis, engine, keyword matches) go through
+  log_detail(): INFO for a sampled share of requests, DEBUG otherwise, so a
+  prediction normally costs one summary line
 """
 
+import json
+import random
 import sys
-import os
+import traceback
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Optional
+
 from loguru import logger
 from .config import settings
 
@@ -31,34 +46,92 @@ file_format = (
     "{message}"
 )
 
+
+def json_format(record) -> str:
+    """Render a record as one compact JSON line (bound extras become fields)"""
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "message": record["message"],
+    }
+    payload.update({key: value for key, value in record["extra"].items() if key != "_json"})
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        payload["exception"] = "".join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+    record["extra"]["_json"] = json.dumps(payload, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+use_json = settings.log_format.lower() == "json"
+
 # Add console handler
 logger.add(
     sys.stderr,
-    format=console_format,
+    format=json_format if use_json else console_format,
     level=settings.log_level,
-    colorize=True,
-    backtrace=True,
-    diagnose=True,
+    colorize=not use_json,
+    enqueue=settings.log_enqueue,
+    backtrace=settings.log_diagnose,
+    diagnose=settings.log_diagnose,
 )
 
 # Add file handler
 logger.add(
     settings.log_file,
-    format=file_format,
+    format=json_format if use_json else file_format,
     level=settings.log_level,
     rotation="10 MB",
     retention="7 days",
     compression="zip",
-    backtrace=True,
-    diagnose=True,
+    enqueue=settings.log_enqueue,
+    backtrace=settings.log_diagnose,
+    diagnose=settings.log_diagnose,
 )
 
 # API specific logger
 api_logger = logger.bind(name="allergen_api")
 
-def log_prediction(input_text: str, predictions: list, processing_time: float):
-    """Log prediction details for monitoring"""
-    api_logger.info(
+# Whether the current request logs its per-stage detail lines at INFO.
+# Executors copy the context, so this also holds inside run_inference.
+_detail_sampled: ContextVar[bool] = ContextVar("log_detail_sampled", default=False)
+
+# depth=1: records point at the caller of log_detail, not at this module
+_detail_logger = api_logger.opt(depth=1)
+
+
+def sample_request_detail(rate: Optional[float] = None) -> bool:
+    """Decide once per request whether its detail lines are logged at INFO"""
+    rate = settings.log_detail_sample_rate if rate is None else rate
+    sampled = rate >= 1 or (rate > 0 and random.random() < rate)
+    _detail_sampled.set(sampled)
+    return sampled
+
+
+def log_detail(message: str, *args, **kwargs):
+    """
+    Per-stage detail line, formatted lazily with str.format(*args, **kwargs)
+
+    Unsampled requests log at DEBUG, which returns before any formatting
+    when the level is INFO.
+    """
+    if _detail_sampled.get():
+        _detail_logger.info(message, *args, **kwargs)
+    else:
+        _detail_logger.debug(message, *args, **kwargs)
+
+
+def log_prediction(input_text: str, predictions: list, processing_time: float, **fields):
+    """Log the one summary line of a prediction (fields are bound for JSON output)"""
+    api_logger.opt(depth=1).bind(
+        event="prediction",
+        input_length=len(input_text),
+        allergen_count=len(predictions),
+        processing_time_ms=round(processing_time * 1000, 2),
+        **fields
+    ).info(
         f"Prediction completed | "
         f"Input length: {len(input_text)} chars | "
         f"Allergens found: {len(predictions)} | "
@@ -81,4 +154,7 @@ def log_model_loaded():
     api_logger.info("✅ ML models loaded successfully")
 
 # Export
-__all__ = ["logger", "api_logger", "log_prediction", "log_error", "log_startup", "log_model_loaded"]
+__all__ = [
+    "logger", "api_logger", "json_format", "log_detail", "log_prediction", "log_error",
+    "log_startup", "log_model_loaded", "sample_request_detail"
+]
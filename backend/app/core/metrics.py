@@ -0,0 +1,352 @@
+"""
+📈 In-process metrics in the Prometheus text exposition format
+
+No client library or external service: counters, gauges and histograms live
+in this process and GET /metrics renders them (format 0.0.4), together with
+scrape-time collectors that read the existing stats() of executors, caches,
+the write-behind buffer and the reconciler.
+
+Metrics are per worker process. Under gunicorn every scrape is answered by
+one worker, so scrape workers individually or run a single worker when
+exact totals matter.
+
+Usage:
+    PREDICTION_STAGE_SECONDS.observe(0.002, stage="scoring")
+    with PREDICTION_STAGE_SECONDS.time(stage="encode"):
+        ...
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; covers sub-millisecond stages up to slow exports and retrains
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+# (labels, value) pairs of one metric family, as produced by collectors
+Sample = Tuple[Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def render_family(name: str, metric_type: str, documentation: str, samples: Iterable[Tuple[str, Dict[str, str], float]]) -> List[str]:
+    """HELP/TYPE header plus one line per (suffix, labels, value) sample"""
+    lines = [f"# HELP {name} {_escape(documentation)}", f"# TYPE {name} {metric_type}"]
+    lines.extend(
+        f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+        for suffix, labels, value in samples
+    )
+    return lines
+
+
+class _Metric:
+    """Named metric family with a fixed set of label names"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return render_family(self.name, self.metric_type, self.documentation,
+                             (("", self._labels(key), value) for key, value in values))
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return render_family(self.name, self.metric_type, self.documentation,
+                             (("", self._labels(key), value) for key, value in values))
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observed values"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last = +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        # First bucket whose upper bound is >= value (len(buckets) = +Inf)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall time of the with-block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return render_family(self.name, self.metric_type, self.documentation, samples)
+
+
+class MetricsRegistry:
+    """
+    Registered metric families plus scrape-time collectors
+
+    A collector returns (name, type, documentation, samples) tuples built
+    from state that already exists elsewhere (e.g. executor stats()), so it
+    costs nothing between scrapes. A failing collector is skipped.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception:
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines.extend(render_family(
+                    name, metric_type, documentation,
+                    (("", labels, value) for labels, value in samples)
+                ))
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+registry = MetricsRegistry()
+
+# HTTP layer (recorded by MetricsMiddleware)
+HTTP_REQUESTS = registry.counter(
+    "allerscan_http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "allerscan_http_request_duration_seconds", "HTTP request latency including the response body",
+    ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    "allerscan_http_requests_in_flight", "HTTP requests currently being served"
+)
+
+# Stages of a single /predict call
+PREDICTION_STAGE_SECONDS = registry.histogram(
+    "allerscan_prediction_stage_duration_seconds",
+    "Time per /predict stage (encode, oov_check, scoring, keyword_matching, db_persist, serialization)",
+    ("stage",)
+)
+
+# Model lifecycle
+MODEL_LOAD_SECONDS = registry.histogram(
+    "allerscan_model_load_duration_seconds", "Model load time by source (artifact, pickle, train)",
+    ("source",), DURATION_BUCKETS
+)
+RETRAIN_SECONDS = registry.histogram(
+    "allerscan_retrain_duration_seconds", "Background retrain job duration by final status",
+    ("status",), DURATION_BUCKETS
+)
+
+# Database
+DB_POOL_CHECKOUT_WAIT_SECONDS = registry.histogram(
+    "allerscan_db_pool_checkout_wait_seconds",
+    "Time to get a connection from the SQLAlchemy pool (queue wait plus new connects)"
+)
+WRITE_BEHIND_FLUSH_SECONDS = registry.histogram(
+    "allerscan_write_behind_flush_duration_seconds", "Batch INSERT time of the prediction write-behind buffer"
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording count, latency and in-flight requests
+
+    Requests are labelled with the route template (e.g. /api/v1/dataset/{id})
+    that FastAPI puts into the scope, so path parameters do not create new
+    series; unmatched paths share one "unmatched" label. Latency runs until
+    the last body chunk is sent, which includes streamed exports.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+
+
+# Export
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "DB_POOL_CHECKOUT_WAIT_SECONDS",
+    "DURATION_BUCKETS",
+    "Gauge",
+    "HTTP_IN_FLIGHT",
+    "HTTP_REQUESTS",
+    "HTTP_REQUEST_SECONDS",
+    "Histogram",
+    "LATENCY_BUCKETS",
+    "MODEL_LOAD_SECONDS",
+    "MetricsMiddleware",
+    "MetricsRegistry",
+    "PREDICTION_STAGE_SECONDS",
+    "RETRAIN_SECONDS",
+    "WRITE_BEHIND_FLUSH_SECONDS",
+    "registry",
+    "render_family"
+]
@@ -2,8 +2,11 @@
 # SINGLE MySQL Database Implementation
 
 from .allergen_database import database_manager, AllergenDatabaseManager
+from .write_behind import prediction_writer, PredictionWriteBehind
+from .statistics import statistics_reconciler, StatisticsReconciler
 
 # Main database instance (MySQL only)
 db = database_manager
 
-__all__ = ['db', 'database_manager', 'AllergenDatabaseManager']
+__all__ = ['db', 'database_manager', 'AllergenDatabaseManager', 'prediction_writer', 'PredictionWriteBehind',
+           'statistics_reconciler', 'StatisticsReconciler']
@@ -19,18 +19,36 @@ Architecture Principles:
 
 import os
 import json
-from typing import Dict, List, Optional
+import base64
+import time
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime
 
+import pandas as pd
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from ..core.config import settings
 from ..core.logger import api_logger
+from ..core.metrics import DB_POOL_CHECKOUT_WAIT_SECONDS
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - start)
+
 
 class AllergenDatabaseManager:
     """
@@ -52,6 +70,7 @@ class AllergenDatabaseManager:
         try:
             self._initialize_connection()
             self._create_tables()
+            self._load_autoinc_settings()
             self.db_available = True
         except Exception as e:
             api_logger.warning(f"⚠️ Database tidak tersedia, menggunakan mode fallback: {e}")
@@ -80,6 +99,7 @@ class AllergenDatabaseManager:
             # Create main engine with connection pooling
             self.engine = create_engine(
                 full_url,
+                poolclass=TimedQueuePool,
                 pool_size=10,
                 max_overflow=20,
                 pool_pre_ping=True,
@@ -161,8 +181,351 @@ class AllergenDatabaseManager:
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """))
             
+            # Running aggregates over dataset_results (single row, id = 1),
+            # kept in step with every insert/delete for O(1) dashboard stats
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS prediction_stats (
+                    id TINYINT PRIMARY KEY,
+                    total_count BIGINT NOT NULL DEFAULT 0,
+                    detected_count BIGINT NOT NULL DEFAULT 0,
+                    confidence_sum DECIMAL(20,4) NOT NULL DEFAULT 0,
+                    confidence_count BIGINT NOT NULL DEFAULT 0,
+                    processing_time_sum DECIMAL(24,2) NOT NULL DEFAULT 0,
+                    risk_none BIGINT NOT NULL DEFAULT 0,
+                    risk_low BIGINT NOT NULL DEFAULT 0,
+                    risk_medium BIGINT NOT NULL DEFAULT 0,
+                    risk_high BIGINT NOT NULL DEFAULT 0,
+                    write_count BIGINT NOT NULL DEFAULT 0,
+                    reconciled_at TIMESTAMP NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """))
+            if conn.execute(text(
+                "SHOW COLUMNS FROM prediction_stats LIKE 'write_count'"
+            )).fetchone() is None:
+                conn.execute(text(
+                    "ALTER TABLE prediction_stats ADD COLUMN write_count BIGINT NOT NULL DEFAULT 0 AFTER risk_high"
+                ))
+            seeded = conn.execute(text(
+                "INSERT IGNORE INTO prediction_stats (id) VALUES (1)"
+            )).rowcount
+            
+            # One row per (prediction, allergen) for indexed allergen analytics;
+            # created_at mirrors the parent row so trends need no join
+            allergens_exist = conn.execute(text(
+                "SHOW TABLES LIKE 'prediction_allergens'"
+            )).fetchone() is not None
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS prediction_allergens (
+                    prediction_id INT NOT NULL,
+                    allergen VARCHAR(100) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    
+                    PRIMARY KEY (prediction_id, allergen),
+                    INDEX idx_allergen_created (allergen, created_at),
+                    CONSTRAINT fk_prediction_allergens_prediction
+                        FOREIGN KEY (prediction_id) REFERENCES dataset_results (id)
+                        ON DELETE CASCADE
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """))
+            
             conn.commit()
             api_logger.info("✅ Database tables created/verified successfully")
+        
+        if seeded:
+            # First start with the aggregate table: build it from existing history
+            with self.engine.connect() as conn:
+                self._rebuild_statistics(conn)
+        
+        if not allergens_exist:
+            # First start with the child table: split existing history into it
+            self._backfill_prediction_allergens()
+    
+    RISK_LEVELS = ('none', 'low', 'medium', 'high')
+    
+    # Applies a signed delta to the running aggregates; executed on the same
+    # connection (transaction) as the INSERT/DELETE it accounts for
+    _STATS_DELTA_SQL = """
+        UPDATE prediction_stats SET
+            total_count = total_count + :total_count,
+            detected_count = detected_count + :detected_count,
+            confidence_sum = confidence_sum + :confidence_sum,
+            confidence_count = confidence_count + :confidence_count,
+            processing_time_sum = processing_time_sum + :processing_time_sum,
+            risk_none = risk_none + :risk_none,
+            risk_low = risk_low + :risk_low,
+            risk_medium = risk_medium + :risk_medium,
+            risk_high = risk_high + :risk_high,
+            write_count = write_count + 1
+        WHERE id = 1
+    """
+    
+    # write_count changes with every write the statistics depend on; it is
+    # the validator for HTTP conditional caching of /dataset/statistics
+    _BUMP_WRITE_COUNT_SQL = "UPDATE prediction_stats SET write_count = write_count + 1 WHERE id = 1"
+    
+    @classmethod
+    def _stats_delta(cls, rows: List[dict], sign: int = 1) -> dict:
+        """
+        Aggregate delta for rows being inserted (sign=1) or deleted (sign=-1)
+        
+        Values are rounded to the column precision (DECIMAL(5,4) confidence,
+        DECIMAL(8,2) processing time) so sums match what MySQL stores.
+        """
+        delta = {
+            'total_count': 0, 'detected_count': 0, 'confidence_sum': 0.0,
+            'confidence_count': 0, 'processing_time_sum': 0.0,
+            **{f'risk_{level}': 0 for level in cls.RISK_LEVELS}
+        }
+        for row in rows:
+            confidence = round(float(row.get('confidence_score') or 0), 4)
+            delta['total_count'] += 1
+            delta['detected_count'] += 1 if (row.get('allergen_count') or 0) > 0 else 0
+            if confidence > 0:
+                delta['confidence_sum'] += confidence
+                delta['confidence_count'] += 1
+            delta['processing_time_sum'] += round(float(row.get('processing_time_ms') or 0), 2)
+            if row.get('risk_level') in cls.RISK_LEVELS:
+                delta[f"risk_{row['risk_level']}"] += 1
+        return {key: value * sign for key, value in delta.items()}
+    
+    # Session-level named lock: only one process rebuilds the aggregates at a time
+    _RECONCILE_LOCK_SQL = "SELECT GET_LOCK('allerscan_reconcile', 0)"
+    _RECONCILE_UNLOCK_SQL = "SELECT RELEASE_LOCK('allerscan_reconcile')"
+    
+    # Stored aggregates next to the same aggregates recomputed from
+    # dataset_results, both from one consistent (non-locking) read
+    _STATS_SCAN_SQL = """
+        SELECT
+            s.total_count AS stored_total_count,
+            s.detected_count AS stored_detected_count,
+            s.confidence_sum AS stored_confidence_sum,
+            s.confidence_count AS stored_confidence_count,
+            s.processing_time_sum AS stored_processing_time_sum,
+            s.risk_none AS stored_risk_none,
+            s.risk_low AS stored_risk_low,
+            s.risk_medium AS stored_risk_medium,
+            s.risk_high AS stored_risk_high,
+            agg.*
+        FROM prediction_stats s
+        CROSS JOIN (
+            SELECT
+                COUNT(*) AS total_count,
+                COALESCE(SUM(allergen_count > 0), 0) AS detected_count,
+                COALESCE(SUM(CASE WHEN confidence_score > 0 THEN confidence_score ELSE 0 END), 0) AS confidence_sum,
+                COALESCE(SUM(confidence_score > 0), 0) AS confidence_count,
+                COALESCE(SUM(processing_time_ms), 0) AS processing_time_sum,
+                COALESCE(SUM(risk_level = 'none'), 0) AS risk_none,
+                COALESCE(SUM(risk_level = 'low'), 0) AS risk_low,
+                COALESCE(SUM(risk_level = 'medium'), 0) AS risk_medium,
+                COALESCE(SUM(risk_level = 'high'), 0) AS risk_high
+            FROM dataset_results
+        ) agg
+        WHERE s.id = 1
+    """
+    
+    STATS_COLUMNS = (
+        'total_count', 'detected_count', 'confidence_sum', 'confidence_count',
+        'processing_time_sum', 'risk_none', 'risk_low', 'risk_medium', 'risk_high'
+    )
+    
+    def reconcile_statistics(self, min_interval: Optional[float] = None) -> Dict:
+        """
+        Correct drift in the aggregate row from a full scan of dataset_results
+        
+        A MySQL named lock lets only one process rebuild at a time; the others
+        return without scanning. With min_interval, the rebuild is also skipped
+        when another process reconciled less than that many seconds ago, so
+        every worker can run the same timer and the table is scanned once.
+        
+        Args:
+            min_interval: Skip if the last reconciliation is younger (seconds)
+        
+        Returns:
+            Dictionary with the corrected drift, or reconciled=False when skipped
+        """
+        if not self.db_available:
+            return {'reconciled': False, 'message': 'Database tidak tersedia'}
+        
+        with self.engine.connect() as conn:
+            if not conn.execute(text(self._RECONCILE_LOCK_SQL)).scalar():
+                conn.rollback()
+                return {'reconciled': False, 'message': 'Reconciliation running in another process'}
+            try:
+                if min_interval:
+                    age = conn.execute(text(
+                        "SELECT TIMESTAMPDIFF(SECOND, reconciled_at, CURRENT_TIMESTAMP) "
+                        "FROM prediction_stats WHERE id = 1"
+                    )).scalar()
+                    if age is not None and age < min_interval:
+                        conn.rollback()
+                        return {'reconciled': False, 'message': f'Reconciled {age}s ago by another process'}
+                return self._rebuild_statistics(conn)
+            finally:
+                conn.rollback()
+                conn.execute(text(self._RECONCILE_UNLOCK_SQL))
+                conn.commit()
+    
+    def _rebuild_statistics(self, conn) -> Dict:
+        """
+        Apply the difference between dataset_results and the aggregate row
+        
+        The scan is a plain consistent read, so it locks no dataset_results
+        rows. Every insert/delete changes its rows and the aggregate row in
+        one transaction, so within that snapshot "recomputed - stored" is
+        exactly the drift. It is added as a delta; only the aggregate row is
+        locked, and only for that short UPDATE, so writers cannot deadlock
+        with the rebuild and changes committed after the snapshot are kept.
+        """
+        row = conn.execute(text(self._STATS_SCAN_SQL)).mappings().fetchone()
+        if row is None:
+            conn.rollback()
+            return {'reconciled': False, 'message': 'Statistics row missing'}
+        
+        drift = {
+            column: row[column] - row[f'stored_{column}']
+            for column in self.STATS_COLUMNS
+            if row[column] != row[f'stored_{column}']
+        }
+        if drift:
+            conn.execute(text(self._STATS_DELTA_SQL), {column: drift.get(column, 0) for column in self.STATS_COLUMNS})
+        # updated_at tracks history changes (Last-Modified); a check is not one
+        conn.execute(text(
+            "UPDATE prediction_stats SET reconciled_at = CURRENT_TIMESTAMP, updated_at = updated_at WHERE id = 1"
+        ))
+        conn.commit()
+        
+        if drift:
+            api_logger.warning(f"♻️ Statistics aggregates reconciled, drift corrected: {drift}")
+        else:
+            api_logger.info("♻️ Statistics aggregates reconciled, no drift")
+        
+        return {
+            'reconciled': True,
+            'drift': {key: float(value) for key, value in drift.items()},
+            'total_predictions': int(row['total_count'])
+        }
+    
+    # Child rows for the allergens of one prediction (duplicates are ignored)
+    _INSERT_ALLERGENS_SQL = """
+        INSERT IGNORE INTO prediction_allergens (prediction_id, allergen)
+        VALUES (:prediction_id, :allergen)
+    """
+    
+    # Value stored in predicted_allergens when nothing was detected
+    NO_ALLERGEN_TEXT = 'tidak terdeteksi'
+    
+    @classmethod
+    def _split_allergens(cls, allergen_count, predicted_allergens: Optional[str]) -> List[str]:
+        """Allergen names from the comma-separated predicted_allergens text"""
+        if not allergen_count or not predicted_allergens or predicted_allergens == cls.NO_ALLERGEN_TEXT:
+            return []
+        names = (name.strip()[:100] for name in predicted_allergens.split(','))
+        return list(dict.fromkeys(name for name in names if name))
+    
+    @classmethod
+    def _allergen_rows(cls, prediction_id: int, params: dict) -> List[dict]:
+        """prediction_allergens rows for one inserted prediction"""
+        return [
+            {'prediction_id': prediction_id, 'allergen': allergen}
+            for allergen in cls._split_allergens(params['allergen_count'], params['predicted_allergens'])
+        ]
+    
+    # Shared INSERT statement for prediction history rows
+    _INSERT_PREDICTION_SQL = """
+        INSERT INTO dataset_results 
+        (product_name, bahan_utama, pemanis, lemak_minyak, penyedap_rasa,
+         ingredients_input, predicted_allergens, allergen_count,
+         confidence_score, risk_level, processing_time_ms, model_version,
+         keterangan, user_ip, user_agent)
+        VALUES (:product_name, :bahan_utama, :pemanis, :lemak_minyak, :penyedap_rasa,
+                :ingredients_input, :predicted_allergens, :allergen_count, 
+                :confidence_score, :risk_level, :processing_time_ms, 
+                :model_version, :keterangan, :user_ip, :user_agent)
+    """
+    
+    # dataset_results columns written for a prediction, in _prediction_params order
+    _PREDICTION_COLUMNS = (
+        'product_name', 'bahan_utama', 'pemanis', 'lemak_minyak', 'penyedap_rasa',
+        'ingredients_input', 'predicted_allergens', 'allergen_count',
+        'confidence_score', 'risk_level', 'processing_time_ms', 'model_version',
+        'keterangan', 'user_ip', 'user_agent'
+    )
+    
+    # Server auto-increment settings, read at startup. Ids of a multi-row
+    # INSERT are derived only when the lock mode guarantees them consecutive.
+    _autoinc_step: int = 1
+    _consecutive_autoinc: bool = False
+    
+    def _load_autoinc_settings(self) -> None:
+        """
+        Read innodb_autoinc_lock_mode and auto_increment_increment
+        
+        Lock modes 0 (traditional) and 1 (consecutive) give the rows of one
+        multi-row INSERT consecutive ids. Mode 2 (interleaved, the MySQL 8
+        default) does not, so batch inserts then fall back to one INSERT per
+        row and read each lastrowid.
+        """
+        with self.engine.connect() as conn:
+            lock_mode, step = conn.execute(text(
+                "SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment"
+            )).one()
+        self._autoinc_step = int(step or 1)
+        self._consecutive_autoinc = lock_mode is not None and int(lock_mode) < 2
+        if not self._consecutive_autoinc:
+            api_logger.info(
+                f"ℹ️ innodb_autoinc_lock_mode={lock_mode}: batch inserts read the id of every row"
+            )
+    
+    def _insert_predictions(self, conn, params: List[dict]) -> List[int]:
+        """
+        Insert prediction rows and return their ids, in row order
+        
+        With a consecutive lock mode this is ONE multi-row INSERT, built here
+        instead of relying on executemany, which PyMySQL may split into
+        several statements. InnoDB reserves all its auto-increment values in
+        one allocation, so the rows get consecutive ids (spaced by
+        auto_increment_increment) starting at LAST_INSERT_ID(). Under the
+        interleaved mode those ids are not guaranteed, so every row gets its
+        own INSERT and its lastrowid, still inside the caller's transaction.
+        """
+        if not self._consecutive_autoinc:
+            return [
+                conn.execute(text(self._INSERT_PREDICTION_SQL), p).lastrowid
+                for p in params
+            ]
+        
+        placeholders = ", ".join(
+            "(" + ", ".join(f":{column}_{i}" for column in self._PREDICTION_COLUMNS) + ")"
+            for i in range(len(params))
+        )
+        values = {f"{column}_{i}": p[column] for i, p in enumerate(params) for column in self._PREDICTION_COLUMNS}
+        result = conn.execute(text(
+            f"INSERT INTO dataset_results ({', '.join(self._PREDICTION_COLUMNS)}) VALUES {placeholders}"
+        ), values)
+        first_id = result.lastrowid
+        return [first_id + i * self._autoinc_step for i in range(len(params))]
+    
+    @staticmethod
+    def _prediction_params(prediction_data: dict) -> dict:
+        """Map route-level prediction data to dataset_results column values"""
+        return {
+            'product_name': prediction_data.get('productName', ''),
+            'bahan_utama': prediction_data.get('bahan_utama', ''),
+            'pemanis': prediction_data.get('pemanis', 'Tidak Ada'),
+            'lemak_minyak': prediction_data.get('lemak_minyak', 'Tidak Ada'), 
+            'penyedap_rasa': prediction_data.get('penyedap_rasa', 'Tidak Ada'),
+            'ingredients_input': prediction_data.get('ingredients', ''),
+            'predicted_allergens': prediction_data.get('allergens', 'tidak terdeteksi'),
+            'allergen_count': prediction_data.get('allergen_count', 0),
+            'confidence_score': prediction_data.get('confidence', 0.0),
+            'risk_level': prediction_data.get('risk_level', 'none'),
+            'processing_time_ms': prediction_data.get('processing_time_ms', 0.0),
+            'model_version': prediction_data.get('model_version', 'SVM+AdaBoost'),
+            'keterangan': f"Form input: {prediction_data.get('productName', '')}",
+            'user_ip': prediction_data.get('user_ip', ''),
+            'user_agent': prediction_data.get('user_agent', '')
+        }
     
     def save_prediction_result(self, prediction_data: dict) -> int:
         """
@@ -179,37 +542,16 @@ class AllergenDatabaseManager:
             return 0
             
         try:
+            params = self._prediction_params(prediction_data)
             with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                    INSERT INTO dataset_results 
-                    (product_name, bahan_utama, pemanis, lemak_minyak, penyedap_rasa,
-                     ingredients_input, predicted_allergens, allergen_count,
-                     confidence_score, risk_level, processing_time_ms, model_version,
-                     keterangan, user_ip, user_agent)
-                    VALUES (:product_name, :bahan_utama, :pemanis, :lemak_minyak, :penyedap_rasa,
-                            :ingredients_input, :predicted_allergens, :allergen_count, 
-                            :confidence_score, :risk_level, :processing_time_ms, 
-                            :model_version, :keterangan, :user_ip, :user_agent)
-                """), {
-                    'product_name': prediction_data.get('productName', ''),
-                    'bahan_utama': prediction_data.get('bahan_utama', ''),
-                    'pemanis': prediction_data.get('pemanis', 'Tidak Ada'),
-                    'lemak_minyak': prediction_data.get('lemak_minyak', 'Tidak Ada'), 
-                    'penyedap_rasa': prediction_data.get('penyedap_rasa', 'Tidak Ada'),
-                    'ingredients_input': prediction_data.get('ingredients', ''),
-                    'predicted_allergens': prediction_data.get('allergens', 'tidak terdeteksi'),
-                    'allergen_count': prediction_data.get('allergen_count', 0),
-                    'confidence_score': prediction_data.get('confidence', 0.0),
-                    'risk_level': prediction_data.get('risk_level', 'none'),
-                    'processing_time_ms': prediction_data.get('processing_time_ms', 0.0),
-                    'model_version': prediction_data.get('model_version', 'SVM+AdaBoost'),
-                    'keterangan': f"Form input: {prediction_data.get('productName', '')}",
-                    'user_ip': prediction_data.get('user_ip', ''),
-                    'user_agent': prediction_data.get('user_agent', '')
-                })
+                result = conn.execute(text(self._INSERT_PREDICTION_SQL), params)
+                record_id = result.lastrowid
+                allergen_rows = self._allergen_rows(record_id, params)
+                if allergen_rows:
+                    conn.execute(text(self._INSERT_ALLERGENS_SQL), allergen_rows)
+                conn.execute(text(self._STATS_DELTA_SQL), self._stats_delta([params]))
                 
                 conn.commit()
-                record_id = result.lastrowid
                 api_logger.info(f"✅ Prediction saved to database with ID: {record_id}")
                 return record_id
                 
@@ -217,16 +559,146 @@ class AllergenDatabaseManager:
             api_logger.error(f"❌ Error saving prediction: {e}")
             return 0
     
-    def get_prediction_history(self, limit: int = 100, offset: int = 0) -> Dict:
+    def save_prediction_results(self, predictions: List[dict]) -> int:
+        """
+        Save many prediction results in one transaction
+        
+        One transaction per batch: the parent rows (one multi-row INSERT
+        when the server's auto-increment lock mode gives consecutive ids,
+        see _insert_predictions), one INSERT for all their
+        prediction_allergens rows and the aggregate delta.
+        
+        Args:
+            predictions: List of prediction data dictionaries
+            
+        Returns:
+            Number of saved records (0 if database unavailable)
+            
+        Raises:
+            Exception: Database errors, after the transaction is rolled back
+                (the write-behind buffer retries or splits the batch)
+        """
+        if not predictions:
+            return 0
+        
+        if not self.db_available:
+            api_logger.info("📝 Database tidak tersedia, skip saving batch predictions")
+            return 0
+        
+        try:
+            params = [self._prediction_params(p) for p in predictions]
+            with self.engine.connect() as conn:
+                record_ids = self._insert_predictions(conn, params)
+                allergen_rows = [
+                    row for record_id, p in zip(record_ids, params)
+                    for row in self._allergen_rows(record_id, p)
+                ]
+                if allergen_rows:
+                    conn.execute(text(self._INSERT_ALLERGENS_SQL), allergen_rows)
+                conn.execute(text(self._STATS_DELTA_SQL), self._stats_delta(params))
+                conn.commit()
+                api_logger.info(f"✅ Batch of {len(predictions)} predictions saved to database")
+                return len(predictions)
+                
+        except Exception as e:
+            api_logger.error(f"❌ Error saving batch predictions: {e}")
+            raise
+    
+    # Columns of a prediction history row, in the order _history_record reads them
+    _HISTORY_COLUMNS = """
+        id, product_name, bahan_utama, pemanis, lemak_minyak, penyedap_rasa,
+        ingredients_input, predicted_allergens, allergen_count,
+        confidence_score, risk_level, processing_time_ms, model_version,
+        keterangan, created_at
+    """
+    
+    @staticmethod
+    def _history_record(row, display_id: int) -> Dict:
+        """Map a dataset_results row (_HISTORY_COLUMNS) to the API record format"""
+        return {
+            'display_id': display_id,
+            'id': row[0], 
+            'product_name': row[1],  # nama produk
+            'nama_produk': row[1],   # alias untuk konsistensi
+            'bahan_utama': row[2],
+            'pemanis': row[3],
+            'lemak_minyak': row[4], 
+            'penyedap_rasa': row[5],
+            'ingredients': row[6],   # ingredients input
+            'ingredients_input': row[6],  # alias
+            'detected_allergens': row[7],  # predicted allergens
+            'predicted_allergens': row[7],  # alias
+            'allergen_count': row[8],
+            'confidence_score': float(row[9]) if row[9] else 0.0,
+            'risk_level': row[10],
+            'processing_time': float(row[11]) if row[11] else 0.0,
+            'model_version': row[12],
+            'keterangan': row[13],
+            'created_at': row[14].isoformat() if row[14] else None,
+            'detection_status': 'Terdeteksi' if row[8] > 0 else 'Tidak Terdeteksi'
+        }
+    
+    @staticmethod
+    def encode_cursor(created_at: datetime, record_id: int, position: int, direction: str) -> str:
+        """
+        Opaque continuation token for keyset pagination
+        
+        Args:
+            created_at: created_at of the boundary row
+            record_id: id of the boundary row
+            position: 0-based position of the boundary row in the history
+            direction: 'next' (rows after the boundary) or 'prev' (rows before it)
+        """
+        payload = json.dumps(
+            {'c': created_at.isoformat(), 'i': record_id, 'n': position, 'd': direction},
+            separators=(',', ':')
+        )
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(token: str) -> Dict:
+        """
+        Decode a continuation token from encode_cursor
+        
+        Raises:
+            ValueError: If the token is malformed
+        """
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            cursor = {
+                'created_at': datetime.fromisoformat(payload['c']),
+                'id': int(payload['i']),
+                'position': int(payload['n']),
+                'direction': payload['d']
+            }
+        except (ValueError, KeyError, TypeError, UnicodeError) as e:
+            raise ValueError(f"Invalid pagination cursor: {e}")
+        if cursor['direction'] not in ('next', 'prev') or cursor['position'] < 0:
+            raise ValueError("Invalid pagination cursor")
+        return cursor
+    
+    def get_prediction_history(self, limit: int = 100, offset: int = 0, cursor: Optional[str] = None) -> Dict:
         """
         Get paginated prediction history for dataset display with total count
         
+        Pages are read with keyset pagination on (created_at, id): the first
+        page and every page reached through a cursor token cost one index
+        range scan of `limit` rows, however deep the page is. A non-zero
+        offset without a cursor still works for old clients but scans the
+        skipped rows. The total comes from the prediction_stats aggregate
+        instead of COUNT(*).
+        
         Args:
             limit: Maximum number of records to retrieve
-            offset: Number of records to skip
+            offset: Number of records to skip (legacy page-number access)
+            cursor: Continuation token from a previous page's next_cursor/prev_cursor
             
         Returns:
             Dictionary with records list and pagination metadata
+            
+        Raises:
+            ValueError: If the cursor token is malformed
         """
         if not self.db_available:
             return {
@@ -234,67 +706,88 @@ class AllergenDatabaseManager:
                 'total_count': 0,
                 'message': 'Database tidak tersedia'
             }
+        
+        position = self.decode_cursor(cursor) if cursor else None
             
         try:
             with self.engine.connect() as conn:
-                # Get total count for pagination
-                total_count = conn.execute(text(
-                    "SELECT COUNT(*) FROM dataset_results"
-                )).scalar()
+                # Running total maintained with every insert/delete
+                total_count = int(conn.execute(text(
+                    "SELECT total_count FROM prediction_stats WHERE id = 1"
+                )).scalar() or 0)
                 
-                # Get paginated records
-                result = conn.execute(text("""
-                    SELECT 
-                        (ROW_NUMBER() OVER (ORDER BY created_at DESC) + :offset) as display_id,
-                        id, product_name, bahan_utama, pemanis, lemak_minyak, penyedap_rasa,
-                        ingredients_input, predicted_allergens, allergen_count, 
-                        confidence_score, risk_level, processing_time_ms, model_version, 
-                        keterangan, created_at
-                    FROM dataset_results 
-                    ORDER BY created_at DESC 
-                    LIMIT :limit OFFSET :offset
-                """), {'limit': limit, 'offset': offset})
-                
-                records = []
-                for row in result:
-                    records.append({
-                        'display_id': row[0],
-                        'id': row[1], 
-                        'product_name': row[2],  # nama produk
-                        'nama_produk': row[2],   # alias untuk konsistensi
-                        'bahan_utama': row[3],
-                        'pemanis': row[4],
-                        'lemak_minyak': row[5], 
-                        'penyedap_rasa': row[6],
-                        'ingredients': row[7],   # ingredients input
-                        'ingredients_input': row[7],  # alias
-                        'detected_allergens': row[8],  # predicted allergens
-                        'predicted_allergens': row[8],  # alias
-                        'allergen_count': row[9],
-                        'confidence_score': float(row[10]) if row[10] else 0.0,
-                        'risk_level': row[11],
-                        'processing_time': float(row[12]) if row[12] else 0.0,
-                        'model_version': row[13],
-                        'keterangan': row[14],
-                        'created_at': row[15].isoformat() if row[15] else None,
-                        'detection_status': 'Terdeteksi' if row[9] > 0 else 'Tidak Terdeteksi'
-                    })
+                # One extra row tells whether another page exists in the scan direction
+                params = {'limit': limit + 1}
+                if position is None:
+                    query = f"""
+                        SELECT {self._HISTORY_COLUMNS}
+                        FROM dataset_results
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT :limit OFFSET :offset
+                    """
+                    params['offset'] = offset
+                    start = offset
+                elif position['direction'] == 'next':
+                    query = f"""
+                        SELECT {self._HISTORY_COLUMNS}
+                        FROM dataset_results
+                        WHERE created_at < :created_at
+                           OR (created_at = :created_at AND id < :id)
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT :limit
+                    """
+                    params.update(created_at=position['created_at'], id=position['id'])
+                    start = position['position'] + 1
+                else:
+                    query = f"""
+                        SELECT {self._HISTORY_COLUMNS}
+                        FROM dataset_results
+                        WHERE created_at > :created_at
+                           OR (created_at = :created_at AND id > :id)
+                        ORDER BY created_at ASC, id ASC
+                        LIMIT :limit
+                    """
+                    params.update(created_at=position['created_at'], id=position['id'])
+                
+                rows = conn.execute(text(query), params).fetchall()
+                has_extra = len(rows) > limit
+                rows = rows[:limit]
+                
+                if position is not None and position['direction'] == 'prev':
+                    rows.reverse()
+                    start = max(position['position'] - len(rows), 0)
+                    has_more = True
+                    has_previous = has_extra
+                else:
+                    has_more = has_extra
+                    has_previous = start > 0
+                
+                records = [self._history_record(row, start + i + 1) for i, row in enumerate(rows)]
+                
+                next_cursor = prev_cursor = None
+                if rows and has_more:
+                    last = rows[-1]
+                    next_cursor = self.encode_cursor(last[14], last[0], start + len(rows) - 1, 'next')
+                if rows and has_previous:
+                    first = rows[0]
+                    prev_cursor = self.encode_cursor(first[14], first[0], start, 'prev')
                 
                 # Calculate pagination metadata
                 total_pages = (total_count + limit - 1) // limit  # Ceiling division
-                has_more = offset + limit < total_count
                 
                 pagination_data = {
                     'records': records,
                     'pagination': {
                         'total_items': total_count,
                         'total_pages': total_pages,
-                        'current_page': (offset // limit) + 1,
+                        'current_page': (start // limit) + 1,
                         'items_per_page': limit,
                         'has_more': has_more,
-                        'has_previous': offset > 0,
-                        'showing_from': offset + 1 if records else 0,
-                        'showing_to': offset + len(records)
+                        'has_previous': has_previous,
+                        'showing_from': start + 1 if records else 0,
+                        'showing_to': start + len(records),
+                        'next_cursor': next_cursor,
+                        'prev_cursor': prev_cursor
                     }
                 }
                 
@@ -309,6 +802,175 @@ class AllergenDatabaseManager:
                 'message': f'Database error: {e}'
             }
     
+    def iter_history_chunks(self, limit: Optional[int] = None, chunk_size: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Stream prediction history newest first as lists of row dicts
+        
+        Each chunk is one short keyset query on (created_at, id), so no
+        connection or cursor stays open between chunks and memory stays
+        bounded by one chunk however many rows are exported.
+        
+        Args:
+            limit: Maximum number of rows in total (None = all rows)
+            chunk_size: Rows per chunk
+            
+        Yields:
+            Lists of dicts keyed by the _HISTORY_COLUMNS names
+        """
+        if not self.db_available:
+            return
+        
+        remaining = limit
+        boundary = None
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            where = ""
+            params = {'limit': size}
+            if boundary is not None:
+                where = "WHERE created_at < :created_at OR (created_at = :created_at AND id < :id)"
+                params.update(created_at=boundary[0], id=boundary[1])
+            
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(f"""
+                    SELECT {self._HISTORY_COLUMNS}
+                    FROM dataset_results
+                    {where}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT :limit
+                """), params).mappings().fetchall()
+            if not rows:
+                return
+            
+            yield [dict(row) for row in rows]
+            boundary = (rows[-1]['created_at'], rows[-1]['id'])
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < size:
+                return
+    
+    def iter_export_rows(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        chunk_size: int = 1000
+    ) -> Iterator[List[Dict]]:
+        """
+        Stream prediction history oldest first through a server-side cursor
+        
+        One query is executed and rows are fetched chunk by chunk as the
+        consumer asks for them, so nothing is materialized beyond one chunk.
+        The connection stays checked out until the iterator is exhausted or
+        closed.
+        
+        Args:
+            date_from: Only rows created at or after this time
+            date_to: Only rows created before this time (exclusive)
+            limit: Maximum number of rows (None = all)
+            chunk_size: Rows fetched per round trip
+            
+        Yields:
+            Lists of dicts keyed by the _HISTORY_COLUMNS names
+        """
+        if not self.db_available:
+            return
+        
+        conditions = []
+        params = {}
+        if date_from is not None:
+            conditions.append("created_at >= :date_from")
+            params['date_from'] = date_from
+        if date_to is not None:
+            conditions.append("created_at < :date_to")
+            params['date_to'] = date_to
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT :limit"
+            params['limit'] = limit
+        
+        with self.engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_size) as conn:
+            result = conn.execute(text(f"""
+                SELECT {self._HISTORY_COLUMNS}
+                FROM dataset_results
+                {where}
+                ORDER BY created_at, id
+                {limit_clause}
+            """), params)
+            for rows in result.mappings().partitions(chunk_size):
+                yield [dict(row) for row in rows]
+    
+    # Columns needed to turn prediction history into training rows
+    TRAINING_COLUMNS = (
+        'id', 'product_name', 'bahan_utama', 'pemanis', 'lemak_minyak',
+        'penyedap_rasa', 'predicted_allergens', 'allergen_count'
+    )
+    
+    def iter_training_chunks(self, after_id: int = 0, chunk_size: int = 5000) -> Iterator[pd.DataFrame]:
+        """
+        Stream prediction rows added after a watermark id as DataFrame chunks
+        
+        Only the training columns are selected, in primary-key order, through
+        a server-side (unbuffered) cursor, so memory stays bounded by one chunk
+        regardless of table size.
+        
+        Args:
+            after_id: Return only rows with id greater than this watermark
+            chunk_size: Rows per DataFrame chunk
+            
+        Yields:
+            DataFrames with TRAINING_COLUMNS
+            
+        Raises:
+            Exception: Database errors are propagated so training never runs
+                on a silently truncated result
+        """
+        if not self.db_available:
+            return
+        
+        columns = ', '.join(self.TRAINING_COLUMNS)
+        with self.engine.connect().execution_options(stream_results=True, max_row_buffer=chunk_size) as conn:
+            result = conn.execute(text(f"""
+                SELECT {columns}
+                FROM dataset_results
+                WHERE id > :after_id
+                ORDER BY id
+            """), {'after_id': after_id})
+            for rows in result.partitions(chunk_size):
+                yield pd.DataFrame.from_records(rows, columns=list(self.TRAINING_COLUMNS))
+    
+    def count_predictions_upto(self, max_id: int) -> Optional[int]:
+        """
+        Count prediction rows with id <= max_id (primary-key range scan)
+        
+        Used to detect rows deleted below a training watermark.
+        
+        Returns:
+            Row count, or None if the database is unavailable
+        """
+        if not self.db_available:
+            return None
+        with self.engine.connect() as conn:
+            return conn.execute(
+                text("SELECT COUNT(*) FROM dataset_results WHERE id <= :max_id"),
+                {'max_id': max_id}
+            ).scalar()
+    
+    def get_history_version(self) -> Optional[Dict]:
+        """
+        History write counter and last change time (one primary-key lookup)
+        
+        Returns:
+            Dictionary with 'write_count' and 'updated_at', or None without a database
+        """
+        if not self.db_available:
+            return None
+        with self.engine.connect() as conn:
+            row = conn.execute(text(
+                "SELECT write_count, updated_at FROM prediction_stats WHERE id = 1"
+            )).mappings().fetchone()
+        return dict(row) if row else None
+    
     def get_statistics(self) -> Dict:
         """Get comprehensive statistics for dashboard with dynamic model accuracy"""
         if not self.db_available:
@@ -324,23 +986,19 @@ class AllergenDatabaseManager:
             
         try:
             with self.engine.connect() as conn:
-                # Basic counts
-                total_predictions = conn.execute(text(
-                    "SELECT COUNT(*) FROM dataset_results"
-                )).scalar()
+                # Running aggregates: one primary-key lookup instead of full scans
+                agg = conn.execute(text("""
+                    SELECT total_count, detected_count, confidence_sum, confidence_count,
+                           processing_time_sum, risk_none, risk_low, risk_medium, risk_high
+                    FROM prediction_stats WHERE id = 1
+                """)).mappings().fetchone()
                 
-                detected_count = conn.execute(text(
-                    "SELECT COUNT(*) FROM dataset_results WHERE allergen_count > 0"
-                )).scalar()
+                total_predictions = int(agg['total_count'])
+                detected_count = int(agg['detected_count'])
                 
                 # Average metrics
-                avg_confidence = conn.execute(text(
-                    "SELECT AVG(confidence_score) FROM dataset_results WHERE confidence_score > 0"
-                )).scalar() or 0.0
-                
-                avg_processing_time = conn.execute(text(
-                    "SELECT AVG(processing_time_ms) FROM dataset_results"
-                )).scalar() or 0.0
+                avg_confidence = agg['confidence_sum'] / agg['confidence_count'] if agg['confidence_count'] else 0.0
+                avg_processing_time = float(agg['processing_time_sum']) / total_predictions if total_predictions else 0.0
                 
                 # Get latest model performance from model_performance table
                 latest_model_accuracy = conn.execute(text("""
@@ -351,12 +1009,10 @@ class AllergenDatabaseManager:
                     LIMIT 1
                 """)).scalar()
                 
-                # Risk level distribution
-                risk_distribution = conn.execute(text("""
-                    SELECT risk_level, COUNT(*) as count
-                    FROM dataset_results 
-                    GROUP BY risk_level
-                """)).fetchall()
+                # Risk level distribution (only levels that occur)
+                risk_distribution = {
+                    level: int(agg[f'risk_{level}']) for level in self.RISK_LEVELS if agg[f'risk_{level}']
+                }
                 
                 # Format processing time untuk display
                 processing_time_display = f"<{int(avg_processing_time)}ms" if avg_processing_time < 1000 else f"{avg_processing_time/1000:.1f}s"
@@ -371,7 +1027,7 @@ class AllergenDatabaseManager:
                     'detection_rate': round((detected_count / total_predictions * 100), 2) if total_predictions > 0 else 0.0,
                     'average_confidence': round(float(avg_confidence) * 100, 2),
                     'average_processing_time': processing_time_display,
-                    'risk_distribution': {row[0]: row[1] for row in risk_distribution},
+                    'risk_distribution': risk_distribution,
                     'model_info': {
                         'algorithm': 'SVM + AdaBoost',
                         'accuracy': model_accuracy,  # Dynamic accuracy
@@ -405,6 +1061,8 @@ class AllergenDatabaseManager:
                     'test_samples': performance_data.get('test_samples', 0),
                     'feature_count': performance_data.get('feature_count', 0)
                 })
+                # Statistics include the latest model accuracy
+                conn.execute(text(self._BUMP_WRITE_COUNT_SQL))
                 
                 conn.commit()
                 record_id = result.lastrowid
@@ -417,35 +1075,138 @@ class AllergenDatabaseManager:
             raise
     
     def get_top_allergens(self, limit: int = 6) -> List[Dict]:
-        """Get top allergens from all predictions for chart display"""
+        """Get top allergens from all predictions for chart display (indexed GROUP BY)"""
         try:
             with self.engine.connect() as conn:
-                # Get all allergens from predictions
                 result = conn.execute(text("""
-                    SELECT predicted_allergens 
-                    FROM dataset_results 
-                    WHERE predicted_allergens IS NOT NULL 
-                    AND predicted_allergens != 'tidak terdeteksi'
-                    AND allergen_count > 0
-                """))
-                
-                allergen_count = {}
-                for row in result:
-                    if row[0]:
-                        # Split allergens and count each one
-                        allergens = [a.strip() for a in row[0].split(',') if a.strip()]
-                        for allergen in allergens:
-                            allergen_count[allergen] = allergen_count.get(allergen, 0) + 1
-                
-                # Sort by count and get top allergens
-                top_allergens = sorted(allergen_count.items(), key=lambda x: x[1], reverse=True)[:limit]
-                
-                return [{"name": name, "count": count} for name, count in top_allergens]
+                    SELECT allergen, COUNT(*) AS count
+                    FROM prediction_allergens
+                    GROUP BY allergen
+                    ORDER BY count DESC, allergen
+                    LIMIT :limit
+                """), {'limit': limit})
+                
+                return [{"name": row[0], "count": row[1]} for row in result]
                 
         except Exception as e:
             api_logger.error(f"❌ Error getting top allergens: {e}")
             return []
     
+    def get_predictions_by_allergen(self, allergen: str, limit: int = 100, offset: int = 0) -> Dict:
+        """
+        Get predictions in which a given allergen was detected, newest first
+        
+        Args:
+            allergen: Allergen name (case-insensitive collation)
+            limit: Maximum number of records to retrieve
+            offset: Number of records to skip
+            
+        Returns:
+            Dictionary with records and the total number of matching predictions
+        """
+        if not self.db_available:
+            return {'records': [], 'total_count': 0, 'message': 'Database tidak tersedia'}
+        
+        with self.engine.connect() as conn:
+            total_count = conn.execute(text(
+                "SELECT COUNT(*) FROM prediction_allergens WHERE allergen = :allergen"
+            ), {'allergen': allergen}).scalar()
+            
+            result = conn.execute(text("""
+                SELECT d.id, d.product_name, d.predicted_allergens, d.allergen_count,
+                       d.confidence_score, d.risk_level, d.created_at
+                FROM prediction_allergens pa
+                JOIN dataset_results d ON d.id = pa.prediction_id
+                WHERE pa.allergen = :allergen
+                ORDER BY pa.created_at DESC, pa.prediction_id DESC
+                LIMIT :limit OFFSET :offset
+            """), {'allergen': allergen, 'limit': limit, 'offset': offset})
+            
+            records = [{
+                'id': row[0],
+                'product_name': row[1],
+                'predicted_allergens': row[2],
+                'allergen_count': row[3],
+                'confidence_score': float(row[4]) if row[4] else 0.0,
+                'risk_level': row[5],
+                'created_at': row[6].isoformat() if row[6] else None
+            } for row in result]
+        
+        return {'allergen': allergen, 'records': records, 'total_count': total_count}
+    
+    def get_allergen_trend(self, allergen: str, days: int = 30) -> List[Dict]:
+        """
+        Daily detection counts for one allergen over the last `days` days
+        
+        Served from the (allergen, created_at) index without touching
+        dataset_results.
+        """
+        if not self.db_available:
+            return []
+        
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT DATE(created_at) AS day, COUNT(*) AS count
+                FROM prediction_allergens
+                WHERE allergen = :allergen
+                  AND created_at >= CURRENT_DATE - INTERVAL :days DAY
+                GROUP BY day
+                ORDER BY day
+            """), {'allergen': allergen, 'days': days - 1})
+            
+            return [{"date": row[0].isoformat(), "count": row[1]} for row in result]
+    
+    def backfill_prediction_allergens(self, chunk_size: int = 1000) -> int:
+        """
+        Fill prediction_allergens for history rows that have no child rows yet
+        
+        Idempotent and resumable: walks dataset_results in primary-key order
+        in chunks, one transaction per chunk.
+        
+        Returns:
+            Number of prediction rows backfilled
+        """
+        if not self.db_available:
+            return 0
+        return self._backfill_prediction_allergens(chunk_size)
+    
+    def _backfill_prediction_allergens(self, chunk_size: int = 1000) -> int:
+        backfilled = 0
+        after_id = 0
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT d.id, d.allergen_count, d.predicted_allergens, d.created_at
+                    FROM dataset_results d
+                    WHERE d.id > :after_id
+                      AND d.allergen_count > 0
+                      AND NOT EXISTS (
+                          SELECT 1 FROM prediction_allergens pa WHERE pa.prediction_id = d.id
+                      )
+                    ORDER BY d.id
+                    LIMIT :limit
+                """), {'after_id': after_id, 'limit': chunk_size}).fetchall()
+                if not rows:
+                    break
+                
+                allergen_rows = [
+                    {'prediction_id': row[0], 'allergen': allergen, 'created_at': row[3]}
+                    for row in rows
+                    for allergen in self._split_allergens(row[1], row[2])
+                ]
+                if allergen_rows:
+                    conn.execute(text("""
+                        INSERT IGNORE INTO prediction_allergens (prediction_id, allergen, created_at)
+                        VALUES (:prediction_id, :allergen, :created_at)
+                    """), allergen_rows)
+                conn.commit()
+            
+            backfilled += len(rows)
+            after_id = rows[-1][0]
+        
+        api_logger.info(f"🧩 prediction_allergens backfilled for {backfilled} predictions")
+        return backfilled
+    
     def get_prediction_by_id(self, prediction_id: int) -> Optional[Dict]:
         """
         Get a specific prediction record by ID
@@ -493,41 +1254,83 @@ class AllergenDatabaseManager:
             api_logger.error(f"❌ Error getting prediction by ID {prediction_id}: {e}")
             return None
     
+    # Locks the rows being deleted and reads the values the aggregates need
+    _DELETE_SELECT_SQL = text("""
+        SELECT id, allergen_count, confidence_score, risk_level, processing_time_ms
+        FROM dataset_results WHERE id IN :ids FOR UPDATE
+    """).bindparams(bindparam("ids", expanding=True))
+    _DELETE_SQL = text(
+        "DELETE FROM dataset_results WHERE id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True))
+    
+    def delete_predictions(self, prediction_ids: List[int], chunk_size: int = 1000) -> Dict:
+        """
+        Delete many prediction records in one transaction
+        
+        Per chunk of IDs: one SELECT ... FOR UPDATE (existing rows and their
+        aggregate values) and one DELETE ... WHERE id IN (...). The
+        prediction_stats delta is applied once for all deleted rows and
+        prediction_allergens rows go with the ON DELETE CASCADE. Either
+        every found row is deleted or nothing is.
+        
+        Args:
+            prediction_ids: IDs to delete (duplicates are ignored)
+            chunk_size: IDs per SELECT/DELETE statement
+            
+        Returns:
+            Dictionary with 'deleted_ids' and 'missing_ids' (requested IDs that did not exist)
+            
+        Raises:
+            Exception: Database errors, after the transaction is rolled back
+        """
+        requested = list(dict.fromkeys(int(prediction_id) for prediction_id in prediction_ids))
+        if not self.db_available:
+            api_logger.info("📝 Database tidak tersedia, skip deleting predictions")
+            return {'deleted_ids': [], 'missing_ids': requested}
+
+        deleted_rows = []
+
+        with self.engine.connect() as conn:
+            for start in range(0, len(requested), chunk_size):
+                chunk = requested[start:start + chunk_size]
+                rows = [dict(row) for row in conn.execute(self._DELETE_SELECT_SQL, {"ids": chunk}).mappings()]
+                if rows:
+                    conn.execute(self._DELETE_SQL, {"ids": [row['id'] for row in rows]})
+                    deleted_rows.extend(rows)
+            if deleted_rows:
+                conn.execute(text(self._STATS_DELTA_SQL), self._stats_delta(deleted_rows, sign=-1))
+            # Leaving the block without commit (on error) rolls everything back
+            conn.commit()
+        
+        deleted_ids = {row['id'] for row in deleted_rows}
+        missing_ids = [prediction_id for prediction_id in requested if prediction_id not in deleted_ids]
+        
+        api_logger.info(f"🗑️ Deleted {len(deleted_ids)} of {len(requested)} prediction records")
+        if missing_ids:
+            api_logger.warning(f"⚠️ {len(missing_ids)} prediction IDs not found for deletion")
+        
+        return {
+            'deleted_ids': [prediction_id for prediction_id in requested if prediction_id in deleted_ids],
+            'missing_ids': missing_ids
+        }
+    
     def delete_prediction(self, prediction_id: int) -> bool:
         """
         Delete a specific prediction record
         
+        The row lock taken for the aggregate delta doubles as the existence
+        check, so no separate lookup is needed.
+        
         Args:
             prediction_id: The ID of the prediction record to delete
             
         Returns:
-            True if deletion successful, False otherwise
+            True if the record was deleted, False if it does not exist
+            
+        Raises:
+            Exception: Database errors
         """
-        try:
-            with self.engine.connect() as conn:
-                # Check if record exists first (use dataset_results table)
-                check_query = "SELECT COUNT(*) as count FROM dataset_results WHERE id = :prediction_id"
-                count_result = conn.execute(text(check_query), {"prediction_id": prediction_id}).fetchone()
-                
-                if count_result.count == 0:
-                    api_logger.warning(f"⚠️ Prediction ID {prediction_id} not found for deletion")
-                    return False
-                
-                # Delete the record (use dataset_results table)
-                delete_query = "DELETE FROM dataset_results WHERE id = :prediction_id"
-                result = conn.execute(text(delete_query), {"prediction_id": prediction_id})
-                conn.commit()
-                
-                if result.rowcount > 0:
-                    api_logger.info(f"🗑️ Successfully deleted prediction ID: {prediction_id}")
-                    return True
-                else:
-                    api_logger.warning(f"⚠️ No rows affected when deleting prediction ID: {prediction_id}")
-                    return False
-                    
-        except Exception as e:
-            api_logger.error(f"❌ Error deleting prediction {prediction_id}: {e}")
-            return False
+        return bool(self.delete_predictions([prediction_id])['deleted_ids'])
     
     def test_connection(self) -> bool:
         """Test database connectivity"""
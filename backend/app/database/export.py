@@ -0,0 +1,339 @@
+"""
+📤 Streaming Dataset Export
+
+Prediction history is exported without ever holding the whole dataset or
+the whole file in memory:
+
+- Rows are read from MySQL in keyset chunks (database_manager.iter_history_chunks)
+- Each row is appended to an openpyxl write-only workbook, which keeps
+  worksheet XML in its own temp files instead of a cell tree in memory
+- The finished workbook is saved into a SpooledTemporaryFile that moves to
+  disk once it exceeds settings.export_spool_max_bytes
+- The route streams that file to the client in fixed-size chunks and the
+  file is deleted when the response finishes
+
+Analytics formats (CSV, NDJSON, Parquet) skip the workbook entirely: rows
+come from a server-side cursor (database_manager.iter_export_rows) and each
+chunk is encoded and sent as soon as it is fetched.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from tempfile import SpooledTemporaryFile
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from ..core.config import settings
+from ..core.logger import api_logger
+from ..models.training.dataset import training_dataset
+from .allergen_database import database_manager
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Sheet names and column order follow the lecturer's dataset format
+PREDICTION_SHEET = 'Dataset Prediksi Alergen'
+TRAINING_SHEET = 'Dataset Training (399 Data)'
+SUMMARY_SHEET = 'Ringkasan Statistik'
+EXPORT_COLUMNS = [
+    'Nama Produk Makanan', 'Bahan Utama', 'Pemanis', 'Lemak/Minyak', 'Penyedap Rasa',
+    'Alergen', 'Prediksi', 'Keterangan',
+    'Tingkat Kepercayaan (%)', 'Tanggal Prediksi',
+]
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def format_allergens(value) -> str:
+    """Allergen list for the Alergen column, or "Tidak Ada" when nothing was detected"""
+    if not value or str(value).strip().lower() in ('', 'nan', 'none', 'tidak terdeteksi'):
+        return 'Tidak Ada'
+    return str(value)
+
+
+def prediction_label(allergen_count) -> str:
+    """Prediksi column label matching the training dataset"""
+    return 'Mengandung Alergen' if (allergen_count or 0) > 0 else 'Tidak Mengandung Alergen'
+
+
+def export_row(record: Dict) -> List:
+    """Map one dataset_results row to the EXPORT_COLUMNS cell values"""
+    confidence = float(record['confidence_score']) if record['confidence_score'] else 0.0
+    created_at = record['created_at']
+    return [
+        record['product_name'],
+        record['bahan_utama'],
+        record['pemanis'],
+        record['lemak_minyak'],
+        record['penyedap_rasa'],
+        format_allergens(record['predicted_allergens']),
+        prediction_label(record['allergen_count']),
+        record['keterangan'],
+        round(confidence * 100, 2),
+        created_at.isoformat() if created_at else None,
+    ]
+
+
+def _cell(value):
+    """Excel has no NaN: write missing pandas values as empty cells"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def write_excel_export(
+    limit: Optional[int] = None,
+    include_training: bool = True,
+    include_summary: bool = True
+) -> Tuple[SpooledTemporaryFile, int]:
+    """
+    Build the Excel export into a spooled temp file (blocking, run in the DB executor)
+
+    Args:
+        limit: Maximum prediction rows (None = whole history)
+        include_training: Add the training dataset sheet
+        include_summary: Add the summary statistics sheet
+
+    Returns:
+        Tuple (file positioned at 0, number of prediction rows exported).
+        The caller owns the file and must close it.
+    """
+    workbook = Workbook(write_only=True)
+
+    sheet = workbook.create_sheet(PREDICTION_SHEET)
+    sheet.append(EXPORT_COLUMNS)
+    exported = 0
+    for chunk in database_manager.iter_history_chunks(limit=limit, chunk_size=settings.export_chunk_size):
+        for record in chunk:
+            sheet.append(export_row(record))
+        exported += len(chunk)
+
+    if include_training and training_dataset.exists():
+        try:
+            training_df = training_dataset.load()
+            training_sheet = workbook.create_sheet(TRAINING_SHEET)
+            training_sheet.append([str(column) for column in training_df.columns])
+            for values in training_df.itertuples(index=False, name=None):
+                training_sheet.append([_cell(value) for value in values])
+            api_logger.info(f"✅ Training data ({len(training_df)} records) included in export")
+        except Exception as te:
+            api_logger.warning(f"⚠️ Could not load training data: {te}")
+
+    if include_summary and exported:
+        stats = database_manager.get_statistics()
+        summary_sheet = workbook.create_sheet(SUMMARY_SHEET)
+        for row in [
+            ['Metrik', 'Nilai'],
+            ['Total Prediksi', stats['total_predictions']],
+            ['Alergen Terdeteksi', stats['detected_count']],
+            ['Tidak Terdeteksi', stats['not_detected_count']],
+            ['Tingkat Deteksi (%)', stats['detection_rate']],
+            ['Kepercayaan Rata-rata (%)', stats['average_confidence']],
+            ['Algoritma Model', stats['model_info']['algorithm']],
+            ['Jumlah Records Exported', exported],
+            ['Tanggal Export', datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
+        ]:
+            summary_sheet.append(row)
+
+    output = SpooledTemporaryFile(max_size=settings.export_spool_max_bytes, suffix=".xlsx")
+    try:
+        workbook.save(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return output, exported
+
+
+def file_size(fileobj) -> int:
+    """Size of a seekable file, leaving the position at 0"""
+    size = fileobj.seek(0, 2)
+    fileobj.seek(0)
+    return size
+
+
+def iter_file(fileobj, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a file in chunks and close it afterwards (also on client disconnect)"""
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+# Streamed analytics formats: media type per format
+STREAM_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Raw dataset_results columns in analytics exports (no user IP/agent)
+HISTORY_FIELDS = [
+    'id', 'product_name', 'bahan_utama', 'pemanis', 'lemak_minyak', 'penyedap_rasa',
+    'ingredients_input', 'predicted_allergens', 'allergen_count', 'confidence_score',
+    'risk_level', 'processing_time_ms', 'model_version', 'keterangan', 'created_at',
+]
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _encode_csv(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HISTORY_FIELDS)
+    for chunk in chunks:
+        for record in chunk:
+            writer.writerow([
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in (record[field] for field in HISTORY_FIELDS)
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode('utf-8')
+
+
+def _encode_ndjson(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps({field: record[field] for field in HISTORY_FIELDS}, ensure_ascii=False, default=_json_default) + '\n'
+            for record in chunk
+        ).encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """
+    Write-only stream for ParquetWriter whose bytes can be taken out as they
+    are written; tell() keeps counting so footer offsets stay correct
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._pending.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._pending)
+        self._pending.clear()
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('product_name', pa.string()),
+        ('bahan_utama', pa.string()),
+        ('pemanis', pa.string()),
+        ('lemak_minyak', pa.string()),
+        ('penyedap_rasa', pa.string()),
+        ('ingredients_input', pa.string()),
+        ('predicted_allergens', pa.string()),
+        ('allergen_count', pa.int32()),
+        ('confidence_score', pa.float64()),
+        ('risk_level', pa.string()),
+        ('processing_time_ms', pa.float64()),
+        ('model_version', pa.string()),
+        ('keterangan', pa.string()),
+        ('created_at', pa.timestamp('us')),
+    ])
+
+
+def _encode_parquet(chunks: Iterable[List[Dict]]) -> Iterator[bytes]:
+    schema = _parquet_schema()
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    try:
+        for chunk in chunks:
+            columns = {field: [record[field] for record in chunk] for field in HISTORY_FIELDS}
+            for field in ('confidence_score', 'processing_time_ms'):
+                columns[field] = [float(value) if value is not None else None for value in columns[field]]
+            # One row group per fetched chunk, flushed to the client right away
+            writer.write_table(pa.table(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_ENCODERS = {"csv": _encode_csv, "ndjson": _encode_ndjson, "parquet": _encode_parquet}
+
+
+def iter_stream_export(
+    export_format: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Encoded export bytes, produced chunk by chunk from a server-side cursor
+
+    Blocking generator: advance it in the DB executor. Closing it early
+    closes the cursor and returns the connection to the pool.
+
+    Raises:
+        ValueError: If the format is unknown or Parquet support (pyarrow) is missing
+    """
+    if export_format not in _ENCODERS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if export_format == "parquet" and pa is None:
+        raise ValueError("Parquet export requires pyarrow")
+
+    chunks = database_manager.iter_export_rows(
+        date_from=date_from, date_to=date_to, limit=limit, chunk_size=settings.export_chunk_size
+    )
+    try:
+        yield from _ENCODERS[export_format](chunks)
+    finally:
+        chunks.close()
+
+
+# Export
+__all__ = [
+    "EXCEL_MEDIA_TYPE",
+    "EXPORT_COLUMNS",
+    "HISTORY_FIELDS",
+    "STREAM_MEDIA_TYPES",
+    "export_row",
+    "file_size",
+    "format_allergens",
+    "iter_file",
+    "iter_stream_export",
+    "prediction_label",
+    "write_excel_export"
+]
@@ -0,0 +1,112 @@
+"""
+♻️ Statistics Aggregate Reconciler
+
+Dashboard statistics are read from the prediction_stats running-aggregate
+row, which every insert and delete updates in its own transaction. This
+background task periodically rebuilds that row from a full scan of
+dataset_results, correcting any drift (e.g. rows changed outside the API).
+
+- Interval: settings.stats_reconcile_interval seconds (0 disables the task)
+- The rebuild runs in the DB executor, never on the event loop
+- Every worker runs the timer, but a MySQL named lock plus the row's
+  reconciled_at let only one of them scan the table per interval
+- Metrics: run count, last drift and duration via stats()
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.executors import run_db
+from ..core.logger import api_logger
+from .allergen_database import database_manager
+
+
+class StatisticsReconciler:
+    """
+    Periodic rebuild of the statistics aggregate row
+
+    Args:
+        interval: Seconds between rebuilds (0 disables the background task)
+    """
+
+    def __init__(self, interval: float = 3600.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_run_at: Optional[float] = None
+        self.last_duration_ms = 0.0
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the periodic task (must run inside the event loop)"""
+        if self.running or self.interval <= 0 or not database_manager.db_available:
+            return
+        self._task = asyncio.create_task(self._run(), name="statistics-reconciler")
+        api_logger.info(f"♻️ Statistics reconciler started: every {self.interval:g}s")
+
+    async def stop(self) -> None:
+        """Cancel the periodic task"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reconcile(self, min_interval: Optional[float] = None) -> Dict[str, Any]:
+        """Rebuild the aggregate row now and record the outcome"""
+        start = time.perf_counter()
+        try:
+            result = await run_db(database_manager.reconcile_statistics, min_interval)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.runs += 1
+            self.last_run_at = time.time()
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+        self.last_result = result
+        if not result.get('reconciled'):
+            self.skipped += 1
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # Another worker that reconciled within half an interval counts
+                await self.reconcile(min_interval=self.interval / 2)
+            except Exception as e:
+                api_logger.error(f"❌ Statistics reconciliation failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Reconciler state for monitoring"""
+        return {
+            "running": self.running,
+            "interval_s": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "last_result": self.last_result
+        }
+
+
+# Global reconciler for the prediction_stats aggregate row
+statistics_reconciler = StatisticsReconciler(interval=settings.stats_reconcile_interval)
+
+# Export
+__all__ = ["StatisticsReconciler", "statistics_reconciler"]
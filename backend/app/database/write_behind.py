@@ -0,0 +1,291 @@
+"""
+📝 Write-Behind Buffer for Prediction History
+
+Prediction requests enqueue their record and respond immediately; a single
+background task drains the queue and persists records to dataset_results in
+multi-row INSERT batches, flushing when a batch is full or when the oldest
+queued record has waited flush_interval seconds.
+
+- Back-pressure: the queue is bounded, so producers wait once it is full
+  instead of growing memory without limit
+- Shutdown: stop() drains and flushes everything still queued (called from
+  the FastAPI lifespan)
+- Failures: transient DB errors (lost connection, deadlock, lock wait
+  timeout) are retried with exponential backoff. A batch that still fails
+  with a data error is written row by row, so only the bad records are
+  lost; records that cannot be written at all, including records the
+  writer skips while the database is unavailable, are appended to a JSONL
+  dead-letter file (replay: scripts/maintenance/replay_dead_letter.py)
+- Metrics: queue depth, flush count/size and flush latency via stats()
+"""
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from sqlalchemy.exc import DBAPIError, OperationalError, TimeoutError as PoolTimeoutError
+
+from ..core.config import settings
+from ..core.executors import run_db
+from ..core.logger import api_logger
+from ..core.metrics import WRITE_BEHIND_FLUSH_SECONDS
+from .allergen_database import database_manager
+
+# Queue sentinel telling the flush task to exit
+_STOP = object()
+
+# Dead-letter reason when the writer skips records instead of raising
+# (database in fallback mode / unavailable)
+_NOT_SAVED = "Database unavailable, record not saved"
+
+
+def is_transient_db_error(error: Exception) -> bool:
+    """Errors worth retrying: lost/invalidated connections, deadlocks, lock and pool timeouts"""
+    if isinstance(error, (OperationalError, PoolTimeoutError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+class PredictionWriteBehind:
+    """
+    Asynchronous batching writer for prediction records
+
+    Args:
+        writer: Blocking function persisting a list of records, returning
+            the number of saved rows (database_manager.save_prediction_results)
+        batch_size: Maximum records per INSERT
+        flush_interval: Maximum seconds a record waits before being flushed
+        max_queue: Queue capacity before producers are made to wait
+        max_retries: Retries of a batch after a transient DB error
+        retry_backoff: Seconds before the first retry (doubled each time)
+        dead_letter_path: JSONL file for records that could not be written
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[List[dict]], int],
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        dead_letter_path: Optional[str] = None
+    ):
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.enqueued = 0
+        self.flushed_records = 0
+        self.failed_records = 0
+        self.dead_lettered = 0
+        self.retries = 0
+        self.flushes = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flush task (must run inside the event loop)"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="prediction-write-behind")
+        api_logger.info(
+            f"📝 Write-behind started: batch {self.batch_size}, "
+            f"interval {self.flush_interval}s, queue {self.max_queue}"
+        )
+
+    async def enqueue(self, record: dict) -> None:
+        """
+        Queue a prediction record for persistence
+
+        Waits while the queue is full (back-pressure). If the background task
+        is not running, the record is written directly instead.
+        """
+        if not self.running or self._stopping:
+            await self._flush([record])
+            return
+
+        if self._queue.full():
+            self.backpressure_waits += 1
+        await self._queue.put(record)
+        self.enqueued += 1
+
+    async def stop(self) -> None:
+        """Stop the background task after flushing everything still queued"""
+        if self._task is None:
+            return
+
+        # The sentinel is queued behind every pending record, so the task
+        # flushes them all before exiting; new records are written directly
+        self._stopping = True
+        pending = self._queue.qsize()
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._stopping = False
+
+        api_logger.info(f"📝 Write-behind stopped, {pending} queued records flushed on shutdown")
+
+    async def _run(self) -> None:
+        """Collect records into batches and flush by size or by time"""
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await self._queue.get()
+            if record is _STOP:
+                return
+
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is _STOP:
+                    await self._flush(batch)
+                    return
+                batch.append(record)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]) -> None:
+        """Persist one batch in the DB executor and record flush metrics"""
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            saved = await self._write(batch)
+            if saved < len(batch):
+                # The writer commits a batch as a whole, so nothing of it was saved
+                api_logger.error(f"❌ Write-behind flush saved {saved} of {len(batch)} records: database unavailable")
+                await self._dead_letter(batch[saved:], _NOT_SAVED)
+        except Exception as e:
+            if is_transient_db_error(e) or len(batch) == 1:
+                # Database still unreachable: row by row would fail the same way
+                api_logger.error(f"❌ Write-behind flush failed for {len(batch)} records: {e}")
+                await self._dead_letter(batch, e)
+                saved = 0
+            else:
+                api_logger.error(f"❌ Write-behind batch of {len(batch)} records rejected ({e}), writing row by row")
+                saved = await self._write_rows(batch)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.flushes += 1
+        self.flushed_records += saved
+        self.failed_records += len(batch) - saved
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+        WRITE_BEHIND_FLUSH_SECONDS.observe(elapsed_ms / 1000)
+
+    async def _write(self, batch: List[dict]) -> int:
+        """Write one batch, retrying transient DB errors with exponential backoff"""
+        delay = self.retry_backoff
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return await run_db(self.writer, batch)
+            except Exception as e:
+                if not is_transient_db_error(e):
+                    raise
+                self.retries += 1
+                api_logger.warning(
+                    f"⚠️ Write-behind flush of {len(batch)} records failed ({e}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:g}s"
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+        return await run_db(self.writer, batch)
+
+    async def _write_rows(self, batch: List[dict]) -> int:
+        """Write a rejected batch one record at a time; dead-letter the records that fail"""
+        saved = 0
+        for record in batch:
+            try:
+                written = await run_db(self.writer, [record])
+            except Exception as e:
+                api_logger.error(f"❌ Write-behind record {record.get('productName')!r} rejected: {e}")
+                await self._dead_letter([record], e)
+                continue
+            if written:
+                saved += written
+            else:
+                await self._dead_letter([record], _NOT_SAVED)
+        return saved
+
+    async def _dead_letter(self, records: List[dict], error: Union[Exception, str]) -> None:
+        """Append unwritten records to the dead-letter file (one JSON object per line)"""
+        if self.dead_letter_path is None:
+            return
+        lines = "".join(
+            json.dumps({"error": str(error), "failed_at": time.time(), "record": record},
+                       ensure_ascii=False, default=str) + "\n"
+            for record in records
+        )
+
+        def append() -> None:
+            self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+        try:
+            await run_db(append)
+            self.dead_lettered += len(records)
+            api_logger.warning(f"📮 {len(records)} records written to dead-letter file {self.dead_letter_path}")
+        except Exception as e:
+            api_logger.error(f"❌ Could not write {len(records)} records to dead-letter file: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and flush metrics for monitoring"""
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval_s": self.flush_interval,
+            "enqueued": self.enqueued,
+            "flushed_records": self.flushed_records,
+            "failed_records": self.failed_records,
+            "dead_lettered": self.dead_lettered,
+            "retries": self.retries,
+            "flushes": self.flushes,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2)
+        }
+
+
+# Global write-behind instance for prediction history
+prediction_writer = PredictionWriteBehind(
+    database_manager.save_prediction_results,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval,
+    max_queue=settings.write_behind_max_queue,
+    max_retries=settings.write_behind_max_retries,
+    retry_backoff=settings.write_behind_retry_backoff,
+    dead_letter_path=settings.write_behind_dead_letter_file
+)
+
+# Export
+__all__ = ["PredictionWriteBehind", "is_transient_db_error", "prediction_writer"]
@@ -12,9 +12,15 @@ import os
 
 # Import application components
 from .api.v1 import api_router
+from .api import metrics
 from .core.config import settings, validate_model_files
+from .core.executors import start_executors, shutdown_executors
+from .core.metrics import MetricsMiddleware
+from .database.write_behind import prediction_writer
+from .database.statistics import statistics_reconciler
+from .models.training.jobs import retrain_jobs
 from .core.logger import api_logger, log_startup, log_error
-from .models.inference.predictor import predictor
+from .models.inference.predictor import predictor, model_watcher
 
 # Application startup time
 startup_time = time.time()
@@ -28,15 +34,29 @@ async def lifespan(app: FastAPI):
         # Initialize database and ML models
         api_logger.info("🚀 AllerScan API starting up...")
         
+        # Thread pools for blocking DB I/O, model inference and bcrypt
+        start_executors()
+        api_logger.info(
+            f"⚙️ Executors ready: db={settings.db_executor_workers} workers, "
+            f"inference={settings.inference_executor_workers} workers, "
+            f"auth={settings.auth_executor_workers} workers"
+        )
+        
+        # Prediction history is persisted in batches by a background task
+        prediction_writer.start()
+        
+        # Periodic rebuild of the dashboard statistics aggregates
+        statistics_reconciler.start()
+        
         # Always load from dataset Excel sesuai script dosen
         from .models.inference.predictor import predictor
         
-        # Coba muat model dari disk dulu (startup instan)
-        # Kalau belum ada (pertama kali atau setelah reset), latih dari awal
-        success = predictor.load_saved_model()
-        if not success:
-            api_logger.info("📚 Model belum ada di disk — melatih dari dataset Excel...")
-            success = predictor.load_and_train_model()
+        # Model dimuat dari disk (atau dilatih) kecuali master gunicorn sudah
+        # memuatnya sebelum fork (preload, lihat gunicorn.conf.py)
+        preloaded = predictor.is_loaded
+        success = predictor.ensure_loaded()
+        if preloaded:
+            api_logger.info(f"♻️ Model versi {predictor.model_version} di-preload oleh master, dibagi copy-on-write")
 
         if success:
             api_logger.info("✅ SVM + AdaBoost model siap digunakan")
@@ -47,6 +67,9 @@ async def lifespan(app: FastAPI):
             api_logger.info(f"🔍 CV Accuracy: {info['cv_accuracy_mean']}")
         else:
             api_logger.error("❌ Gagal memuat model — prediksi tidak tersedia")
+        
+        # Reload in every worker when another process publishes a new model version
+        model_watcher.start()
     
     except Exception as e:
         api_logger.error(f"❌ Error during model loading: {e}")
@@ -56,6 +79,13 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     api_logger.info("🛑 AllerScan API shutting down...")
+    model_watcher.stop()
+    # Stop a running retrain so no orphan training process is left behind
+    retrain_jobs.shutdown()
+    await statistics_reconciler.stop()
+    # Flush queued prediction records before the DB executor goes away
+    await prediction_writer.stop()
+    shutdown_executors()
 
 # Create FastAPI application
 app = FastAPI(
@@ -77,12 +107,20 @@ app.add_middleware(
     allow_headers=settings.allow_headers,
 )
 
+# Request count/latency per route template; outermost so it also times CORS
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(
     api_router,
     prefix=settings.api_v1_prefix
 )
 
+# Prometheus scrape endpoint at the root, where scrapers look by default
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
+
 # Root endpoint
 @app.get(
     "/",
@@ -0,0 +1,199 @@
+"""
+Artifact Model Ringkas (Non-Pickle)
+
+Satu file biner berisi semua yang dibutuhkan inferensi engine linear:
+bobot linear bertumpuk, bobot boosting, parameter kalibrasi Platt, nama
+fitur (vocabulary encoder), label kelas, kategori training untuk OOV dan
+metadata model. Tidak ada unpickle sklearn sama sekali saat startup.
+
+Layout file:
+
+    MAGIC (8 byte) | schema (u32) | reserved (u32) | panjang header (u64)
+    header JSON (dipad ke kelipatan 64 byte)
+    data: array NumPy mentah, setiap array rata 64 byte
+
+Array dibuka dengan np.memmap (read-only), jadi dibagi lewat page cache oleh
+semua worker. Header menyimpan versi schema dan checksum SHA-256 dari
+bagian data; file dengan schema atau checksum yang tidak cocok ditolak.
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+from .encoder import FeatureEncoder
+from .linear_engine import LinearEnsembleEngine
+from .snapshot import ModelSnapshot
+
+ARTIFACT_FILE = "model.alsc"
+SCHEMA_VERSION = 1
+
+_MAGIC = b"ALSCMDL\x00"
+_PREAMBLE = struct.Struct("<8sIIQ")
+_ALIGN = 64
+
+# Array engine linear yang disimpan di bagian data
+_ENGINE_ARRAYS = ("coef", "intercept", "prob_a", "prob_b", "estimator_weights", "classes")
+
+
+class ArtifactError(ValueError):
+    """File artifact rusak, schema tidak didukung, atau checksum tidak cocok"""
+
+
+def _padding(size: int) -> int:
+    return (-size) % _ALIGN
+
+
+def _is_null(value) -> bool:
+    """None, NaN, NaT atau pd.NA (sel kosong dataset training)"""
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except TypeError:
+        # pd.NA: perbandingannya sendiri bernilai NA
+        return True
+
+
+def write_artifact(snapshot: ModelSnapshot, path: Union[str, Path]) -> int:
+    """
+    Tulis snapshot (yang punya engine linear) sebagai artifact ringkas
+
+    Returns:
+        Ukuran file dalam byte
+
+    Raises:
+        ArtifactError: Jika snapshot tidak punya engine linear
+    """
+    engine = snapshot.linear_engine
+    if engine is None:
+        raise ArtifactError("Artifact ringkas membutuhkan engine linear")
+
+    arrays: Dict[str, np.ndarray] = {
+        name: np.ascontiguousarray(getattr(engine, name)) for name in _ENGINE_ARRAYS
+    }
+    layout = {}
+    chunks = []
+    offset = 0
+    for name, array in arrays.items():
+        raw = array.tobytes()
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        chunks.append(raw + b"\0" * _padding(len(raw)))
+        offset += len(raw) + _padding(len(raw))
+    data = b"".join(chunks)
+
+    header = {
+        "schema_version": SCHEMA_VERSION,
+        "checksum": hashlib.sha256(data).hexdigest(),
+        "arrays": layout,
+        "engine": {
+            "weight_sum": engine.weight_sum,
+            "algorithm": engine.algorithm,
+            "decision_scale": engine.decision_scale
+        },
+        "fields": list(snapshot.feature_encoder.fields),
+        "feature_names": list(snapshot.feature_names),
+        "class_labels": [str(label) for label in snapshot.label_encoder.classes_],
+        # Sel kosong bukan kategori (pd.get_dummies juga tidak membuat kolom
+        # untuknya); str() akan mengubahnya menjadi kategori "nan" palsu
+        "training_categories": {
+            field: sorted(str(value) for value in values if not _is_null(value))
+            for field, values in snapshot.training_categories.items()
+        },
+        "metadata": {
+            "cv_accuracy": snapshot.cv_accuracy,
+            "n_samples": snapshot.n_samples,
+            "training_date": snapshot.training_date,
+            "fingerprint": snapshot.fingerprint
+        }
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    header_bytes += b" " * _padding(_PREAMBLE.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, SCHEMA_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return _PREAMBLE.size + len(header_bytes) + len(data)
+
+
+def read_artifact(path: Union[str, Path], mmap: bool = True, verify: bool = True) -> ModelSnapshot:
+    """
+    Muat artifact ringkas menjadi ModelSnapshot (tanpa model sklearn)
+
+    Args:
+        path: File artifact
+        mmap: Buka array sebagai memmap read-only (dibagi antar worker)
+        verify: Cek checksum SHA-256 bagian data
+
+    Raises:
+        ArtifactError: Jika file rusak, schema tidak didukung atau checksum salah
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) != _PREAMBLE.size:
+            raise ArtifactError(f"Artifact {path} terpotong")
+        magic, schema, _, header_len = _PREAMBLE.unpack(preamble)
+        if magic != _MAGIC:
+            raise ArtifactError(f"{path} bukan artifact model AllerScan")
+        if schema != SCHEMA_VERSION:
+            raise ArtifactError(f"Schema artifact {schema} tidak didukung (diharapkan {SCHEMA_VERSION})")
+        try:
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        except ValueError as e:
+            raise ArtifactError(f"Header artifact rusak: {e}")
+
+    data_offset = _PREAMBLE.size + header_len
+    data_size = os.path.getsize(path) - data_offset
+    if mmap:
+        data = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset, shape=(data_size,))
+    else:
+        with open(path, "rb") as f:
+            f.seek(data_offset)
+            data = np.frombuffer(f.read(), dtype=np.uint8)
+
+    if verify and hashlib.sha256(data).hexdigest() != header.get("checksum"):
+        raise ArtifactError(f"Checksum artifact {path} tidak cocok")
+
+    arrays = {}
+    for name in _ENGINE_ARRAYS:
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = spec["offset"]
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    engine_meta = header["engine"]
+    engine = LinearEnsembleEngine(
+        weight_sum=engine_meta["weight_sum"],
+        algorithm=engine_meta["algorithm"],
+        decision_scale=engine_meta["decision_scale"],
+        **arrays
+    )
+
+    label_encoder = LabelEncoder()
+    label_encoder.classes_ = np.array(header["class_labels"], dtype=object)
+
+    metadata = header["metadata"]
+    return ModelSnapshot.create(
+        model=None,
+        label_encoder=label_encoder,
+        feature_encoder=FeatureEncoder(header["fields"], header["feature_names"]),
+        linear_engine=engine,
+        training_categories=header["training_categories"],
+        cv_accuracy=metadata["cv_accuracy"],
+        n_samples=metadata["n_samples"],
+        training_date=metadata["training_date"]
+    )
+
+
+# Export
+__all__ = ["ArtifactError", "ARTIFACT_FILE", "SCHEMA_VERSION", "read_artifact", "write_artifact"]
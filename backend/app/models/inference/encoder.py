@@ -0,0 +1,77 @@
+"""
+Encoder One-Hot Terkompilasi untuk Input Prediksi
+
+Memetakan setiap pasangan (field, nilai) ke indeks kolom tetap hasil
+pd.get_dummies saat training, sehingga input model bisa dibangun langsung
+sebagai array indeks / baris CSR tanpa membuat DataFrame per request.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from typing import Dict, Iterable, List, Union
+
+# Kolom fitur sesuai format dataset training
+FEATURE_COLUMNS = ['Nama Produk Makanan', 'Bahan Utama', 'Pemanis', 'Lemak/Minyak', 'Penyedap Rasa', 'Alergen']
+
+
+class FeatureEncoder:
+    """
+    Encoder one-hot dengan vocabulary (field, nilai) → indeks kolom
+
+    Layout kolom identik dengan pd.get_dummies pada data training
+    (nama kolom "<field>_<nilai>"), sehingga model yang sudah dilatih
+    tetap bisa dipakai tanpa retrain.
+    """
+
+    def __init__(self, fields: Iterable[str], feature_names: Iterable[str]):
+        self.fields = list(fields)
+        self.feature_names = [str(name) for name in feature_names]
+        self.index: Dict[tuple, int] = {}
+
+        # Prefix terpanjang dicocokkan dulu agar field yang mirip tidak tertukar
+        prefixes = sorted(self.fields, key=len, reverse=True)
+        for idx, name in enumerate(self.feature_names):
+            for field in prefixes:
+                prefix = f"{field}_"
+                if name.startswith(prefix):
+                    self.index[(field, name[len(prefix):])] = idx
+                    break
+
+    @property
+    def n_features(self) -> int:
+        """Jumlah kolom fitur hasil encoding"""
+        return len(self.feature_names)
+
+    def encode(self, input_data: Dict[str, str]) -> np.ndarray:
+        """
+        Encode satu input menjadi array indeks kolom yang aktif
+
+        Nilai yang tidak ada di vocabulary training (OOV) diabaikan,
+        sama seperti kolom baru dari pd.get_dummies yang dibuang saat reindex.
+        """
+        hits = []
+        for field in self.fields:
+            value = input_data.get(field)
+            if value is None:
+                continue
+            idx = self.index.get((field, str(value)))
+            if idx is not None:
+                hits.append(idx)
+        return np.array(sorted(hits), dtype=np.int32)
+
+    def to_matrix(self, index_rows: List[np.ndarray], dense: bool = False) -> Union[csr_matrix, np.ndarray]:
+        """Bangun matriks input model dari daftar array indeks per baris"""
+        indptr = np.zeros(len(index_rows) + 1, dtype=np.int32)
+        indptr[1:] = np.cumsum([len(row) for row in index_rows])
+        indices = np.concatenate(index_rows) if index_rows else np.array([], dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.float64)
+        matrix = csr_matrix((data, indices, indptr), shape=(len(index_rows), self.n_features))
+        return matrix.toarray() if dense else matrix
+
+    def transform(self, rows: List[Dict[str, str]], dense: bool = False) -> Union[csr_matrix, np.ndarray]:
+        """Encode beberapa input sekaligus menjadi satu matriks"""
+        return self.to_matrix([self.encode(row) for row in rows], dense=dense)
+
+
+# Export
+__all__ = ["FeatureEncoder", "FEATURE_COLUMNS"]
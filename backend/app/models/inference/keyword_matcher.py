@@ -0,0 +1,229 @@
+"""
+Matcher Keyword Alergen Terkompilasi (Aho-Corasick)
+
+Lexicon keyword alergen dibaca dari file data berversi dan dikompilasi sekali
+menjadi automaton Aho-Corasick. Setiap field input cukup dipindai satu kali
+untuk menemukan semua pasangan (alergen, field), termasuk keyword yang saling
+tumpang tindih seperti 'kacang' dan 'kacang tanah'.
+
+Semantik pencocokan sama dengan regex r'\bkeyword\b': keyword harus berdiri
+sebagai kata utuh agar tidak ada false positive dari substring
+(contoh: 'teri' tidak boleh cocok dengan 'terigu').
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ...core.logger import api_logger
+
+_WORD_CHAR = re.compile(r'\w')
+
+
+def _is_word_char(ch: str) -> bool:
+    return _WORD_CHAR.match(ch) is not None
+
+
+class AllergenKeywordMatcher:
+    """
+    Automaton Aho-Corasick untuk seluruh keyword di lexicon
+
+    Attributes:
+        version: Versi lexicon yang dikompilasi
+        allergens: Nama alergen sesuai urutan di lexicon
+    """
+
+    def __init__(self, lexicon: Dict[str, List[str]], version: str = "unknown"):
+        self.version = version
+        self.allergens = list(lexicon.keys())
+
+        # Keyword id → (indeks alergen, urutan keyword dalam alergen, panjang)
+        self._keywords: List[Tuple[int, int, int]] = []
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for allergen_idx, allergen in enumerate(self.allergens):
+            for keyword_order, keyword in enumerate(lexicon[allergen]):
+                keyword = keyword.strip().lower()
+                if not keyword or not (_is_word_char(keyword[0]) and _is_word_char(keyword[-1])):
+                    raise ValueError(f"Keyword tidak valid untuk '{allergen}': {keyword!r}")
+
+                keyword_id = len(self._keywords)
+                self._keywords.append((allergen_idx, keyword_order, len(keyword)))
+
+                node = 0
+                for ch in keyword:
+                    nxt = goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto.append({})
+                        outputs.append([])
+                        goto[node][ch] = nxt
+                    node = nxt
+                outputs[node].append(keyword_id)
+
+        # Failure link dibangun secara BFS
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = [tuple(out) for out in outputs]
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "AllergenKeywordMatcher":
+        """Kompilasi matcher dari file lexicon JSON"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['allergens'], version=str(data.get('version', 'unknown')))
+
+    def _scan(self, text: str) -> List[int]:
+        """Satu kali pindai teks, kembalikan id keyword yang cocok sebagai kata utuh"""
+        goto, fail, outputs, keywords = self._goto, self._fail, self._outputs, self._keywords
+        hits = []
+        node = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for keyword_id in outputs[node]:
+                start = i - keywords[keyword_id][2] + 1
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                        (i == last or not _is_word_char(text[i + 1])):
+                    hits.append(keyword_id)
+        return hits
+
+    def find(self, fields: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Cari semua alergen pada setiap field
+
+        Args:
+            fields: Mapping nama field → teks (sudah lowercase)
+
+        Returns:
+            Dict alergen → list field tempat keyword-nya cocok. Urutan alergen
+            mengikuti lexicon; urutan field mengikuti urutan keyword lalu
+            urutan field input
+        """
+        field_names = list(fields.keys())
+        hits = set()
+        for field_idx, field_name in enumerate(field_names):
+            for keyword_id in self._scan(fields[field_name]):
+                allergen_idx, keyword_order, _ = self._keywords[keyword_id]
+                hits.add((allergen_idx, keyword_order, field_idx))
+
+        detected: Dict[str, List[str]] = {}
+        for allergen_idx, _, field_idx in sorted(hits):
+            sources = detected.setdefault(self.allergens[allergen_idx], [])
+            field_name = field_names[field_idx]
+            if field_name not in sources:
+                sources.append(field_name)
+        return detected
+
+
+class KeywordMatcherStore:
+    """
+    Pemegang matcher aktif dengan hot-reload dari file lexicon
+
+    Matcher baru dikompilasi di samping lalu dipasang dengan satu assignment
+    referensi, jadi request yang sedang berjalan tetap memakai matcher lama
+    secara utuh. Perubahan file dideteksi lewat mtime (dicek paling sering
+    setiap check_interval detik) sehingga semua worker ikut memuat ulang.
+    Tulis file lexicon baru ke file sementara lalu rename agar atomik.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        check_interval: float = 5.0,
+        on_reload: Optional[Callable[[], None]] = None
+    ):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self._matcher: Optional[AllergenKeywordMatcher] = None
+        self._mtime: Optional[float] = None
+        self._version: Optional[str] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> AllergenKeywordMatcher:
+        """Matcher aktif; memuat ulang jika file lexicon berubah"""
+        now = time.monotonic()
+        if self._matcher is None or (self.check_interval >= 0 and now - self._last_check >= self.check_interval):
+            self._last_check = now
+            self.reload()
+        return self._matcher
+
+    @property
+    def version(self) -> Optional[str]:
+        """
+        Token matcher yang terpasang: versi lexicon + mtime file
+
+        Berubah setiap kali matcher baru dipasang, juga jika file diubah
+        tanpa menaikkan field version-nya.
+        """
+        return self._version
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Kompilasi ulang lexicon jika berubah (atau jika force=True)
+
+        Returns:
+            True jika matcher baru dipasang. Jika file rusak, matcher lama
+            tetap dipakai.
+        """
+        with self._lock:
+            mtime = None
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if not force and self._matcher is not None and mtime == self._mtime:
+                    return False
+
+                matcher = AllergenKeywordMatcher.from_file(self.path)
+                replaced = self._matcher is not None
+                self._matcher = matcher
+                self._mtime = mtime
+                self._version = f"{matcher.version}@{mtime}"
+                api_logger.info(f"📖 Lexicon alergen dimuat: versi {matcher.version}, {len(matcher.allergens)} alergen")
+            except Exception as e:
+                if self._matcher is None:
+                    raise
+                # Versi file yang rusak tidak dicoba ulang sampai file berubah lagi
+                if mtime is not None:
+                    self._mtime = mtime
+                api_logger.error(f"❌ Gagal memuat ulang lexicon alergen, tetap memakai versi {self._matcher.version}: {e}")
+                return False
+
+        if replaced and self.on_reload is not None:
+            self.on_reload()
+        return True
+
+    def info(self) -> Dict:
+        """Informasi lexicon aktif"""
+        matcher = self.get()
+        return {
+            "version": matcher.version,
+            "path": str(self.path),
+            "allergens": matcher.allergens,
+            "keyword_count": len(matcher._keywords)
+        }
+
+
+# Export
+__all__ = ["AllergenKeywordMatcher", "KeywordMatcherStore"]
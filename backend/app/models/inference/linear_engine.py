@@ -0,0 +1,189 @@
+"""
+Engine Skoring Linear untuk Ensemble AdaBoost + SVC Linear
+
+Setiap base learner AdaBoost adalah SVC dengan kernel linear, sehingga
+fungsi keputusannya cukup direpresentasikan oleh satu vektor bobot dan
+intercept. Engine ini menumpuk bobot semua estimator menjadi matriks NumPy
+dan menghitung output ensemble dengan satu perkalian matriks + kombinasi
+SAMME, tanpa memanggil libsvm per estimator.
+"""
+
+import numpy as np
+from pathlib import Path
+from typing import Optional, Union
+from scipy.sparse import issparse, spmatrix
+
+# Batas probabilitas Platt yang dipakai libsvm
+_LIBSVM_MIN_PROB = 1e-7
+
+
+class LinearEnsembleEngine:
+    """
+    Representasi linear terkompilasi dari AdaBoostClassifier(SVC(kernel='linear'))
+
+    Hanya mendukung klasifikasi biner (kelas target model ini memang dua:
+    "Mengandung Alergen" dan "Tidak Mengandung Alergen").
+
+    Attributes:
+        coef: Matriks bobot (n_estimators, n_features)
+        intercept: Intercept per estimator (n_estimators,)
+        prob_a, prob_b: Parameter Platt scaling per estimator
+        estimator_weights: Bobot boosting per estimator
+        weight_sum: Total bobot boosting (normalisasi SAMME)
+        algorithm: 'SAMME' (vote keras) atau 'SAMME.R' (log-probabilitas)
+        decision_scale: Skala fungsi keputusan, dikalibrasi dari model asli
+    """
+
+    def __init__(
+        self,
+        coef: np.ndarray,
+        intercept: np.ndarray,
+        prob_a: np.ndarray,
+        prob_b: np.ndarray,
+        estimator_weights: np.ndarray,
+        weight_sum: float,
+        classes: np.ndarray,
+        algorithm: str = "SAMME",
+        decision_scale: float = 1.0
+    ):
+        self.coef = coef
+        self.intercept = intercept
+        self.prob_a = prob_a
+        self.prob_b = prob_b
+        self.estimator_weights = estimator_weights
+        self.weight_sum = float(weight_sum)
+        self.classes = classes
+        self.algorithm = algorithm
+        self.decision_scale = float(decision_scale)
+
+    @property
+    def n_estimators(self) -> int:
+        return self.coef.shape[0]
+
+    @property
+    def n_features(self) -> int:
+        return self.coef.shape[1]
+
+    @classmethod
+    def from_adaboost(cls, model, X_reference=None, atol: float = 1e-6) -> "LinearEnsembleEngine":
+        """
+        Ekspor AdaBoostClassifier terlatih menjadi engine linear
+
+        Skala fungsi keputusan berbeda antar versi scikit-learn, jadi skala
+        dikalibrasi terhadap decision_function model asli pada X_reference
+        (default: matriks identitas fitur), lalu paritas predict_proba dicek.
+
+        Raises:
+            ValueError: Jika model bukan ensemble biner SVC linear atau
+                hasil engine tidak identik dengan model asli
+        """
+        if len(model.classes_) != 2:
+            raise ValueError("Engine linear hanya mendukung klasifikasi biner")
+
+        estimators = list(model.estimators_)
+        for est in estimators:
+            if getattr(est, 'kernel', None) != 'linear':
+                raise ValueError("Semua base estimator harus SVC dengan kernel linear")
+            if len(est.classes_) != 2:
+                raise ValueError("Base estimator harus melihat kedua kelas target")
+
+        weights = np.asarray(model.estimator_weights_, dtype=np.float64)
+        engine = cls(
+            coef=np.vstack([np.asarray(est.coef_, dtype=np.float64).ravel() for est in estimators]),
+            intercept=np.array([float(est.intercept_[0]) for est in estimators]),
+            prob_a=np.array([float(est.probA_[0]) if len(est.probA_) else 0.0 for est in estimators]),
+            prob_b=np.array([float(est.probB_[0]) if len(est.probB_) else 0.0 for est in estimators]),
+            estimator_weights=weights[:len(estimators)].copy(),
+            weight_sum=weights.sum(),
+            classes=np.asarray(model.classes_),
+            algorithm=getattr(model, 'algorithm', 'SAMME') or 'SAMME'
+        )
+
+        if X_reference is None:
+            X_reference = np.eye(engine.n_features)
+
+        # Kalibrasi skala keputusan terhadap model asli
+        reference = np.asarray(model.decision_function(X_reference), dtype=np.float64)
+        raw = engine.decision_function(X_reference)
+        mask = np.abs(raw) > 1e-12
+        if mask.any():
+            engine.decision_scale = float(np.median(reference[mask] / raw[mask]))
+
+        max_diff = engine.parity_error(model, X_reference)
+        if max_diff > atol:
+            raise ValueError(f"Paritas engine linear gagal (selisih maksimum {max_diff:.2e})")
+
+        return engine
+
+    def parity_error(self, model, X) -> float:
+        """Selisih absolut maksimum predict_proba engine vs model sklearn"""
+        return float(np.max(np.abs(self.predict_proba(X) - model.predict_proba(X))))
+
+    def _margins(self, X: Union[np.ndarray, spmatrix]) -> np.ndarray:
+        """Fungsi keputusan semua estimator sekaligus: (n_samples, n_estimators)"""
+        margins = X @ self.coef.T
+        if issparse(margins):
+            margins = margins.toarray()
+        return np.asarray(margins) + self.intercept
+
+    def decision_function(self, X: Union[np.ndarray, spmatrix]) -> np.ndarray:
+        """Fungsi keputusan ensemble, identik dengan AdaBoostClassifier.decision_function"""
+        margins = self._margins(X)
+
+        if self.algorithm == 'SAMME.R':
+            # Probabilitas Platt libsvm untuk kelas pertama; tanda keputusan
+            # libsvm adalah kebalikan dari decision_function sklearn
+            p0 = 1.0 / (1.0 + np.exp(-self.prob_a * margins + self.prob_b))
+            p0 = np.clip(p0, _LIBSVM_MIN_PROB, 1 - _LIBSVM_MIN_PROB)
+            eps = np.finfo(np.float64).eps
+            contributions = np.log(np.clip(1 - p0, eps, None)) - np.log(np.clip(p0, eps, None))
+        else:
+            # SAMME: vote keras tiap estimator (+1 kelas kedua, -1 kelas pertama)
+            contributions = np.where(margins >= 0, 1.0, -1.0)
+
+        return self.decision_scale * (contributions @ self.estimator_weights) / self.weight_sum
+
+    def predict_proba(self, X: Union[np.ndarray, spmatrix]) -> np.ndarray:
+        """Probabilitas kelas, identik dengan AdaBoostClassifier.predict_proba"""
+        decision = self.decision_function(X)
+        p1 = 1.0 / (1.0 + np.exp(-decision))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X: Union[np.ndarray, spmatrix]) -> np.ndarray:
+        """Prediksi kelas (indeks label encoder)"""
+        return self.classes.take((self.decision_function(X) > 0).astype(int))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Simpan engine sebagai arsip .npz"""
+        np.savez(
+            path,
+            coef=self.coef,
+            intercept=self.intercept,
+            prob_a=self.prob_a,
+            prob_b=self.prob_b,
+            estimator_weights=self.estimator_weights,
+            weight_sum=np.array(self.weight_sum),
+            classes=self.classes,
+            algorithm=np.array(self.algorithm),
+            decision_scale=np.array(self.decision_scale)
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["LinearEnsembleEngine"]:
+        """Muat engine dari arsip .npz"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                coef=data['coef'],
+                intercept=data['intercept'],
+                prob_a=data['prob_a'],
+                prob_b=data['prob_b'],
+                estimator_weights=data['estimator_weights'],
+                weight_sum=float(data['weight_sum']),
+                classes=data['classes'],
+                algorithm=str(data['algorithm']),
+                decision_scale=float(data['decision_scale'])
+            )
+
+
+# Export
+__all__ = ["LinearEnsembleEngine"]
@@ -0,0 +1,97 @@
+"""
+Cache LRU untuk Hasil Prediksi
+
+Input PredictionRequest hanya enam string kategorikal pendek dan traffic
+sangat repetitif (produk yang sama dipindai berulang kali), sehingga hasil
+predict_allergens bisa di-cache per (input ternormalisasi, threshold, model,
+lexicon).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class PredictionCache:
+    """
+    Cache LRU thread-safe dengan batas jumlah entri
+
+    Key sudah memuat fingerprint model dan versi lexicon, jadi entri lama
+    tidak akan pernah cocok setelah model atau lexicon diganti, termasuk
+    entri yang disimpan oleh request yang mulai sebelum penggantian dan
+    selesai setelah invalidate(). invalidate() membuang semuanya sekaligus
+    agar memori langsung kembali.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(
+        model_input: Dict[str, Any],
+        confidence_threshold: float,
+        fingerprint: str,
+        lexicon_version: Optional[str] = None
+    ) -> Tuple:
+        """Key ternormalisasi: urutan field tidak berpengaruh, nilai dipakai apa adanya"""
+        normalized = tuple(sorted((str(k), v if v is None else str(v)) for k, v in model_input.items()))
+        threshold = None if confidence_threshold is None else float(confidence_threshold)
+        return (fingerprint, lexicon_version, threshold, normalized)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Ambil entri dan tandai sebagai paling baru dipakai"""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Simpan entri, buang entri paling lama jika melebihi kapasitas"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Kosongkan cache (dipanggil saat model diganti)"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistik hit/miss/eviction untuk monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0
+            }
+
+
+# Export
+__all__ = ["PredictionCache"]
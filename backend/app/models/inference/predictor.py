@@ -16,21 +16,40 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+import threading
+import time
+from functools import partial
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 from sklearn.ensemble import AdaBoostClassifier
 from sklearn.svm import SVC
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import cross_val_score, StratifiedKFold
 import warnings
 
 from ...core.config import settings
-from ...core.logger import api_logger, log_model_loaded, log_error
+from ...core.logger import api_logger, log_detail, log_model_loaded, log_error
+from ...core.metrics import MODEL_LOAD_SECONDS, PREDICTION_STAGE_SECONDS
 from ...schemas.request_schemas import AllergenResult
+from .encoder import FeatureEncoder, FEATURE_COLUMNS
+from .linear_engine import LinearEnsembleEngine
+from .prediction_cache import PredictionCache
+from .keyword_matcher import KeywordMatcherStore
+from .snapshot import ModelSnapshot
+from .artifact import ARTIFACT_FILE, ArtifactError, read_artifact, write_artifact
+from ..registry import ModelRegistry, ModelWatcher, LEGACY_VERSION
+from ..training.dataset import prediction_rows, prediction_rows_to_training, training_dataset
+from ..training.cross_validation import (
+    ProgressCallback, CancelCheck, TrainingCancelled, check_cancelled, cross_validate_and_fit
+)
 
 warnings.filterwarnings('ignore')
 
+
+def _format_accuracy(cv_accuracy: Optional[float]) -> str:
+    """Akurasi CV untuk log; versi lama bisa tidak punya nilai ini"""
+    return f"{cv_accuracy:.4f}" if cv_accuracy is not None else "n/a"
+
 class AllergenPredictor:
     """
     Model predictor untuk deteksi alergen menggunakan machine learning
@@ -42,78 +61,209 @@ class AllergenPredictor:
     - Deteksi Out-of-Vocabulary untuk input yang tidak dikenal
     - Penyesuaian confidence score secara dinamis
     - Penanganan kategori input yang belum pernah ditemui dalam training
+
+    Seluruh state model disimpan dalam satu ModelSnapshot immutable di
+    self.snapshot. Training/reload membangun snapshot baru lalu menukarnya
+    dengan satu assignment; setiap prediksi membaca self.snapshot sekali
+    dan memakai referensi itu sampai selesai.
     """
     
     def __init__(self):
         """Inisialisasi predictor dengan pengaturan awal"""
-        self.model = None
-        self.X_encoded = None
-        self.y_encoded = None
-        self.label_encoder = None
-        self.cv_accuracy = None
-        self.is_loaded = False
-        self._n_samples = 0
-
-        # Simpan kategori training untuk deteksi OOV
-        self.training_categories = {
-            'nama_produk_makanan': set(),
-            'bahan_utama': set(),
-            'pemanis': set(),
-            'lemak_minyak': set(),
-            'penyedap_rasa': set(),
-            'alergen': set()
+        self.snapshot: Optional[ModelSnapshot] = None
+        self.inference_engine = settings.inference_engine
+        self.registry = ModelRegistry(settings.model_dir, settings.model_registry_keep)
+        self._load_lock = threading.Lock()
+        self.prediction_cache = PredictionCache(settings.prediction_cache_size)
+        self.keyword_store = KeywordMatcherStore(
+            settings.allergen_lexicon_path,
+            settings.lexicon_check_interval,
+            on_reload=self.prediction_cache.invalidate
+        )
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.snapshot is not None
+
+    @property
+    def model_fingerprint(self) -> Optional[str]:
+        snapshot = self.snapshot
+        return snapshot.fingerprint if snapshot is not None else None
+
+    @property
+    def model_version(self) -> Optional[str]:
+        snapshot = self.snapshot
+        return snapshot.version if snapshot is not None else None
+
+    def _publish(self, snapshot: ModelSnapshot) -> None:
+        """Tukar snapshot aktif (satu assignment) dan buang cache prediksi milik model lama"""
+        self.snapshot = snapshot
+        self.prediction_cache.invalidate()
+
+    def _write_artifacts(self, snapshot: ModelSnapshot, save_dir: Path) -> None:
+        """
+        Tulis seluruh file satu snapshot ke satu direktori versi
+
+        Engine linear disimpan sebagai artifact ringkas (dimuat saat startup);
+        pickle sklearn tetap disimpan untuk engine "sklearn" dan retrain.
+        """
+        if snapshot.linear_engine is not None:
+            write_artifact(snapshot, save_dir / ARTIFACT_FILE)
+        if snapshot.model is not None:
+            joblib.dump(snapshot.model,       save_dir / 'svm_adaboost_model.pkl')
+        joblib.dump(snapshot.label_encoder,   save_dir / 'label_encoder.pkl')
+        joblib.dump(list(snapshot.feature_names), save_dir / 'feature_names.pkl')
+        joblib.dump({field: set(values) for field, values in snapshot.training_categories.items()},
+                    save_dir / 'training_categories.pkl')
+        joblib.dump(snapshot.feature_encoder, save_dir / 'feature_encoder.pkl')
+
+        metadata = {
+            'version': save_dir.name,
+            'cv_accuracy': snapshot.cv_accuracy,
+            'n_samples': snapshot.n_samples,
+            'n_features': snapshot.n_features,
+            'training_date': snapshot.training_date or datetime.now().isoformat(),
+            'model_fingerprint': snapshot.fingerprint
         }
-    
-    def save_model(self) -> None:
-        """Simpan model terlatih ke disk agar restart server tidak perlu retrain."""
-        try:
-            save_dir = Path(settings.model_dir)
-            save_dir.mkdir(parents=True, exist_ok=True)
-
-            joblib.dump(self.model,                 save_dir / 'svm_adaboost_model.pkl')
-            joblib.dump(self.label_encoder,         save_dir / 'label_encoder.pkl')
-            joblib.dump(list(self.X_encoded.columns), save_dir / 'feature_names.pkl')
-            joblib.dump(self.training_categories,   save_dir / 'training_categories.pkl')
-
-            metadata = {
-                'cv_accuracy': float(self.cv_accuracy) if self.cv_accuracy else None,
-                'n_samples': int(self.X_encoded.shape[0]),
-                'n_features': int(self.X_encoded.shape[1]),
-                'training_date': datetime.now().isoformat()
-            }
-            with open(save_dir / 'model_metadata.json', 'w') as f:
-                json.dump(metadata, f, indent=2)
+        with open(save_dir / 'model_metadata.json', 'w') as f:
+            json.dump(metadata, f, indent=2)
 
-            api_logger.info(f"✅ Model disimpan ke {save_dir}")
+    def save_model(self, snapshot: Optional[ModelSnapshot] = None) -> Optional[str]:
+        """
+        Simpan snapshot (default snapshot aktif) sebagai versi baru di registry
+        lalu publikasikan.
+
+        Semua worker (termasuk worker lain di gunicorn) mendeteksi versi baru
+        lewat ModelWatcher dan memuatnya di background.
+
+        Returns:
+            ID versi baru, atau None jika penyimpanan gagal
+        """
+        snapshot = snapshot or self.snapshot
+        if snapshot is None:
+            return None
+        try:
+            version = self.registry.save_version(
+                partial(self._write_artifacts, snapshot), tag=snapshot.fingerprint[:8]
+            )
+            api_logger.info(f"✅ Model disimpan sebagai versi {version} di {self.registry.root}")
+            return version
         except Exception as e:
             api_logger.warning(f"⚠️ Tidak bisa menyimpan model: {e}")
+            return None
+
+    def _save_and_publish(self, snapshot: ModelSnapshot) -> ModelSnapshot:
+        """Simpan snapshot hasil training ke registry lalu jadikan snapshot aktif"""
+        with self._load_lock:
+            snapshot = snapshot.with_version(self.save_model(snapshot))
+            self._publish(snapshot)
+        return snapshot
 
-    def load_saved_model(self) -> bool:
-        """Muat model dari disk. Return True jika berhasil, False jika belum ada."""
+    def load_saved_model(self, version: Optional[str] = None) -> bool:
+        """
+        Muat model dari registry (default versi aktif). Return True jika berhasil,
+        False jika belum ada.
+        """
+        with self._load_lock:
+            return self._load_version(version)
+
+    def reload_if_changed(self, version: str) -> bool:
+        """
+        Dipanggil ModelWatcher: muat versi aktif jika berbeda dari yang sedang dipakai
+
+        Returns:
+            True jika versi tersebut sekarang terpakai (juga jika sudah
+            terpakai sebelumnya), False jika pemuatan gagal
+        """
+        with self._load_lock:
+            if version == self.model_version:
+                return True
+            api_logger.info(f"🔄 Versi model baru terdeteksi ({version}), memuat ulang...")
+            return self._load_version(version)
+
+    def _load_version(self, version: Optional[str] = None) -> bool:
+        """Muat satu direktori versi secara utuh (dipanggil dengan _load_lock)"""
+        start = time.perf_counter()
         try:
-            save_dir = Path(settings.model_dir)
-            if not (save_dir / 'svm_adaboost_model.pkl').exists():
+            version = version or self.registry.current_version()
+            save_dir = self.registry.resolve(version)
+            model_path = save_dir / 'svm_adaboost_model.pkl' if save_dir is not None else None
+            artifact_path = save_dir / ARTIFACT_FILE if save_dir is not None else None
+            if save_dir is None or not (model_path.exists() or artifact_path.exists()):
                 api_logger.info("Model tersimpan tidak ditemukan, akan dilatih dari awal.")
                 return False
 
-            self.model             = joblib.load(save_dir / 'svm_adaboost_model.pkl')
-            self.label_encoder     = joblib.load(save_dir / 'label_encoder.pkl')
-            feature_names          = joblib.load(save_dir / 'feature_names.pkl')
-            self.training_categories = joblib.load(save_dir / 'training_categories.pkl')
-            self.X_encoded         = pd.DataFrame(columns=feature_names)
+            # Engine linear cukup membaca artifact ringkas: tanpa unpickle sklearn
+            if self.inference_engine == "linear" and artifact_path.exists():
+                try:
+                    snapshot = read_artifact(artifact_path, mmap=settings.model_mmap)
+                    snapshot = snapshot.with_version(version or LEGACY_VERSION)
+                    self._publish(snapshot)
+                    MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, source="artifact")
+                    api_logger.info(f"✅ Model versi {snapshot.version} dimuat dari artifact ringkas — akurasi={_format_accuracy(snapshot.cv_accuracy)}, fitur={snapshot.n_features}, sampel={snapshot.n_samples}")
+                    return True
+                except ArtifactError as e:
+                    api_logger.warning(f"⚠️ Artifact ringkas ditolak ({e}), memuat file pickle...")
+
+            # Snapshot dibangun utuh di samping snapshot aktif, baru ditukar di akhir
+            # Array support vector dibuka sebagai memmap read-only: halaman file
+            # dibagi lewat page cache oleh semua worker, bukan disalin per proses
+            mmap_mode = 'r' if settings.model_mmap else None
+            model               = joblib.load(model_path, mmap_mode=mmap_mode)
+            label_encoder       = joblib.load(save_dir / 'label_encoder.pkl')
+            feature_names       = joblib.load(save_dir / 'feature_names.pkl')
+            training_categories = joblib.load(save_dir / 'training_categories.pkl')
+
+            # Model lama belum menyimpan encoder — bangun ulang dari nama fitur
+            encoder_path = save_dir / 'feature_encoder.pkl'
+            if encoder_path.exists():
+                feature_encoder = joblib.load(encoder_path)
+            else:
+                feature_encoder = FeatureEncoder(FEATURE_COLUMNS, feature_names)
+
+            # Versi lama menyimpan engine sebagai .npz terpisah
+            engine_path = save_dir / 'linear_engine.npz'
+            if engine_path.exists():
+                linear_engine = LinearEnsembleEngine.load(engine_path)
+            else:
+                linear_engine = self._build_linear_engine(model)
 
             with open(save_dir / 'model_metadata.json') as f:
                 meta = json.load(f)
-            self.cv_accuracy = meta.get('cv_accuracy')
-            self._n_samples  = meta.get('n_samples', 0)
 
-            self.is_loaded = True
-            api_logger.info(f"✅ Model dimuat dari disk — akurasi={self.cv_accuracy:.4f}, fitur={len(feature_names)}, sampel={self._n_samples}")
+            snapshot = ModelSnapshot.create(
+                model=model,
+                label_encoder=label_encoder,
+                feature_encoder=feature_encoder,
+                linear_engine=linear_engine,
+                training_categories=training_categories,
+                cv_accuracy=meta.get('cv_accuracy'),
+                n_samples=meta.get('n_samples', 0),
+                training_date=meta.get('training_date'),
+                version=version or LEGACY_VERSION
+            )
+            self._publish(snapshot)
+            MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, source="pickle")
+            api_logger.info(f"✅ Model versi {snapshot.version} dimuat dari disk — akurasi={_format_accuracy(snapshot.cv_accuracy)}, fitur={len(feature_names)}, sampel={snapshot.n_samples}")
             return True
         except Exception as e:
             api_logger.warning(f"⚠️ Gagal muat model dari disk: {e}")
             return False
 
+    def ensure_loaded(self) -> bool:
+        """
+        Pastikan model siap: pakai snapshot yang sudah ada (misalnya dimuat
+        master gunicorn sebelum fork), muat dari disk, atau latih dari awal.
+        """
+        if self.is_loaded:
+            return True
+        # Coba muat model dari disk dulu (startup instan)
+        # Kalau belum ada (pertama kali atau setelah reset), latih dari awal
+        if self.load_saved_model():
+            return True
+        api_logger.info("📚 Model belum ada di disk — melatih dari dataset Excel...")
+        return self.load_and_train_model()
+
     def load_and_train_model(self) -> bool:
         """
         Memuat dataset dan melatih model SVM + AdaBoost
@@ -121,39 +271,17 @@ class AllergenPredictor:
         Returns:
             bool: True jika berhasil, False jika gagal
         """
+        start = time.perf_counter()
         try:
             api_logger.info("Memuat dataset dan melatih model SVM + AdaBoost...")
             
-            # Lokasi-lokasi yang mungkin untuk file dataset
-            possible_paths = [
-                Path("data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("../data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("../../data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("notebooks/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("../notebooks/Dataset Bahan Makanan & Alergen.xlsx")
-            ]
-            
-            dataset_path = None
-            for path in possible_paths:
-                if path.exists():
-                    dataset_path = path
-                    break
-            
-            if not dataset_path:
-                api_logger.error(f"Dataset tidak ditemukan di lokasi manapun: {[str(p) for p in possible_paths]}")
-                return False
-            
-            api_logger.info(f"Memuat dataset dari: {dataset_path}")
-            
-            # Membaca dataset dengan error handling
+            # Dataset dibaca dari cache kolumnar (Excel hanya di-parse sekali)
+            api_logger.info(f"Memuat dataset dari: {training_dataset.source}")
             try:
-                df = pd.read_excel(dataset_path)
-            except Exception as e:
-                # Mencoba dengan nama sheet yang berbeda
-                try:
-                    df = pd.read_excel(dataset_path, sheet_name='Dataset')
-                except:
-                    df = pd.read_excel(dataset_path, sheet_name=0)  # Sheet pertama
+                df = training_dataset.load()
+            except FileNotFoundError as e:
+                api_logger.error(str(e))
+                return False
             
             api_logger.info(f"Dataset berhasil dimuat: shape {df.shape}, kolom: {list(df.columns)}")
             
@@ -180,63 +308,75 @@ class AllergenPredictor:
             y = df[target]
 
             # Menyimpan kategori training untuk deteksi OOV
-            for col in fitur:
-                if col in df.columns:
-                    self.training_categories[col.lower().replace('/', '_').replace(' ', '_')] = set(df[col].unique())
+            training_categories = {
+                col.lower().replace('/', '_').replace(' ', '_'): set(df[col].unique())
+                for col in fitur if col in df.columns
+            }
             
-            api_logger.info(f"Kategori training disimpan untuk deteksi OOV: {len(self.training_categories)} kategori")
+            api_logger.info(f"Kategori training disimpan untuk deteksi OOV: {len(training_categories)} kategori")
             
             # Transformasi nominal ke numerik
-            self.X_encoded = pd.get_dummies(X)
-            self.label_encoder = LabelEncoder()
-            self.y_encoded = self.label_encoder.fit_transform(y)
+            X_encoded = pd.get_dummies(X)
+            feature_encoder = FeatureEncoder(fitur, X_encoded.columns)
+            label_encoder = LabelEncoder()
+            y_encoded = label_encoder.fit_transform(y)
             
-            api_logger.info(f"One-hot encoding selesai: {self.X_encoded.shape[1]} fitur")
-            api_logger.info(f"Label encoding selesai: {len(self.label_encoder.classes_)} kelas: {list(self.label_encoder.classes_)}")
+            api_logger.info(f"One-hot encoding selesai: {X_encoded.shape[1]} fitur")
+            api_logger.info(f"Label encoding selesai: {len(label_encoder.classes_)} kelas: {list(label_encoder.classes_)}")
             
             # Inisialisasi model SVM + AdaBoost
             svm_base = SVC(kernel='linear', probability=True, random_state=42)
-            self.model = AdaBoostClassifier(estimator=svm_base, n_estimators=50, random_state=42)
+            model = AdaBoostClassifier(estimator=svm_base, n_estimators=50, random_state=42)
             
-            # Evaluasi dengan Cross Validation (K = 10)
+            # Evaluasi dengan Cross Validation (K = 10) dan pelatihan model pada
+            # seluruh data, dijalankan paralel di process pool yang sama
             k = 10
-            cv = StratifiedKFold(n_splits=k, shuffle=True, random_state=42)
-            cv_scores = cross_val_score(self.model, self.X_encoded, self.y_encoded, cv=cv, scoring='accuracy')
-            self.cv_accuracy = cv_scores.mean()
+            cv_scores, model = cross_validate_and_fit(
+                model, X_encoded, y_encoded, n_splits=k,
+                n_jobs=settings.training_n_jobs
+            )
+            cv_accuracy = cv_scores.mean()
             
-            api_logger.info(f"📊 Akurasi Cross Validation (K={k}): {self.cv_accuracy * 100:.2f}%")
+            api_logger.info(f"📊 Akurasi Cross Validation (K={k}): {cv_accuracy * 100:.2f}%")
             api_logger.info(f"📊 Detail skor CV: min={cv_scores.min():.3f}, max={cv_scores.max():.3f}, std={cv_scores.std():.3f}")
-            
-            # Pelatihan model pada seluruh data
-            self.model.fit(self.X_encoded, self.y_encoded)
+            linear_engine = self._build_linear_engine(model, X_encoded.to_numpy(dtype=np.float64))
             
             # Save model performance to database untuk statistik dinamis
             try:
                 from ...database.allergen_database import database_manager
                 performance_data = {
                     'model_type': 'SVM+AdaBoost',
-                    'accuracy': self.cv_accuracy,
-                    'cv_score': self.cv_accuracy,
-                    'train_samples': self.X_encoded.shape[0],
+                    'accuracy': cv_accuracy,
+                    'cv_score': cv_accuracy,
+                    'train_samples': X_encoded.shape[0],
                     'test_samples': 0,  # We use cross-validation
-                    'feature_count': self.X_encoded.shape[1]
+                    'feature_count': X_encoded.shape[1]
                 }
                 database_manager.save_model_performance(performance_data)
-                api_logger.info(f"✅ Model performance saved to database: {self.cv_accuracy * 100:.2f}%")
+                api_logger.info(f"✅ Model performance saved to database: {cv_accuracy * 100:.2f}%")
             except Exception as perf_error:
                 api_logger.warning(f"⚠️ Could not save model performance: {perf_error}")
             
-            self.is_loaded = True
-            self._n_samples = self.X_encoded.shape[0]
-            log_model_loaded()
+            snapshot = ModelSnapshot.create(
+                model=model,
+                label_encoder=label_encoder,
+                feature_encoder=feature_encoder,
+                linear_engine=linear_engine,
+                training_categories=training_categories,
+                cv_accuracy=cv_accuracy,
+                n_samples=X_encoded.shape[0],
+                training_date=datetime.now().isoformat()
+            )
 
-            # Simpan ke disk supaya restart server tidak perlu retrain
-            self.save_model()
+            # Simpan ke disk supaya restart server tidak perlu retrain, lalu aktifkan
+            self._save_and_publish(snapshot)
+            MODEL_LOAD_SECONDS.observe(time.perf_counter() - start, source="train")
+            log_model_loaded()
 
             api_logger.info("✅ Model SVM + AdaBoost berhasil dilatih")
-            api_logger.info(f"🔢 Jumlah fitur: {self.X_encoded.shape[1]}")
-            api_logger.info(f"📋 Jumlah sampel: {self.X_encoded.shape[0]}")
-            api_logger.info(f"🎯 Kelas target: {list(self.label_encoder.classes_)}")
+            api_logger.info(f"🔢 Jumlah fitur: {X_encoded.shape[1]}")
+            api_logger.info(f"📋 Jumlah sampel: {X_encoded.shape[0]}")
+            api_logger.info(f"🎯 Kelas target: {list(label_encoder.classes_)}")
             
             return True
                 
@@ -245,11 +385,66 @@ class AllergenPredictor:
             api_logger.error(f"❌ Detailed error: {str(e)}")
             return False
     
-    def _detect_oov_rate(self, input_data: Dict[str, str]) -> Tuple[float, Dict[str, bool]]:
+    def _current_snapshot(self) -> ModelSnapshot:
+        """Ambil referensi snapshot aktif untuk satu request (latih dulu jika belum ada)"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            api_logger.warning("⚠️ Model not loaded, loading now...")
+            self.load_and_train_model()
+            snapshot = self.snapshot
+            if snapshot is None:
+                raise RuntimeError("Model belum dimuat")
+        return snapshot
+
+    def _cache_key(self, snapshot: ModelSnapshot, model_input: Dict[str, str], confidence_threshold: float) -> tuple:
+        """Key cache prediksi; sekaligus memicu cek perubahan lexicon sebelum cache dipakai"""
+        self.keyword_store.get()
+        return PredictionCache.make_key(
+            model_input, confidence_threshold, snapshot.fingerprint, self.keyword_store.version
+        )
+
+    def _build_linear_engine(self, model, X_reference: Optional[np.ndarray] = None) -> Optional[LinearEnsembleEngine]:
+        """
+        Ekspor model AdaBoost ke engine linear dengan pengecekan paritas
+
+        Jika ekspor atau paritas gagal, None dikembalikan dan prediksi
+        memakai model sklearn.
+        """
+        try:
+            engine = LinearEnsembleEngine.from_adaboost(model, X_reference)
+            api_logger.info(f"⚡ Engine linear siap: {engine.n_estimators} estimator, paritas predict_proba terverifikasi")
+            return engine
+        except Exception as e:
+            api_logger.warning(f"⚠️ Engine linear tidak tersedia, memakai sklearn: {e}")
+            return None
+
+    def _score(self, snapshot: ModelSnapshot, index_rows: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Menjalankan model pada baris-baris input ter-encode
+
+        Returns:
+            Tuple (indeks kelas prediksi, matriks probabilitas)
+        """
+        if snapshot.engine_name(self.inference_engine) == "linear":
+            X = snapshot.feature_encoder.to_matrix(index_rows)
+            return snapshot.linear_engine.predict(X), snapshot.linear_engine.predict_proba(X)
+
+        # Model sklearn dilatih dengan input dense
+        X = snapshot.feature_encoder.to_matrix(index_rows, dense=True)
+        return snapshot.model.predict(X), snapshot.model.predict_proba(X)
+
+    @property
+    def active_engine(self) -> str:
+        """Nama engine inferensi yang benar-benar dipakai"""
+        snapshot = self.snapshot
+        return snapshot.engine_name(self.inference_engine) if snapshot is not None else "sklearn"
+
+    def _detect_oov_rate(self, snapshot: ModelSnapshot, input_data: Dict[str, str]) -> Tuple[float, Dict[str, bool]]:
         """
         Mendeteksi tingkat Out-of-Vocabulary pada data input
 
         Args:
+            snapshot: Snapshot model yang dipakai request ini
             input_data: Dictionary berisi data input pengguna
 
         Returns:
@@ -271,7 +466,7 @@ class AllergenPredictor:
         
         for input_field, training_field in field_mapping.items():
             input_value = input_data.get(input_field, '')
-            if input_value in self.training_categories.get(training_field, set()):
+            if input_value in snapshot.training_categories.get(training_field, frozenset()):
                 recognized_fields[input_field] = True
                 recognized_count += 1
             else:
@@ -281,6 +476,137 @@ class AllergenPredictor:
         
         return oov_rate, recognized_fields
     
+    def _prepare_input(
+        self,
+        ingredients_text: Optional[str] = None,
+        ingredients_data: Optional[Dict[str, str]] = None
+    ) -> Tuple[Dict[str, str], str]:
+        """Menyiapkan data input terstruktur dan teks tampilan untuk satu prediksi"""
+        if ingredients_data:
+            data_baru = ingredients_data.copy()
+            display_text = f"{data_baru.get('nama_produk_makanan', '')}: {data_baru.get('bahan_utama', '')}, {data_baru.get('pemanis', '')}, {data_baru.get('lemak_minyak', '')}, {data_baru.get('penyedap_rasa', '')}"
+        else:
+            # Fallback jika hanya teks yang disediakan
+            data_baru = {
+                'nama_produk_makanan': 'Produk Makanan',
+                'bahan_utama': ingredients_text or '',
+                'pemanis': 'Tidak Ada',
+                'lemak_minyak': 'Tidak Ada', 
+                'penyedap_rasa': 'Tidak Ada',
+                'alergen': ''
+            }
+            display_text = ingredients_text or ''
+        return data_baru, display_text
+
+    def _build_prediction(
+        self,
+        snapshot: ModelSnapshot,
+        data_baru: Dict[str, str],
+        display_text: str,
+        active_indices: np.ndarray,
+        predicted_label: str,
+        base_confidence: float,
+        confidence_threshold: float
+    ) -> Tuple[List[AllergenResult], Dict]:
+        """
+        Menyusun hasil prediksi dari output model untuk satu input
+
+        Dipakai bersama oleh prediksi tunggal dan batch sehingga penyesuaian
+        confidence OOV, keyword matching dan metadata selalu identik.
+        """
+        # Deteksi OOV
+        with PREDICTION_STAGE_SECONDS.time(stage="oov_check"):
+            oov_rate, field_recognition = self._detect_oov_rate(snapshot, data_baru)
+
+        # Evaluasi kualitas encoding data dari jumlah indeks yang dikenali
+        non_zero_features = len(active_indices)
+        total_features = snapshot.n_features
+        encoding_recognition_rate = (non_zero_features / total_features) * 100
+
+        log_detail("🔍 Analisis OOV input: {:.1f}% field tidak dikenal", oov_rate)
+        log_detail("🔢 Analisis encoding: {}/{} fitur aktif ({:.1f}%)", non_zero_features, total_features, encoding_recognition_rate)
+
+        # Penyesuaian confidence dinamis berdasarkan OOV
+        if oov_rate >= 90:
+            # OOV hampir lengkap - confidence sangat rendah
+            confidence_multiplier = 0.2
+            log_detail("⚠️ OOV kritis terdeteksi ({:.1f}%) - confidence sangat dikurangi", oov_rate)
+        elif oov_rate >= 70:
+            # OOV tinggi - confidence rendah
+            confidence_multiplier = 0.4
+            log_detail("⚠️ OOV tinggi terdeteksi ({:.1f}%) - confidence dikurangi", oov_rate)
+        elif oov_rate >= 50:
+            # OOV sedang - pengurangan confidence sedang
+            confidence_multiplier = 0.7
+            log_detail("⚠️ OOV sedang terdeteksi ({:.1f}%) - confidence sedang dikurangi", oov_rate)
+        elif oov_rate >= 25:
+            # OOV rendah - pengurangan confidence sedikit
+            confidence_multiplier = 0.9
+            log_detail("ℹ️ OOV rendah terdeteksi ({:.1f}%) - confidence sedikit dikurangi", oov_rate)
+        else:
+            # Pengenalan baik - pengurangan confidence minimal
+            confidence_multiplier = 0.95
+            log_detail("✅ Pengenalan input baik ({:.1f}%) - confidence tinggi dipertahankan", 100 - oov_rate)
+        
+        # Menerapkan penyesuaian confidence
+        adjusted_confidence = base_confidence * confidence_multiplier
+        
+        # Membuat hasil prediksi
+        results = []
+        
+        # Menentukan apakah harus melaporkan deteksi berdasarkan adjusted confidence
+        if predicted_label == "Mengandung Alergen":
+            # PERBAIKAN: Deteksi alergen spesifik bahkan dengan confidence rendah
+            with PREDICTION_STAGE_SECONDS.time(stage="keyword_matching"):
+                specific_allergens = self._detect_specific_allergens(data_baru, adjusted_confidence)
+            
+            if specific_allergens:
+                # Tambahkan alergen spesifik
+                for allergen_name, (allergen_confidence, source_fields) in specific_allergens.items():
+                    final_confidence = max(allergen_confidence, 0.3)
+                    results.append(AllergenResult(
+                        allergen=allergen_name,
+                        confidence=float(final_confidence),
+                        detected=True,
+                        risk_level="",
+                        sources=source_fields
+                    ))
+            elif adjusted_confidence >= confidence_threshold:
+                # Fallback ke deteksi umum hanya jika confidence cukup tinggi
+                results.append(AllergenResult(
+                    allergen="Mengandung Alergen",
+                    confidence=float(adjusted_confidence),
+                    detected=True,
+                    risk_level=""  # Akan dihitung otomatis oleh validator
+                ))
+        
+        # Membuat metadata dengan informasi OOV
+        prediction_metadata = {
+            'input_ingredients': display_text,
+            'structured_input': data_baru,
+            'model_used': 'SVM + AdaBoost',
+            'model_version': 'SVM + AdaBoost dengan Cross Validation K=10 + OOV Handling',
+            'encoding_method': 'One-Hot Encoding (pd.get_dummies)',
+            'inference_engine': snapshot.engine_name(self.inference_engine),
+            'total_features': total_features,
+            'confidence_threshold': confidence_threshold,
+            'prediction_label': predicted_label,
+            'confidence_score': float(adjusted_confidence),
+            'cv_accuracy_mean': snapshot.cv_accuracy if snapshot.cv_accuracy else 0.937,
+            'processing_note': 'Model machine learning dengan penanganan Out-of-Vocabulary',
+            'cross_validation_k': 10,
+            'oov_analysis': {
+                'oov_rate': round(oov_rate, 2),
+                'field_recognition': field_recognition,
+                'encoding_recognition_rate': round(encoding_recognition_rate, 2),
+                'confidence_multiplier': confidence_multiplier,
+                'base_confidence': round(float(base_confidence), 4),
+                'adjusted_confidence': round(float(adjusted_confidence), 4)
+            }
+        }
+        
+        return results, prediction_metadata
+
     def predict_allergens(
         self, 
         ingredients_text: str = None,
@@ -298,173 +624,127 @@ class AllergenPredictor:
         Returns:
             Tuple berisi list AllergenResult dan metadata prediksi
         """
-        if not self.is_loaded:
-            api_logger.warning("⚠️ Model not loaded, loading now...")
-            self.load_and_train_model()
+        # Satu snapshot untuk seluruh request, meskipun model ditukar di tengah jalan
+        snapshot = self._current_snapshot()
         
         try:
-            # Persiapan data input
-            if ingredients_data:
-                data_baru = ingredients_data.copy()
-                display_text = f"{data_baru.get('nama_produk_makanan', '')}: {data_baru.get('bahan_utama', '')}, {data_baru.get('pemanis', '')}, {data_baru.get('lemak_minyak', '')}, {data_baru.get('penyedap_rasa', '')}"
-            else:
-                # Fallback jika hanya teks yang disediakan
-                data_baru = {
-                    'nama_produk_makanan': 'Produk Makanan',
-                    'bahan_utama': ingredients_text or '',
-                    'pemanis': 'Tidak Ada',
-                    'lemak_minyak': 'Tidak Ada', 
-                    'penyedap_rasa': 'Tidak Ada',
-                    'alergen': ''
-                }
-                display_text = ingredients_text or ''
-            
-            # Deteksi OOV sebelum prediksi
-            oov_rate, field_recognition = self._detect_oov_rate(data_baru)
-            
-            # Membuat DataFrame untuk input baru
-            df_baru = pd.DataFrame([data_baru])
-            
-            # One-hot encoding data baru
-            df_baru_encoded = pd.get_dummies(df_baru)
-            
-            # Sinkronisasi kolom (pastikan kolom sama dengan training)
-            for col in self.X_encoded.columns:
-                if col not in df_baru_encoded.columns:
-                    df_baru_encoded[col] = 0
-            
-            df_baru_encoded = df_baru_encoded[self.X_encoded.columns]
-            
-            # Evaluasi kualitas encoding data
-            non_zero_features = (df_baru_encoded != 0).sum().sum()
-            total_features = df_baru_encoded.shape[0] * df_baru_encoded.shape[1]
-            encoding_recognition_rate = (non_zero_features / total_features) * 100
-            
-            api_logger.info(f"🤖 Menggunakan model SVM + AdaBoost")
-            api_logger.info(f"🔍 Analisis OOV input: {oov_rate:.1f}% field tidak dikenal")
-            api_logger.info(f"🔢 Analisis encoding: {non_zero_features}/{total_features} fitur aktif ({encoding_recognition_rate:.1f}%)")
+            # Hasil untuk input + threshold + model yang sama diambil dari cache
+            cache_key = None
+            if ingredients_data and self.prediction_cache.enabled:
+                cache_key = self._cache_key(snapshot, ingredients_data, confidence_threshold)
+                cached = self.prediction_cache.get(cache_key)
+                if cached is not None:
+                    results, prediction_metadata = cached
+                    return list(results), dict(prediction_metadata)
+            
+            with PREDICTION_STAGE_SECONDS.time(stage="encode"):
+                # Persiapan data input
+                data_baru, display_text = self._prepare_input(ingredients_text, ingredients_data)
+                
+                # One-hot encoding via indeks fitur terkompilasi (tanpa DataFrame per request)
+                active_indices = snapshot.feature_encoder.encode(data_baru)
             
-            # Melakukan prediksi
-            prediksi = self.model.predict(df_baru_encoded)
-            probabilitas = self.model.predict_proba(df_baru_encoded)
+            log_detail("🤖 Menggunakan model SVM + AdaBoost (engine: {})", snapshot.engine_name(self.inference_engine))
             
-            # Konversi kembali ke label target
-            hasil_target = self.label_encoder.inverse_transform(prediksi)
+            with PREDICTION_STAGE_SECONDS.time(stage="scoring"):
+                # Melakukan prediksi
+                prediksi, probabilitas = self._score(snapshot, [active_indices])
+                
+                # Konversi kembali ke label target
+                hasil_target = snapshot.label_encoder.inverse_transform(prediksi)
             base_confidence = probabilitas[0][prediksi[0]]
             
-            # Penyesuaian confidence dinamis berdasarkan OOV
-            if oov_rate >= 90:
-                # OOV hampir lengkap - confidence sangat rendah
-                confidence_multiplier = 0.2
-                api_logger.warning(f"⚠️ OOV kritis terdeteksi ({oov_rate:.1f}%) - confidence sangat dikurangi")
-            elif oov_rate >= 70:
-                # OOV tinggi - confidence rendah
-                confidence_multiplier = 0.4
-                api_logger.warning(f"⚠️ OOV tinggi terdeteksi ({oov_rate:.1f}%) - confidence dikurangi")
-            elif oov_rate >= 50:
-                # OOV sedang - pengurangan confidence sedang
-                confidence_multiplier = 0.7
-                api_logger.warning(f"⚠️ OOV sedang terdeteksi ({oov_rate:.1f}%) - confidence sedang dikurangi")
-            elif oov_rate >= 25:
-                # OOV rendah - pengurangan confidence sedikit
-                confidence_multiplier = 0.9
-                api_logger.info(f"ℹ️ OOV rendah terdeteksi ({oov_rate:.1f}%) - confidence sedikit dikurangi")
-            else:
-                # Pengenalan baik - pengurangan confidence minimal
-                confidence_multiplier = 0.95
-                api_logger.info(f"✅ Pengenalan input baik ({100-oov_rate:.1f}%) - confidence tinggi dipertahankan")
-            
-            # Menerapkan penyesuaian confidence
-            adjusted_confidence = base_confidence * confidence_multiplier
-            akurasi_prediksi = round(adjusted_confidence * 100, 2)
-            
-            # Membuat hasil prediksi
-            results = []
-            predicted_label = hasil_target[0]
-            
-            # Menentukan apakah harus melaporkan deteksi berdasarkan adjusted confidence
-            if predicted_label == "Mengandung Alergen":
-                # PERBAIKAN: Deteksi alergen spesifik bahkan dengan confidence rendah
-                specific_allergens = self._detect_specific_allergens(data_baru, adjusted_confidence)
-                
-                if specific_allergens:
-                    # Tambahkan alergen spesifik
-                    for allergen_name, (allergen_confidence, source_fields) in specific_allergens.items():
-                        final_confidence = max(allergen_confidence, 0.3)
-                        results.append(AllergenResult(
-                            allergen=allergen_name,
-                            confidence=float(final_confidence),
-                            detected=True,
-                            risk_level="",
-                            sources=source_fields
-                        ))
-                elif adjusted_confidence >= confidence_threshold:
-                    # Fallback ke deteksi umum hanya jika confidence cukup tinggi
-                    results.append(AllergenResult(
-                        allergen="Mengandung Alergen",
-                        confidence=float(adjusted_confidence),
-                        detected=True,
-                        risk_level=""  # Akan dihitung otomatis oleh validator
-                    ))
+            results, prediction_metadata = self._build_prediction(
+                snapshot, data_baru, display_text, active_indices,
+                hasil_target[0], base_confidence, confidence_threshold
+            )
             
-            # Membuat metadata dengan informasi OOV
-            prediction_metadata = {
-                'input_ingredients': display_text,
-                'structured_input': data_baru,
-                'model_used': 'SVM + AdaBoost',
-                'model_version': 'SVM + AdaBoost dengan Cross Validation K=10 + OOV Handling',
-                'encoding_method': 'One-Hot Encoding (pd.get_dummies)',
-                'total_features': self.X_encoded.shape[1],
-                'confidence_threshold': confidence_threshold,
-                'prediction_label': predicted_label,
-                'confidence_score': float(adjusted_confidence),
-                'cv_accuracy_mean': self.cv_accuracy if self.cv_accuracy else 0.937,
-                'processing_note': 'Model machine learning dengan penanganan Out-of-Vocabulary',
-                'cross_validation_k': 10,
-                'oov_analysis': {
-                    'oov_rate': round(oov_rate, 2),
-                    'field_recognition': field_recognition,
-                    'encoding_recognition_rate': round(encoding_recognition_rate, 2),
-                    'confidence_multiplier': confidence_multiplier,
-                    'base_confidence': round(float(base_confidence), 4),
-                    'adjusted_confidence': round(float(adjusted_confidence), 4)
-                }
-            }
+            if cache_key is not None:
+                self.prediction_cache.put(cache_key, (results, prediction_metadata))
             
-            return results, prediction_metadata
+            return list(results), dict(prediction_metadata)
             
         except Exception as e:
             log_error(e, "Prediksi alergen")
             raise RuntimeError(f"Prediksi gagal: {str(e)}")
 
+    def predict_allergens_batch(
+        self,
+        items: List[Dict[str, str]],
+        confidence_thresholds: List[float]
+    ) -> List[Union[Tuple[List[AllergenResult], Dict], Exception]]:
+        """
+        Melakukan prediksi alergen untuk banyak input sekaligus
+
+        Semua input di-encode menjadi satu matriks sehingga model hanya
+        dipanggil sekali (predict + predict_proba) untuk seluruh batch.
+
+        Args:
+            items: List data bahan terstruktur (format to_model_input())
+            confidence_thresholds: Ambang batas confidence per item
+
+        Returns:
+            List sesuai urutan input, berisi (results, metadata) atau Exception
+            untuk item yang gagal diproses
+        """
+        snapshot = self._current_snapshot()
+
+        outcomes: List[Union[Tuple[List[AllergenResult], Dict], Exception, None]] = [None] * len(items)
+
+        # Item yang sudah ada di cache tidak perlu ikut di-scoring
+        cache_keys: List[Optional[tuple]] = [None] * len(items)
+        pending: List[int] = []
+        for i, item in enumerate(items):
+            if self.prediction_cache.enabled:
+                cache_keys[i] = self._cache_key(snapshot, item, confidence_thresholds[i])
+                cached = self.prediction_cache.get(cache_keys[i])
+                if cached is not None:
+                    outcomes[i] = (list(cached[0]), dict(cached[1]))
+                    continue
+            pending.append(i)
+
+        if not pending:
+            return outcomes
+
+        try:
+            prepared = [self._prepare_input(ingredients_data=items[i]) for i in pending]
+            index_rows = [snapshot.feature_encoder.encode(data_baru) for data_baru, _ in prepared]
+
+            api_logger.info(f"🤖 Menggunakan model SVM + AdaBoost untuk batch {len(pending)}/{len(items)} item (engine: {snapshot.engine_name(self.inference_engine)})")
+
+            prediksi, probabilitas = self._score(snapshot, index_rows)
+            hasil_target = snapshot.label_encoder.inverse_transform(prediksi)
+        except Exception as e:
+            log_error(e, "Prediksi alergen batch")
+            raise RuntimeError(f"Prediksi batch gagal: {str(e)}")
+
+        for row, i in enumerate(pending):
+            data_baru, display_text = prepared[row]
+            try:
+                results, prediction_metadata = self._build_prediction(
+                    snapshot, data_baru, display_text, index_rows[row],
+                    hasil_target[row], probabilitas[row][prediksi[row]], confidence_thresholds[i]
+                )
+                if cache_keys[i] is not None:
+                    self.prediction_cache.put(cache_keys[i], (results, prediction_metadata))
+                outcomes[i] = (list(results), dict(prediction_metadata))
+            except Exception as e:
+                log_error(e, f"Prediksi alergen batch item {i}")
+                outcomes[i] = RuntimeError(f"Prediksi gagal: {str(e)}")
+        return outcomes
+
     def _detect_specific_allergens(
         self, input_data: Dict[str, str], base_confidence: float
     ) -> Dict[str, Tuple[float, List[str]]]:
         """
         Deteksi alergen spesifik berdasarkan keyword matching pada bahan-bahan input.
-        Menggunakan regex word-boundary agar tidak ada false positive dari substring
+        Memakai automaton Aho-Corasick dari lexicon berversi dengan semantik
+        word-boundary agar tidak ada false positive dari substring
         (contoh: 'teri' tidak boleh cocok dengan 'terigu').
 
         Returns:
             Dict mapping allergen name → (confidence, [source_field_names])
         """
-        import re
-
-        detected_allergens: Dict[str, Tuple[float, List[str]]] = {}
-
-        allergen_patterns = {
-            'Kacang':         ['kacang', 'almond', 'pinus', 'walnut', 'pecan', 'nut'],
-            'Produk Susu':    ['susu', 'keju', 'mentega', 'butter', 'cream', 'dairy', 'yogurt', 'latte'],
-            'Gandum':         ['terigu', 'gandum', 'gluten', 'wheat', 'flour', 'roti', 'bread', 'pasta', 'mie', 'noodle'],
-            'Telur':          ['telur', 'egg'],
-            'Ikan':           ['ikan', 'salmon', 'tuna', 'sarden', 'ikan teri', 'cakalang', 'tongkol'],
-            'Kerang-Kerangan':['udang', 'kerang', 'lobster', 'crab', 'shrimp', 'kepiting', 'cumi'],
-            'Kedelai':        ['kedelai', 'soy', 'tofu', 'tempe', 'soya', 'tahu'],
-            'Seledri':        ['seledri', 'celery'],
-            'Wijen':          ['wijen', 'sesame'],
-            'Kacang Tanah':   ['kacang tanah', 'peanut'],
-        }
-
         field_map = {
             'Nama Produk Makanan': str(input_data.get('Nama Produk Makanan', '')).lower(),
             'Bahan Utama':         str(input_data.get('Bahan Utama', '')).lower(),
@@ -474,79 +754,60 @@ class AllergenPredictor:
             'Alergen':             str(input_data.get('Alergen', '')).lower(),
         }
 
-        all_ingredients = ' '.join(field_map.values())
-        bahan_utama_text = field_map['Bahan Utama']
-
-        def matches(pattern: str, text: str) -> bool:
-            """Cocokkan pattern sebagai kata utuh (word boundary) untuk cegah false positive."""
-            return bool(re.search(r'\b' + re.escape(pattern) + r'\b', text))
-
-        for allergen, patterns in allergen_patterns.items():
-            in_main_ingredient = False
-            source_fields: List[str] = []
-
-            for pattern in patterns:
-                if matches(pattern, all_ingredients):
-                    for field_name, field_text in field_map.items():
-                        if matches(pattern, field_text) and field_name not in source_fields:
-                            source_fields.append(field_name)
-                    if matches(pattern, bahan_utama_text):
-                        in_main_ingredient = True
-
-            if source_fields:
-                allergen_confidence = 0.85 if in_main_ingredient else 0.70
-                detected_allergens[allergen] = (allergen_confidence, source_fields)
+        detected_allergens: Dict[str, Tuple[float, List[str]]] = {}
+        for allergen, source_fields in self.keyword_store.get().find(field_map).items():
+            allergen_confidence = 0.85 if 'Bahan Utama' in source_fields else 0.70
+            detected_allergens[allergen] = (allergen_confidence, source_fields)
 
-        api_logger.info(f"🎯 Alergen spesifik terdeteksi: {list(detected_allergens.keys())}")
+        log_detail("🎯 Alergen spesifik terdeteksi: {}", list(detected_allergens))
         return detected_allergens
 
-    def retrain_with_additional_data(self, additional_records: List[Dict]) -> Dict:
+    def retrain_with_additional_data(
+        self,
+        additional_data: Optional[pd.DataFrame] = None,
+        progress: Optional[ProgressCallback] = None,
+        should_cancel: Optional[CancelCheck] = None
+    ) -> Dict:
         """
-        Retrain model dengan data training asli (399 records) + records baru dari database.
+        Retrain model dengan data training asli (399 records) + riwayat prediksi dari database.
 
         Args:
-            additional_records: List of prediction records from the database
+            additional_data: Baris riwayat prediksi (kolom DB); jika None,
+                diambil inkremental dari MySQL lewat prediction_rows.sync()
+            progress: Optional callback progress(stage, **info) per tahap/fold
+            should_cancel: Optional callback; jika True training dihentikan
 
         Returns:
             Dict with new accuracy and sample counts
+
+        Raises:
+            TrainingCancelled: Jika pembatalan diminta sebelum model disimpan
         """
-        try:
-            # Locate training dataset
-            possible_paths = [
-                Path("data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("../data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-                Path("../../data/raw/Dataset Bahan Makanan & Alergen.xlsx"),
-            ]
-            dataset_path = next((p for p in possible_paths if p.exists()), None)
-            if not dataset_path:
-                raise FileNotFoundError("Dataset training tidak ditemukan")
+        def report(stage: str, **info) -> None:
+            if progress is not None:
+                progress(stage, **info)
 
-            df_original = pd.read_excel(dataset_path)
+        try:
+            report("loading_dataset")
+            df_original = training_dataset.load()
             api_logger.info(f"📂 Dataset asli dimuat: {len(df_original)} records")
 
-            # Convert DB records to training format
-            new_rows = []
-            for record in additional_records:
-                allergens_text = record.get('predicted_allergens', '') or ''
-                prediksi = 'Mengandung Alergen' if record.get('allergen_count', 0) > 0 else 'Tidak Mengandung Alergen'
-                new_rows.append({
-                    'Nama Produk Makanan': record.get('product_name', ''),
-                    'Bahan Utama': record.get('bahan_utama', ''),
-                    'Pemanis': record.get('pemanis', ''),
-                    'Lemak/Minyak': record.get('lemak_minyak', ''),
-                    'Penyedap Rasa': record.get('penyedap_rasa', ''),
-                    'Alergen': allergens_text,
-                    'Prediksi': prediksi
-                })
+            # Riwayat prediksi: hanya baris di atas watermark yang ditarik dari DB
+            fetched = None
+            if additional_data is None:
+                additional_data, fetched = prediction_rows.sync()
+            report("loading_dataset", db_records=len(additional_data), fetched_records=fetched)
 
-            if new_rows:
-                df_new = pd.DataFrame(new_rows)
+            if len(additional_data):
+                df_new = prediction_rows_to_training(additional_data)
                 df_combined = pd.concat([df_original, df_new], ignore_index=True)
-                api_logger.info(f"➕ Menambahkan {len(new_rows)} records baru ke training data")
+                api_logger.info(f"➕ Menambahkan {len(df_new)} records baru ke training data")
             else:
                 df_combined = df_original
 
             # Retrain on combined data
+            check_cancelled(should_cancel)
+            report("encoding")
             fitur = ['Nama Produk Makanan', 'Bahan Utama', 'Pemanis', 'Lemak/Minyak', 'Penyedap Rasa', 'Alergen']
 
             # Deduplikasi agar akurasi CV tidak inflate
@@ -557,52 +818,75 @@ class AllergenPredictor:
             X = df_combined[fitur]
             y = df_combined['Prediksi']
 
-            # Update training categories for OOV detection
-            for col in fitur:
-                self.training_categories[col.lower().replace('/', '_').replace(' ', '_')] = set(df_combined[col].unique())
+            # Training categories for OOV detection (snapshot baru, bukan diubah di tempat)
+            training_categories = {
+                col.lower().replace('/', '_').replace(' ', '_'): set(df_combined[col].unique())
+                for col in fitur
+            }
 
-            self.X_encoded = pd.get_dummies(X)
-            self.label_encoder = LabelEncoder()
-            self.y_encoded = self.label_encoder.fit_transform(y)
+            X_encoded = pd.get_dummies(X)
+            feature_encoder = FeatureEncoder(fitur, X_encoded.columns)
+            label_encoder = LabelEncoder()
+            y_encoded = label_encoder.fit_transform(y)
 
             svm_base = SVC(kernel='linear', probability=True, random_state=42)
-            self.model = AdaBoostClassifier(estimator=svm_base, n_estimators=50, random_state=42)
+            model = AdaBoostClassifier(estimator=svm_base, n_estimators=50, random_state=42)
 
             k = 10
-            cv = StratifiedKFold(n_splits=k, shuffle=True, random_state=42)
-            cv_scores = cross_val_score(self.model, self.X_encoded, self.y_encoded, cv=cv, scoring='accuracy')
-            self.cv_accuracy = cv_scores.mean()
+            report("cross_validation", fold=0, total_folds=k)
+            cv_scores, model = cross_validate_and_fit(
+                model, X_encoded, y_encoded, n_splits=k,
+                n_jobs=settings.training_n_jobs, progress=progress, should_cancel=should_cancel
+            )
+            cv_accuracy = cv_scores.mean()
 
-            self.model.fit(self.X_encoded, self.y_encoded)
+            check_cancelled(should_cancel)
+            report("exporting_engine")
+            linear_engine = self._build_linear_engine(model, X_encoded.to_numpy(dtype=np.float64))
+            check_cancelled(should_cancel)
 
             # Persist new accuracy to database
             try:
                 from ...database.allergen_database import database_manager
                 database_manager.save_model_performance({
                     'model_type': 'SVM+AdaBoost',
-                    'accuracy': self.cv_accuracy,
-                    'cv_score': self.cv_accuracy,
-                    'train_samples': self.X_encoded.shape[0],
+                    'accuracy': cv_accuracy,
+                    'cv_score': cv_accuracy,
+                    'train_samples': X_encoded.shape[0],
                     'test_samples': 0,
-                    'feature_count': self.X_encoded.shape[1]
+                    'feature_count': X_encoded.shape[1]
                 })
             except Exception as e:
                 api_logger.warning(f"⚠️ Could not save retrain performance: {e}")
 
-            self._n_samples = self.X_encoded.shape[0]
-            self.save_model()
+            snapshot = ModelSnapshot.create(
+                model=model,
+                label_encoder=label_encoder,
+                feature_encoder=feature_encoder,
+                linear_engine=linear_engine,
+                training_categories=training_categories,
+                cv_accuracy=cv_accuracy,
+                n_samples=X_encoded.shape[0],
+                training_date=datetime.now().isoformat()
+            )
+            report("saving")
+            self._save_and_publish(snapshot)
 
             result = {
-                'cv_accuracy': round(float(self.cv_accuracy), 4),
-                'accuracy_pct': f"{self.cv_accuracy * 100:.1f}%",
+                'cv_accuracy': round(float(cv_accuracy), 4),
+                'accuracy_pct': f"{cv_accuracy * 100:.1f}%",
                 'total_samples': len(df_combined),
                 'original_samples': len(df_original),
-                'new_samples': len(new_rows),
-                'total_features': self.X_encoded.shape[1]
+                'new_samples': len(additional_data),
+                'fetched_records': fetched,
+                'total_features': X_encoded.shape[1]
             }
             api_logger.info(f"✅ Retrain selesai: akurasi={result['accuracy_pct']}, total={result['total_samples']} records")
             return result
 
+        except TrainingCancelled:
+            api_logger.info("🛑 Retrain dibatalkan sebelum model baru disimpan")
+            raise
         except Exception as e:
             log_error(e, "Retrain model")
             raise RuntimeError(f"Retrain gagal: {str(e)}")
@@ -644,19 +928,23 @@ class AllergenPredictor:
     
     def get_model_info(self) -> Dict:
         """Mengambil informasi tentang model yang telah dilatih"""
-        if not self.is_loaded:
+        snapshot = self.snapshot
+        if snapshot is None:
             return {"loaded": False, "error": "Model belum dimuat"}
         
         info = {
             "loaded": True,
             "model_type": "SVM + AdaBoost",
             "encoding_method": "One-Hot Encoding (pd.get_dummies) + OOV Handling",
-            "n_features": self.X_encoded.shape[1] if self.X_encoded is not None else "Tidak diketahui",
-            "n_samples": self._n_samples or (self.X_encoded.shape[0] if self.X_encoded is not None else "Tidak diketahui"),
-            "cv_accuracy_mean": self.cv_accuracy if self.cv_accuracy else "Tidak diketahui",
+            "inference_engine": snapshot.engine_name(self.inference_engine),
+            "model_fingerprint": snapshot.fingerprint,
+            "model_version": snapshot.version,
+            "n_features": snapshot.n_features,
+            "n_samples": snapshot.n_samples or "Tidak diketahui",
+            "cv_accuracy_mean": snapshot.cv_accuracy if snapshot.cv_accuracy else "Tidak diketahui",
             "cross_validation_k": 10,
             "training_date": "Pelatihan real-time dari dataset",
-            "label_classes": self.label_encoder.classes_.tolist() if self.label_encoder else ["Mengandung Alergen", "Tidak Mengandung Alergen"],
+            "label_classes": snapshot.label_encoder.classes_.tolist() if snapshot.label_encoder is not None else ["Mengandung Alergen", "Tidak Mengandung Alergen"],
             "dataset_source": "data/raw/Dataset Bahan Makanan & Alergen.xlsx",
             "supported_allergens": self.get_supported_allergens(),
             "note": "Model SVM + AdaBoost dengan penanganan Out-of-Vocabulary untuk input yang tidak dikenal",
@@ -684,5 +972,8 @@ class AllergenPredictor:
 # Membuat instance predictor global
 predictor = AllergenPredictor()
 
+# Pemantau versi model aktif (dijalankan dari lifespan di setiap worker)
+model_watcher = ModelWatcher(predictor.registry, predictor.reload_if_changed, settings.model_watch_interval)
+
 # Export
-__all__ = ["AllergenPredictor", "predictor"]
+__all__ = ["AllergenPredictor", "predictor", "model_watcher"]
@@ -0,0 +1,104 @@
+"""
+Snapshot Model Immutable
+
+Semua state yang dibutuhkan satu prediksi (model, label encoder, feature
+encoder, engine linear, kategori training untuk OOV, metadata) digabung
+dalam satu objek yang tidak pernah diubah setelah dibuat.
+
+Training dan reload membangun snapshot baru di samping snapshot lama, lalu
+mempublikasikannya dengan satu assignment referensi. Setiap request
+mengambil referensi snapshot sekali di awal dan memakainya sampai selesai,
+sehingga tidak pernah memasangkan encoder baru dengan model lama dan tidak
+perlu lock di jalur inferensi.
+"""
+
+import hashlib
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from .encoder import FeatureEncoder
+from .linear_engine import LinearEnsembleEngine
+
+
+@dataclass(frozen=True)
+class ModelSnapshot:
+    """
+    Satu versi model lengkap yang siap dipakai untuk inferensi
+
+    Attributes:
+        model: AdaBoost(SVC) terlatih (None jika dimuat dari artifact ringkas)
+        label_encoder: LabelEncoder target
+        feature_encoder: Encoder one-hot terkompilasi
+        linear_engine: Engine linear hasil ekspor (None jika tidak tersedia)
+        training_categories: Field → frozenset nilai training (deteksi OOV)
+        cv_accuracy: Rata-rata akurasi cross validation
+        n_samples: Jumlah sampel training
+        training_date: Waktu training (ISO)
+        fingerprint: Hash metadata model, dipakai sebagai bagian key cache
+        version: ID versi di registry (None jika belum disimpan)
+    """
+
+    model: Any
+    label_encoder: Any
+    feature_encoder: FeatureEncoder
+    linear_engine: Optional[LinearEnsembleEngine]
+    training_categories: Mapping[str, frozenset]
+    cv_accuracy: Optional[float]
+    n_samples: int
+    training_date: Optional[str]
+    fingerprint: str
+    version: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        model,
+        label_encoder,
+        feature_encoder: FeatureEncoder,
+        linear_engine: Optional[LinearEnsembleEngine],
+        training_categories: Dict[str, Iterable],
+        cv_accuracy: Optional[float],
+        n_samples: int,
+        training_date: Optional[str],
+        version: Optional[str] = None
+    ) -> "ModelSnapshot":
+        """Bangun snapshot baru; kategori dibekukan dan fingerprint dihitung di sini"""
+        cv_accuracy = float(cv_accuracy) if cv_accuracy is not None else None
+        raw = f"{training_date}|{feature_encoder.n_features}|{n_samples}|{cv_accuracy}"
+        return cls(
+            model=model,
+            label_encoder=label_encoder,
+            feature_encoder=feature_encoder,
+            linear_engine=linear_engine,
+            training_categories=MappingProxyType({
+                field: frozenset(values) for field, values in training_categories.items()
+            }),
+            cv_accuracy=cv_accuracy,
+            n_samples=int(n_samples),
+            training_date=training_date,
+            fingerprint=hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16],
+            version=version
+        )
+
+    def with_version(self, version: Optional[str]) -> "ModelSnapshot":
+        """Salinan snapshot dengan ID versi registry"""
+        return replace(self, version=version)
+
+    @property
+    def n_features(self) -> int:
+        return self.feature_encoder.n_features
+
+    @property
+    def feature_names(self) -> Tuple[str, ...]:
+        return tuple(self.feature_encoder.feature_names)
+
+    def engine_name(self, preferred: str) -> str:
+        """Engine yang benar-benar dipakai untuk preferensi settings.inference_engine"""
+        if self.linear_engine is not None and (preferred == "linear" or self.model is None):
+            return "linear"
+        return "sklearn"
+
+
+# Export
+__all__ = ["ModelSnapshot"]
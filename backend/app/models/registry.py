@@ -0,0 +1,290 @@
+"""
+Registry Model Berversi di Disk
+
+Setiap model hasil training disimpan sebagai direktori versi yang tidak
+pernah diubah lagi (immutable) di bawah settings.model_dir:
+
+    saved_models/
+        CURRENT                        ← berisi ID versi aktif
+        versions/
+            20250811T103000-1a2b3c4d/  ← svm_adaboost_model.pkl, label_encoder.pkl, ...
+            20250812T090000-5e6f7a8b/
+
+Versi baru ditulis ke direktori staging, di-rename menjadi direktori versi,
+lalu dipublikasikan dengan mengganti file CURRENT secara atomik
+(os.replace). Worker yang memuat model selalu membaca satu direktori versi
+yang lengkap, tidak pernah campuran file lama dan baru. Semua worker
+mendeteksi versi baru dengan memantau mtime file CURRENT.
+
+File model lama yang tersimpan langsung di model_dir (format sebelum
+registry) tetap bisa dimuat selama belum ada CURRENT.
+"""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from ..core.logger import api_logger
+
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+METADATA_FILE = "model_metadata.json"
+LEGACY_VERSION = "legacy"
+
+
+class ModelRegistry:
+    """
+    Registry versi model dengan publish atomik dan rollback
+
+    Args:
+        root: Direktori registry (settings.model_dir)
+        keep_versions: Jumlah versi terbaru yang dipertahankan saat prune
+    """
+
+    def __init__(self, root: Union[str, Path], keep_versions: int = 5):
+        self.root = Path(root)
+        self.versions_dir = self.root / VERSIONS_DIR
+        self.pointer_path = self.root / POINTER_FILE
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fsync_dir(path: Path) -> None:
+        """Pastikan entri direktori (rename) tersimpan ke disk"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def current_version(self) -> Optional[str]:
+        """ID versi aktif, None jika registry belum pernah dipublikasikan"""
+        try:
+            version = self.pointer_path.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def pointer_mtime(self) -> Optional[float]:
+        """mtime file CURRENT (murah, dipakai watcher di setiap worker)"""
+        try:
+            return os.stat(self.pointer_path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def version_path(self, version: str) -> Path:
+        """Direktori sebuah versi"""
+        if not version or "/" in version or "\\" in version or version.startswith("."):
+            raise ValueError(f"ID versi model tidak valid: {version}")
+        if version == LEGACY_VERSION:
+            return self.root
+        return self.versions_dir / version
+
+    def resolve(self, version: Optional[str] = None) -> Optional[Path]:
+        """
+        Direktori model yang harus dimuat
+
+        Tanpa argumen: versi aktif, atau file lama di root jika registry
+        belum dipakai. None jika tidak ada model sama sekali.
+        """
+        version = version or self.current_version()
+        if version is not None:
+            path = self.version_path(version)
+            return path if path.is_dir() else None
+        if (self.root / "svm_adaboost_model.pkl").exists():
+            return self.root
+        return None
+
+    def save_version(self, writer: Callable[[Path], None], tag: str = "") -> str:
+        """
+        Tulis model baru sebagai versi immutable lalu publikasikan
+
+        Args:
+            writer: Fungsi yang menulis seluruh file model ke direktori yang diberikan
+            tag: Akhiran ID versi (misalnya potongan fingerprint model)
+
+        Returns:
+            ID versi baru (sudah aktif)
+        """
+        version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        if tag:
+            version = f"{version}-{tag}"
+
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        staging = self.versions_dir / f".staging-{version}-{uuid.uuid4().hex[:8]}"
+        staging.mkdir()
+        try:
+            writer(staging)
+            for item in staging.iterdir():
+                with open(item, "rb") as f:
+                    os.fsync(f.fileno())
+            os.rename(staging, self.versions_dir / version)
+            self._fsync_dir(self.versions_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.publish(version)
+        self.prune()
+        return version
+
+    def publish(self, version: str) -> None:
+        """Jadikan versi aktif dengan mengganti file CURRENT secara atomik"""
+        if not self.version_path(version).is_dir():
+            raise ValueError(f"Versi model {version} tidak ditemukan")
+
+        with self._lock:
+            tmp = self.root / f".{POINTER_FILE}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(version)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.pointer_path)
+            self._fsync_dir(self.root)
+
+        api_logger.info(f"📌 Versi model {version} dipublikasikan")
+
+    def list_versions(self) -> List[Dict]:
+        """Daftar versi (terbaru dulu) beserta metadata training-nya"""
+        current = self.current_version()
+        versions = []
+        if self.versions_dir.is_dir():
+            for path in self.versions_dir.iterdir():
+                if not path.is_dir() or path.name.startswith("."):
+                    continue
+                metadata = {}
+                try:
+                    with open(path / METADATA_FILE) as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    pass
+                versions.append({
+                    "version": path.name,
+                    "is_current": path.name == current,
+                    "training_date": metadata.get("training_date"),
+                    "cv_accuracy": metadata.get("cv_accuracy"),
+                    "n_samples": metadata.get("n_samples"),
+                    "n_features": metadata.get("n_features")
+                })
+        versions.sort(key=lambda v: v["version"], reverse=True)
+        return versions
+
+    def rollback(self, version: Optional[str] = None) -> str:
+        """
+        Aktifkan kembali versi sebelumnya
+
+        Args:
+            version: Versi tujuan; default versi tepat sebelum versi aktif
+
+        Returns:
+            ID versi yang sekarang aktif
+
+        Raises:
+            ValueError: Jika versi tujuan tidak ada
+        """
+        if version is None:
+            current = self.current_version()
+            older = [v["version"] for v in self.list_versions() if current is None or v["version"] < current]
+            if not older:
+                raise ValueError("Tidak ada versi model sebelumnya untuk rollback")
+            version = older[0]
+
+        self.publish(version)
+        api_logger.info(f"⏪ Rollback model ke versi {version}")
+        return version
+
+    def prune(self) -> None:
+        """Hapus versi lama di luar keep_versions terbaru (versi aktif selalu disimpan)"""
+        if self.keep_versions <= 0:
+            return
+        current = self.current_version()
+        for info in self.list_versions()[self.keep_versions:]:
+            if info["version"] != current:
+                shutil.rmtree(self.versions_dir / info["version"], ignore_errors=True)
+
+
+class ModelWatcher:
+    """
+    Thread latar yang memuat ulang model saat versi aktif berubah
+
+    Hanya mtime file CURRENT yang dicek setiap interval, jadi biayanya satu
+    stat() per interval per worker. Jika berubah, on_change(versi) dipanggil;
+    on_change mengembalikan True jika versi tersebut sekarang terpakai
+    (termasuk jika memang sudah terpakai). mtime baru dicatat setelah itu,
+    jadi reload yang gagal (artifact belum utuh, checksum salah) dicoba lagi
+    pada interval berikutnya.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        on_change: Callable[[str], bool],
+        interval: float = 2.0
+    ):
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtime: Optional[float] = None
+        self._failed_mtime: Optional[float] = None
+
+    def start(self) -> None:
+        """Mulai memantau (dipanggil dari lifespan setelah model dimuat)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        # mtime sengaja tidak dibaca di sini: cek pertama membandingkan versi
+        # CURRENT dengan versi yang dimuat, jadi versi yang dipublikasikan
+        # antara muat awal dan start() tetap terdeteksi
+        self._mtime = None
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Hentikan thread pemantau"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+    def check(self) -> bool:
+        """Cek pointer sekali; True jika on_change dipanggil"""
+        mtime = self.registry.pointer_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        version = self.registry.current_version()
+        if version is None:
+            return False
+        try:
+            loaded = self.on_change(version)
+            error = None
+        except Exception as e:
+            loaded, error = False, e
+        if loaded:
+            self._mtime = mtime
+            self._failed_mtime = None
+        elif mtime != self._failed_mtime:
+            # Sekali per perubahan CURRENT, percobaan ulang tidak memenuhi log
+            self._failed_mtime = mtime
+            reason = f": {error}" if error is not None else ""
+            api_logger.warning(f"⚠️ Gagal memuat ulang model versi {version}{reason}, model lama tetap dipakai, dicoba lagi setiap {self.interval:g} detik")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+# Export
+__all__ = ["ModelRegistry", "ModelWatcher", "LEGACY_VERSION"]
@@ -0,0 +1 @@
+# Model training pipeline and background jobs
@@ -0,0 +1,158 @@
+"""
+Cross Validation Paralel untuk Pipeline Training
+
+Pengganti cross_val_score: setiap fold (dan fit model final) dijalankan
+sebagai task terpisah di process pool joblib sehingga seluruh core terpakai.
+Matriks fitur ditulis sekali ke file .npy lalu dibuka worker dengan
+mmap_mode='r', jadi data dibagi lewat page cache, bukan disalin via pickle
+untuk setiap task.
+
+Progres dilaporkan setiap kali satu fold selesai dan training bisa dibatalkan
+di antara fold. Skor identik dengan cross_val_score(scoring='accuracy').
+"""
+
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from joblib import Parallel, delayed, effective_n_jobs
+from joblib.externals.loky import get_reusable_executor
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
+
+from ...core.logger import api_logger
+
+# Callback progres: progress(stage, **info)
+ProgressCallback = Callable[..., None]
+CancelCheck = Callable[[], bool]
+
+# Nomor task untuk fit model final di seluruh data
+_FINAL_FIT = 0
+
+
+class TrainingCancelled(Exception):
+    """Training dihentikan karena permintaan pembatalan"""
+
+
+def check_cancelled(should_cancel: Optional[CancelCheck]) -> None:
+    """Lempar TrainingCancelled jika pembatalan sudah diminta"""
+    if should_cancel is not None and should_cancel():
+        raise TrainingCancelled("Training dibatalkan")
+
+
+def _run_task(estimator, X_path: str, y: np.ndarray, task: int, train_idx, test_idx):
+    """
+    Dijalankan di worker: fit satu fold (atau model final) dari X ter-memmap
+
+    Returns:
+        Tuple (nomor task, akurasi atau None, model final atau None, detik)
+    """
+    start = time.perf_counter()
+    X = np.load(X_path, mmap_mode='r')
+
+    if train_idx is None:
+        model = clone(estimator).fit(np.asarray(X), y)
+        return task, None, model, time.perf_counter() - start
+
+    model = clone(estimator).fit(X[train_idx], y[train_idx])
+    score = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+    return task, score, None, time.perf_counter() - start
+
+
+def cross_validate_and_fit(
+    estimator,
+    X,
+    y,
+    n_splits: int = 10,
+    random_state: int = 42,
+    n_jobs: Optional[int] = -1,
+    refit: bool = True,
+    progress: Optional[ProgressCallback] = None,
+    should_cancel: Optional[CancelCheck] = None
+) -> Tuple[np.ndarray, Optional[object]]:
+    """
+    Stratified K-Fold cross validation + fit final secara paralel
+
+    Args:
+        estimator: Estimator sklearn (di-clone untuk setiap task)
+        X: Matriks fitur (DataFrame atau array)
+        y: Label ter-encode
+        n_splits: Jumlah fold
+        n_jobs: Jumlah proses worker (-1 = semua core, 1 = sekuensial)
+        refit: Jika True, model final dilatih di seluruh data dalam pool yang sama
+        progress: Dipanggil setiap kali satu fold selesai
+        should_cancel: Dicek sebelum mulai dan setiap kali satu task selesai
+
+    Returns:
+        Tuple (akurasi per fold, model final atau None)
+
+    Raises:
+        TrainingCancelled: Jika pembatalan diminta
+    """
+    check_cancelled(should_cancel)
+
+    y = np.asarray(y)
+    X_array = np.ascontiguousarray(X, dtype=np.float64)
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    folds = list(cv.split(X_array, y))
+
+    # Fit final paling lama, jadi dijadwalkan pertama
+    tasks = [(_FINAL_FIT, None, None)] if refit else []
+    tasks += [(fold, train_idx, test_idx) for fold, (train_idx, test_idx) in enumerate(folds, start=1)]
+
+    n_workers = min(effective_n_jobs(n_jobs), len(tasks))
+    scores = np.zeros(n_splits)
+    fold_times = {}
+    final_model = None
+
+    with tempfile.TemporaryDirectory(prefix="allerscan-cv-") as tmp_dir:
+        X_path = str(Path(tmp_dir) / "X.npy")
+        np.save(X_path, X_array)
+        del X_array
+
+        wall_start = time.perf_counter()
+        results = Parallel(n_jobs=n_workers, return_as="generator_unordered", max_nbytes=None)(
+            delayed(_run_task)(estimator, X_path, y, task, train_idx, test_idx)
+            for task, train_idx, test_idx in tasks
+        )
+        try:
+            for task, score, model, elapsed in results:
+                fold_times[task] = elapsed
+                if task == _FINAL_FIT:
+                    final_model = model
+                    api_logger.info(f"⏱️ Fit model final selesai dalam {elapsed:.2f}s")
+                else:
+                    scores[task - 1] = score
+                    api_logger.info(f"⏱️ Fold {task}/{n_splits}: akurasi={score:.3f}, {elapsed:.2f}s")
+                    if progress is not None:
+                        progress(
+                            "cross_validation",
+                            fold=sum(1 for t in fold_times if t != _FINAL_FIT),
+                            total_folds=n_splits
+                        )
+                check_cancelled(should_cancel)
+        finally:
+            # Membatalkan task yang belum berjalan jika loop berhenti lebih awal
+            results.close()
+            # Training jarang dijalankan: lepaskan worker sekarang daripada
+            # menunggu idle timeout loky (juga agar proses retrain bisa exit)
+            if n_workers > 1:
+                get_reusable_executor().shutdown(wait=True)
+        wall = time.perf_counter() - wall_start
+
+    task_time = sum(fold_times.values())
+    api_logger.info(
+        f"⚡ Training paralel ({n_workers} proses, {len(tasks)} task): wall {wall:.2f}s, "
+        f"total waktu task {task_time:.2f}s, speedup {task_time / wall if wall else 1.0:.2f}x"
+    )
+    return scores, final_model
+
+
+# Export
+__all__ = [
+    "TrainingCancelled",
+    "check_cancelled",
+    "cross_validate_and_fit"
+]
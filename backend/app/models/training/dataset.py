@@ -0,0 +1,264 @@
+"""
+Loader Dataset Training dengan Cache Kolumnar
+
+Parsing workbook Excel lewat openpyxl adalah langkah paling lambat saat
+training, retrain dan export. Workbook cukup dikonversi sekali menjadi file
+Parquet (fallback: pickle pandas jika pyarrow tidak terpasang) di folder
+.cache di samping workbook. Nama file cache memuat hash SHA-256 isi workbook,
+jadi workbook yang diganti otomatis memicu konversi ulang.
+
+Di dalam proses, DataFrame juga disimpan di memori selama mtime/ukuran
+workbook tidak berubah, sehingga pemanggilan berikutnya tidak membaca disk.
+Lokasi workbook diatur sekali lewat settings.training_dataset_path.
+
+Riwayat prediksi dari MySQL untuk retrain disalin ke cache yang sama dengan
+high-watermark id: setiap retrain hanya menarik baris dengan id di atas
+watermark (stream per chunk), bukan seluruh tabel.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ...core.config import settings
+from ...core.logger import api_logger
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = "parquet"
+except ImportError:
+    CACHE_FORMAT = "pickle"
+
+CACHE_DIR_NAME = ".cache"
+CACHE_SUFFIX = "parquet" if CACHE_FORMAT == "parquet" else "pkl"
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Baca DataFrame dari file cache (Parquet atau pickle)"""
+    if CACHE_FORMAT == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> None:
+    """Tulis DataFrame ke file cache secara atomik"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    if CACHE_FORMAT == "parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+class TrainingDatasetLoader:
+    """
+    Pembaca dataset training (Excel) dengan cache kolumnar berbasis hash isi
+
+    Args:
+        source: Path workbook Excel dataset training
+        cache_dir: Folder file cache (default: <folder workbook>/.cache)
+    """
+
+    def __init__(self, source: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None):
+        self.source = Path(source)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.source.parent / CACHE_DIR_NAME
+        self._lock = threading.Lock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._stat: Optional[Tuple[float, int]] = None
+        self._digest: Optional[str] = None
+        self._loaded_from: Optional[str] = None
+
+    def exists(self) -> bool:
+        return self.source.exists()
+
+    def _cache_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{self.source.stem}.{digest[:16]}.{CACHE_SUFFIX}"
+
+    def _read_workbook(self) -> pd.DataFrame:
+        """Parsing Excel (lambat) — hanya saat cache belum ada atau workbook berubah"""
+        try:
+            return pd.read_excel(self.source)
+        except Exception:
+            # Mencoba dengan nama sheet yang berbeda
+            try:
+                return pd.read_excel(self.source, sheet_name='Dataset')
+            except Exception:
+                return pd.read_excel(self.source, sheet_name=0)  # Sheet pertama
+
+    def _read_cache(self, path: Path) -> pd.DataFrame:
+        return read_frame(path)
+
+    def _write_cache(self, df: pd.DataFrame, path: Path) -> None:
+        """Tulis cache secara atomik lalu hapus cache milik versi workbook lain"""
+        try:
+            write_frame(df, path)
+            for stale in self.cache_dir.glob(f"{self.source.stem}.*"):
+                if stale != path and not stale.name.startswith("."):
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            # Folder data read-only: tetap jalan, hanya tanpa cache di disk
+            api_logger.warning(f"⚠️ Cache dataset tidak bisa ditulis ke {self.cache_dir}: {e}")
+
+    def load(self) -> pd.DataFrame:
+        """
+        DataFrame dataset training (salinan, aman untuk diubah pemanggil)
+
+        Raises:
+            FileNotFoundError: Jika workbook dataset tidak ada
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.source)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"Dataset training tidak ditemukan: {self.source}")
+            stat = (st.st_mtime, st.st_size)
+
+            if self._frame is None or stat != self._stat:
+                with open(self.source, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                cache_path = self._cache_path(digest)
+
+                df = None
+                if cache_path.exists():
+                    try:
+                        df = self._read_cache(cache_path)
+                        self._loaded_from = "cache"
+                    except Exception as e:
+                        api_logger.warning(f"⚠️ Cache dataset rusak, membaca ulang workbook: {e}")
+                if df is None:
+                    df = self._read_workbook()
+                    self._loaded_from = "workbook"
+                    self._write_cache(df, cache_path)
+                    api_logger.info(f"📦 Dataset training dikonversi ke cache {CACHE_FORMAT}: {cache_path.name}")
+
+                self._frame, self._stat, self._digest = df, stat, digest
+            return self._frame.copy()
+
+    def info(self) -> Dict:
+        """Status loader untuk monitoring"""
+        return {
+            "source": str(self.source),
+            "exists": self.exists(),
+            "cache_format": CACHE_FORMAT,
+            "cache_dir": str(self.cache_dir),
+            "digest": self._digest,
+            "loaded_from": self._loaded_from,
+            "rows": len(self._frame) if self._frame is not None else None
+        }
+
+
+def prediction_rows_to_training(rows: pd.DataFrame) -> pd.DataFrame:
+    """Ubah baris riwayat prediksi (kolom DB) ke format kolom dataset training"""
+    allergen_count = pd.to_numeric(rows['allergen_count'], errors='coerce').fillna(0)
+    return pd.DataFrame({
+        'Nama Produk Makanan': rows['product_name'],
+        'Bahan Utama': rows['bahan_utama'],
+        'Pemanis': rows['pemanis'],
+        'Lemak/Minyak': rows['lemak_minyak'],
+        'Penyedap Rasa': rows['penyedap_rasa'],
+        'Alergen': rows['predicted_allergens'].fillna(''),
+        'Prediksi': np.where(allergen_count > 0, 'Mengandung Alergen', 'Tidak Mengandung Alergen')
+    })
+
+
+class PredictionRowStore:
+    """
+    Salinan lokal riwayat prediksi untuk retrain dengan high-watermark id
+
+    sync() hanya men-stream baris dengan id > watermark dari MySQL lalu
+    menambahkannya ke cache. Jika jumlah baris di bawah watermark berbeda
+    dengan cache (ada baris yang dihapus), cache dibangun ulang dari awal.
+
+    Args:
+        cache_dir: Folder file cache
+        chunk_size: Baris per chunk saat streaming dari database
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], chunk_size: int = 5000):
+        self.cache_dir = Path(cache_dir)
+        self.rows_path = self.cache_dir / f"prediction_rows.{CACHE_SUFFIX}"
+        self.state_path = self.cache_dir / "prediction_rows.json"
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    def _read_local(self) -> Tuple[Optional[pd.DataFrame], int]:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            return read_frame(self.rows_path), int(state["watermark"])
+        except (OSError, ValueError, KeyError) as e:
+            if self.state_path.exists():
+                api_logger.warning(f"⚠️ Cache riwayat prediksi tidak terbaca, ditarik ulang: {e}")
+            return None, 0
+
+    def _write_local(self, rows: pd.DataFrame, watermark: int) -> None:
+        try:
+            write_frame(rows, self.rows_path)
+            tmp = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump({"watermark": watermark, "rows": len(rows), "updated_at": datetime.now().isoformat()}, f)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            api_logger.warning(f"⚠️ Cache riwayat prediksi tidak bisa ditulis ke {self.cache_dir}: {e}")
+
+    def sync(self) -> Tuple[pd.DataFrame, int]:
+        """
+        Tarik baris baru sejak watermark terakhir
+
+        Returns:
+            Tuple (seluruh baris riwayat prediksi dengan kolom DB, jumlah baris baru)
+        """
+        from ...database.allergen_database import database_manager
+
+        columns = list(database_manager.TRAINING_COLUMNS)
+        with self._lock:
+            cached, watermark = self._read_local()
+            refetch = False
+
+            if cached is not None and watermark:
+                count = database_manager.count_predictions_upto(watermark)
+                if count is None:
+                    # Database tidak tersedia: pakai salinan terakhir apa adanya
+                    api_logger.warning(f"⚠️ Database tidak tersedia, memakai {len(cached)} baris riwayat dari cache")
+                    return cached, 0
+                if count != len(cached):
+                    api_logger.info(f"♻️ {len(cached) - count} baris riwayat di bawah watermark {watermark} berubah, cache ditarik ulang")
+                    cached, watermark, refetch = None, 0, True
+
+            chunks = list(database_manager.iter_training_chunks(after_id=watermark, chunk_size=self.chunk_size))
+            new_rows = sum(len(chunk) for chunk in chunks)
+            frames = ([cached] if cached is not None else []) + chunks
+            rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+            if new_rows:
+                watermark = int(chunks[-1]['id'].iloc[-1])
+            if new_rows or refetch:
+                self._write_local(rows, watermark)
+
+            api_logger.info(f"📥 Riwayat prediksi untuk retrain: {new_rows} baris baru, total {len(rows)} (watermark id {watermark})")
+            return rows, new_rows
+
+
+# Loader global untuk dataset training
+training_dataset = TrainingDatasetLoader(settings.training_dataset_path, settings.training_dataset_cache_dir)
+
+# Riwayat prediksi untuk retrain, disimpan di samping cache dataset training
+prediction_rows = PredictionRowStore(training_dataset.cache_dir, settings.retrain_fetch_chunk_size)
+
+# Export
+__all__ = [
+    "TrainingDatasetLoader",
+    "PredictionRowStore",
+    "training_dataset",
+    "prediction_rows",
+    "prediction_rows_to_training",
+    "CACHE_FORMAT"
+]
@@ -0,0 +1,509 @@
+"""
+Job Retrain di Proses Terpisah
+
+Retrain (10-fold CV + fit AdaBoost 50 SVC terkalibrasi) terlalu berat untuk
+dijalankan di dalam handler async: worker membeku beberapa menit dan request
+terkena timeout 300 detik gunicorn/nginx. Retrain sekarang dikirim sebagai
+job yang berjalan di proses anak (multiprocessing 'spawn'):
+
+- Setiap job punya ID, status, tahap dan progres fold
+- Hanya satu retrain boleh berjalan pada satu waktu, juga antar worker
+  gunicorn: worker pemilik job memegang flock pada .retrain.lock di
+  settings.model_dir sampai job selesai (dilepas otomatis oleh OS jika
+  worker mati)
+- Status job ditulis ke retrain_jobs.json di folder yang sama pada setiap
+  perubahan, jadi endpoint status dan cancel menjawab benar dari worker
+  mana pun; pembatalan dari worker lain dibaca oleh worker pemilik job
+- Pembatalan dicek di antara fold; jika proses tidak berhenti dalam masa
+  tenggang, proses dihentikan paksa
+- Prediksi tetap dilayani model lama sampai model baru selesai disimpan,
+  lalu model baru dimuat dari disk
+"""
+
+import fcntl
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from ...core.config import settings
+from ...core.logger import api_logger
+from ...core.metrics import RETRAIN_SECONDS
+
+# Status job
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+# File bersama di state_dir (settings.model_dir)
+RUN_LOCK_FILE = ".retrain.lock"
+STATE_FILE = "retrain_jobs.json"
+STATE_LOCK_FILE = ".retrain_jobs.lock"
+
+# Detik antar pengecekan permintaan cancel dari worker lain
+CANCEL_POLL_INTERVAL = 1.0
+
+
+class RetrainJobConflict(Exception):
+    """Masih ada retrain lain yang sedang berjalan"""
+
+
+def _run_retrain(messages, cancel_event) -> None:
+    """
+    Entry point proses anak: latih model baru lalu simpan ke disk
+
+    Riwayat prediksi diambil sendiri oleh proses anak dari MySQL (inkremental
+    sejak watermark terakhir), jadi tidak ada data yang di-pickle dari induk.
+
+    Pesan ke proses induk: ("progress", stage, info), ("done", result),
+    ("cancelled",) atau ("error", pesan).
+    """
+    from ..inference.predictor import AllergenPredictor
+    from .cross_validation import TrainingCancelled
+
+    def progress(stage: str, **info) -> None:
+        messages.put(("progress", stage, info))
+
+    try:
+        trainer = AllergenPredictor()
+        result = trainer.retrain_with_additional_data(
+            progress=progress, should_cancel=cancel_event.is_set
+        )
+        messages.put(("done", result))
+    except TrainingCancelled:
+        messages.put(("cancelled",))
+    except Exception as e:
+        messages.put(("error", str(e)))
+
+
+class RetrainJobManager:
+    """
+    Pengelola job retrain (satu job aktif, riwayat job terbatas)
+
+    Args:
+        on_complete: Dipanggil di proses induk setelah model baru tersimpan;
+            mengembalikan True jika model baru berhasil dimuat
+        cancel_grace: Detik menunggu proses berhenti sendiri setelah dibatalkan
+        history_size: Jumlah job selesai yang disimpan untuk endpoint status
+        state_dir: Folder lock file dan status job bersama antar worker
+    """
+
+    def __init__(
+        self,
+        on_complete: Callable[[], bool],
+        cancel_grace: float = 10.0,
+        history_size: int = 20,
+        state_dir: Union[str, Path] = "."
+    ):
+        self.on_complete = on_complete
+        self.cancel_grace = cancel_grace
+        self.history_size = history_size
+        self.state_dir = Path(state_dir)
+        self.run_lock_path = self.state_dir / RUN_LOCK_FILE
+        self.state_path = self.state_dir / STATE_FILE
+        self.state_lock_path = self.state_dir / STATE_LOCK_FILE
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._active: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._context = multiprocessing.get_context("spawn")
+
+    def _acquire_run_lock(self) -> Optional[int]:
+        """flock non-blocking pada lock file retrain; None jika dipegang proses lain"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.run_lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    @staticmethod
+    def _release_run_lock(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @contextmanager
+    def _state_lock(self) -> Iterator[None]:
+        """flock eksklusif untuk read-modify-write file status job"""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.state_lock_path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _read_state(self) -> List[Dict]:
+        """Job di file status (terlama dulu); list kosong jika belum ada/rusak"""
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)["jobs"]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError) as e:
+            api_logger.warning(f"⚠️ Status retrain job tidak terbaca ({self.state_path}): {e}")
+            return []
+
+    def _write_state(self, jobs: List[Dict]) -> None:
+        tmp = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"jobs": jobs[-self.history_size:]}, f, default=str)
+        os.replace(tmp, self.state_path)
+
+    def _persist(self, job: Dict) -> None:
+        """
+        Tulis snapshot job ke file status bersama
+
+        cancel_requested yang sudah diset worker lain tidak ditimpa.
+        Dipanggil dengan self._lock dipegang agar urutan tulis sama dengan
+        urutan perubahan.
+        """
+        try:
+            with self._state_lock():
+                jobs = self._read_state()
+                for index, stored in enumerate(jobs):
+                    if stored["job_id"] == job["job_id"]:
+                        cancel_requested = job["cancel_requested"] or stored.get("cancel_requested", False)
+                        jobs[index] = {**job, "cancel_requested": cancel_requested}
+                        break
+                else:
+                    jobs.append(dict(job))
+                self._write_state(jobs)
+        except OSError as e:
+            api_logger.warning(f"⚠️ Status retrain job tidak bisa ditulis ke {self.state_path}: {e}")
+
+    def _fail_orphans(self) -> None:
+        """
+        Tandai job tak selesai di file status sebagai gagal
+
+        Hanya dipanggil sambil memegang lock retrain: job yang masih tercatat
+        berjalan berarti worker pemiliknya berhenti sebelum sempat menutupnya.
+        """
+        try:
+            with self._state_lock():
+                jobs = self._read_state()
+                orphans = [job for job in jobs if job["status"] not in FINISHED_STATES]
+                if not orphans:
+                    return
+                for job in orphans:
+                    job["status"] = job["stage"] = FAILED
+                    job["error"] = "Worker pemilik job berhenti sebelum retrain selesai"
+                    job["finished_at"] = datetime.now().isoformat()
+                    api_logger.warning(f"⚠️ Retrain job {job['job_id']} ditandai gagal: worker pemiliknya berhenti")
+                self._write_state(jobs)
+        except OSError as e:
+            api_logger.warning(f"⚠️ Status retrain job tidak bisa ditulis ke {self.state_path}: {e}")
+
+    def _shared_jobs(self) -> List[Dict]:
+        """
+        Job dari file status, terbaru dulu
+
+        Jika tidak ada job aktif di proses ini dan lock retrain bebas, job
+        yang masih tercatat berjalan adalah sisa worker yang mati.
+        """
+        jobs = self._read_state()
+        if any(job["status"] not in FINISHED_STATES for job in jobs):
+            with self._lock:
+                fd = self._acquire_run_lock() if self._active is None else None
+                if fd is not None:
+                    try:
+                        self._fail_orphans()
+                    finally:
+                        self._release_run_lock(fd)
+                    jobs = self._read_state()
+        return list(reversed(jobs))
+
+    def submit(self) -> Dict:
+        """
+        Jalankan retrain baru di proses terpisah
+
+        Raises:
+            RetrainJobConflict: Jika masih ada retrain yang berjalan
+        """
+        with self._lock:
+            if self._active is not None:
+                raise RetrainJobConflict(
+                    f"Retrain job {self._active['job']['job_id']} masih berjalan"
+                )
+
+            run_lock = self._acquire_run_lock()
+            if run_lock is None:
+                running = next(
+                    (job for job in self._read_state() if job["status"] not in FINISHED_STATES), None
+                )
+                job_id = running["job_id"] if running else "lain"
+                raise RetrainJobConflict(f"Retrain job {job_id} masih berjalan di worker lain")
+            self._fail_orphans()
+
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "status": QUEUED,
+                "stage": "starting",
+                "progress": {},
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "cancel_requested": False,
+                "result": None,
+                "error": None
+            }
+            messages = self._context.Queue()
+            cancel_event = self._context.Event()
+            process = self._context.Process(
+                target=_run_retrain,
+                args=(messages, cancel_event),
+                name=f"retrain-{job['job_id'][:8]}"
+            )
+
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > self.history_size:
+                oldest_id = next(iter(self._jobs))
+                if oldest_id == job["job_id"]:
+                    break
+                del self._jobs[oldest_id]
+
+            self._active = {
+                "job": job,
+                "process": process,
+                "cancel_event": cancel_event,
+                "cancel_requested_at": None,
+                "started": time.monotonic(),
+                "run_lock": run_lock
+            }
+            try:
+                process.start()
+            except Exception:
+                self._active = None
+                del self._jobs[job["job_id"]]
+                self._release_run_lock(run_lock)
+                raise
+            job["status"] = RUNNING
+            job["started_at"] = datetime.now().isoformat()
+            self._persist(job)
+
+        threading.Thread(
+            target=self._monitor,
+            args=(job, process, messages),
+            name=f"retrain-monitor-{job['job_id'][:8]}",
+            daemon=True
+        ).start()
+
+        api_logger.info(f"🔄 Retrain job {job['job_id']} dimulai (pid {process.pid})")
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Snapshot status job (dari worker mana pun), None jika tidak dikenal"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        return next((job for job in self._shared_jobs() if job["job_id"] == job_id), None)
+
+    def list_jobs(self) -> List[Dict]:
+        """Snapshot job semua worker yang tersimpan, terbaru dulu"""
+        with self._lock:
+            local = {job_id: dict(job) for job_id, job in self._jobs.items()}
+        jobs = [local.pop(job["job_id"], job) for job in self._shared_jobs()]
+        # Job lokal yang tidak sempat tertulis ke file status
+        jobs.extend(reversed(list(local.values())))
+        jobs.sort(key=lambda job: job["submitted_at"], reverse=True)
+        return jobs
+
+    def active_job(self) -> Optional[Dict]:
+        """Snapshot job yang sedang berjalan di worker mana pun, None jika tidak ada"""
+        with self._lock:
+            if self._active is not None:
+                return dict(self._active["job"])
+        return next((job for job in self._shared_jobs() if job["status"] not in FINISHED_STATES), None)
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        Minta pembatalan job
+
+        Returns:
+            Snapshot job, atau None jika job tidak dikenal. Job yang sudah
+            selesai dikembalikan apa adanya.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                if self._active is not None and self._active["job"] is job:
+                    self._request_cancel(job)
+                return dict(job)
+
+        # Job milik worker lain: tandai di file status, worker pemilik membacanya
+        try:
+            with self._state_lock():
+                jobs = self._read_state()
+                job = next((stored for stored in jobs if stored["job_id"] == job_id), None)
+                if job is None:
+                    return None
+                if job["status"] not in FINISHED_STATES and not job["cancel_requested"]:
+                    job["cancel_requested"] = True
+                    self._write_state(jobs)
+                    api_logger.info(f"🛑 Pembatalan retrain job {job_id} diminta (job di worker lain)")
+                return job
+        except OSError as e:
+            api_logger.warning(f"⚠️ Status retrain job tidak bisa ditulis ke {self.state_path}: {e}")
+            return None
+
+    def _request_cancel(self, job: Dict) -> None:
+        """Hentikan job aktif di proses ini (self._lock harus dipegang)"""
+        if self._active["cancel_requested_at"] is not None:
+            return
+        job["cancel_requested"] = True
+        self._active["cancel_requested_at"] = time.monotonic()
+        self._active["cancel_event"].set()
+        self._persist(job)
+        api_logger.info(f"🛑 Pembatalan retrain job {job['job_id']} diminta")
+
+    def _cancel_requested_elsewhere(self, job_id: str) -> bool:
+        """True jika worker lain menandai job ini untuk dibatalkan"""
+        return any(
+            job["job_id"] == job_id and job.get("cancel_requested")
+            for job in self._read_state()
+        )
+
+    def shutdown(self) -> None:
+        """Hentikan job aktif (dipanggil saat aplikasi berhenti)"""
+        with self._lock:
+            active = self._active
+        if active is None:
+            return
+        active["cancel_event"].set()
+        active["process"].join(self.cancel_grace)
+        if active["process"].is_alive():
+            active["process"].terminate()
+            active["process"].join()
+
+    def _monitor(self, job: Dict, process, messages) -> None:
+        """Baca pesan progres proses anak sampai job selesai"""
+        outcome = None
+        next_cancel_poll = time.monotonic() + CANCEL_POLL_INTERVAL
+        while outcome is None:
+            # Dicek juga saat pesan progres terus masuk
+            if time.monotonic() >= next_cancel_poll:
+                next_cancel_poll = time.monotonic() + CANCEL_POLL_INTERVAL
+                if self._cancel_requested_elsewhere(job["job_id"]):
+                    with self._lock:
+                        if self._active is not None and self._active["job"] is job:
+                            self._request_cancel(job)
+
+            try:
+                message = messages.get(timeout=0.5)
+            except queue.Empty:
+                message = None
+
+            if message is not None:
+                outcome = self._handle_message(job, message)
+                continue
+
+            if not process.is_alive():
+                outcome = ("error", f"Proses retrain berhenti tanpa hasil (exit code {process.exitcode})")
+                continue
+
+            with self._lock:
+                requested_at = self._active["cancel_requested_at"] if self._active else None
+            if requested_at is not None and time.monotonic() - requested_at > self.cancel_grace:
+                process.terminate()
+                outcome = ("cancelled",)
+
+        process.join(self.cancel_grace)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self._finish(job, outcome)
+
+    def _handle_message(self, job: Dict, message: tuple) -> Optional[tuple]:
+        """Terapkan satu pesan progres; kembalikan outcome jika job selesai"""
+        if message[0] != "progress":
+            return message
+
+        _, stage, info = message
+        with self._lock:
+            job["stage"] = stage
+            if info:
+                job["progress"] = info
+            self._persist(job)
+        return None
+
+    def _finish(self, job: Dict, outcome: tuple) -> None:
+        """Muat model baru (jika sukses) dan tandai job selesai"""
+        kind = outcome[0]
+        status, result, error = FAILED, None, None
+
+        if kind == "done":
+            with self._lock:
+                job["stage"] = "reloading"
+                self._persist(job)
+            result = outcome[1]
+            try:
+                if self.on_complete():
+                    status = SUCCEEDED
+                else:
+                    error = "Model baru tersimpan tetapi gagal dimuat"
+            except Exception as e:
+                error = f"Model baru gagal dimuat: {e}"
+        elif kind == "cancelled":
+            status = CANCELLED
+        else:
+            error = outcome[1]
+
+        with self._lock:
+            job["status"] = status
+            job["stage"] = status
+            job["result"] = result
+            job["error"] = error
+            job["finished_at"] = datetime.now().isoformat()
+            self._persist(job)
+            if self._active is not None and self._active["job"] is job:
+                RETRAIN_SECONDS.observe(time.monotonic() - self._active["started"], status=status)
+                self._release_run_lock(self._active["run_lock"])
+                self._active = None
+
+        if status == SUCCEEDED:
+            api_logger.info(f"✅ Retrain job {job['job_id']} selesai: akurasi={result.get('accuracy_pct')}, model baru aktif")
+        elif status == CANCELLED:
+            api_logger.info(f"🛑 Retrain job {job['job_id']} dibatalkan, model lama tetap dipakai")
+        else:
+            api_logger.error(f"❌ Retrain job {job['job_id']} gagal: {error}")
+
+
+def _reload_predictor() -> bool:
+    """Muat model hasil retrain ke predictor global di proses ini"""
+    from ..inference.predictor import predictor
+    return predictor.load_saved_model()
+
+
+# Global retrain job manager
+retrain_jobs = RetrainJobManager(
+    on_complete=_reload_predictor,
+    cancel_grace=settings.retrain_cancel_grace,
+    history_size=settings.retrain_job_history,
+    state_dir=settings.model_dir
+)
+
+# Export
+__all__ = [
+    "RetrainJobConflict",
+    "RetrainJobManager",
+    "retrain_jobs",
+    "QUEUED",
+    "RUNNING",
+    "SUCCEEDED",
+    "FAILED",
+    "CANCELLED",
+    "FINISHED_STATES"
+]
@@ -150,6 +150,35 @@ class PredictionResponse(BaseModel):
         else:
             return "low"
 
+class BatchPredictionRequest(BaseModel):
+    """Request schema for batch allergen prediction"""
+    
+    items: List[PredictionRequest] = Field(
+        ...,
+        min_length=1,
+        description="List of prediction requests, processed in order"
+    )
+
+class BatchPredictionItemResult(BaseModel):
+    """Result for a single item in a batch prediction"""
+    
+    index: int = Field(..., description="Position of the item in the request")
+    success: bool = Field(..., description="Whether this item was predicted successfully")
+    result: Optional[PredictionResponse] = Field(None, description="Prediction result when successful")
+    error: Optional[str] = Field(None, description="Error message when the item failed")
+
+class BatchPredictionResponse(BaseModel):
+    """Response schema for batch allergen prediction"""
+    
+    success: bool = Field(..., description="Whether the batch was processed")
+    total_items: int = Field(..., description="Number of items in the request")
+    successful_items: int = Field(..., description="Number of items predicted successfully")
+    failed_items: int = Field(..., description="Number of items that failed")
+    saved_records: int = Field(0, description="Number of results persisted to the database")
+    processing_time_ms: float = Field(..., description="Total batch processing time in milliseconds")
+    results: List[BatchPredictionItemResult] = Field(..., description="Per-item results in request order")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Prediction timestamp")
+
 class HealthCheckResponse(BaseModel):
     """Health check response schema"""
     
@@ -173,6 +202,9 @@ __all__ = [
     "PredictionRequest", 
     "AllergenResult", 
     "PredictionResponse", 
+    "BatchPredictionRequest",
+    "BatchPredictionItemResult",
+    "BatchPredictionResponse",
     "HealthCheckResponse", 
     "ErrorResponse"
 ]
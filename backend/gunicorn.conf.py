@@ -0,0 +1,67 @@
+"""
+🦄 Gunicorn configuration for AllerScan API
+
+Preload mode (default): the app and the SVM+AdaBoost model are loaded once in
+the gunicorn master, the heap is frozen with gc.freeze(), and workers are
+forked from it. Workers then share the master's pages copy-on-write instead of
+each importing pandas/sklearn and unpickling its own model, and the model's
+support-vector arrays are memory-mapped (MODEL_MMAP) so they live in the page
+cache once for all workers, including after a hot reload.
+
+The master also imports the database manager, whose pool already holds
+MySQL connections (table setup, model performance rows). post_fork drops
+those inherited connections in every worker without closing them, so no two
+processes ever share one socket.
+
+Environment overrides:
+    GUNICORN_BIND      (default 127.0.0.1:8000)
+    GUNICORN_WORKERS   (default 2)
+    GUNICORN_TIMEOUT   (default 300)
+    GUNICORN_PRELOAD   (default 1; set 0 to load the model in every worker)
+
+Usage (from backend/):
+    gunicorn app.main:app -c gunicorn.conf.py
+"""
+
+import gc
+import os
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+preload_app = os.getenv("GUNICORN_PRELOAD", "1").lower() in ("1", "true", "yes")
+
+
+def when_ready(server):
+    """Load the model in the master once, before any worker is forked"""
+    if not preload_app:
+        return
+
+    from app.models.inference.predictor import predictor
+
+    if predictor.ensure_loaded():
+        server.log.info(f"Model version {predictor.model_version} preloaded in master (pid {os.getpid()})")
+    else:
+        server.log.warning("Model preload failed, workers will load the model themselves")
+
+    # Move everything allocated so far into the permanent generation: the
+    # cyclic GC in the workers then never touches (and never dirties) the
+    # pages inherited from the master
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"gc.freeze(): {gc.get_freeze_count()} objects frozen before fork")
+
+
+def post_fork(server, worker):
+    """Give every worker its own DB connections instead of the master's pooled sockets"""
+    if not preload_app:
+        return
+
+    from app.database.allergen_database import database_manager
+
+    if database_manager.engine is not None:
+        # close=False: the sockets still belong to the master; closing them
+        # here would send COM_QUIT on the master's connections
+        database_manager.engine.dispose(close=False)
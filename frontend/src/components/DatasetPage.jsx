@@ -49,6 +49,7 @@ const DatasetPage = () => {
   const [currentPage, setCurrentPage] = useState(1)
   const [itemsPerPage] = useState(20)
   const [totalItems, setTotalItems] = useState(0)
+  const [cursors, setCursors] = useState({ next: null, prev: null })
   const [searchTerm, setSearchTerm] = useState('')
   const [statistics, setStatistics] = useState(null)
   const [isExporting, setIsExporting] = useState(false)
@@ -56,7 +57,8 @@ const DatasetPage = () => {
   const { toasts, show: showToast, remove: removeToast } = useToast()
 
   // Data loading function
-  const loadData = useCallback(async (page = 1, pageSize = 20) => {
+  // cursor: token next/prev dari halaman sebelumnya (keyset pagination, cepat di halaman mana pun)
+  const loadData = useCallback(async (page = 1, pageSize = 20, cursor = null) => {
     try {
       setLoading(true)
       setError(null)
@@ -66,6 +68,9 @@ const DatasetPage = () => {
         limit: pageSize,        // fix: was page_size
         include_stats: false
       }
+      if (cursor) {
+        params.cursor = cursor
+      }
 
       if (searchTerm.trim()) {
         params.search = searchTerm.trim()
@@ -77,6 +82,10 @@ const DatasetPage = () => {
       if (responseData) {
         setData(responseData.predictions || [])                          // fix: extract predictions array
         setTotalItems(responseData.pagination?.total_items || 0)        // fix: correct field name
+        setCursors({
+          next: responseData.pagination?.next_cursor || null,
+          prev: responseData.pagination?.prev_cursor || null
+        })
         setCurrentPage(page)
       } else {
         setData([])
@@ -125,7 +134,8 @@ const DatasetPage = () => {
   }
 
   const handlePageChange = (page) => {
-    loadData(page, itemsPerPage)
+    const cursor = page === currentPage + 1 ? cursors.next : page === currentPage - 1 ? cursors.prev : null
+    loadData(page, itemsPerPage, cursor)
   }
 
   const handleRefresh = () => {
@@ -111,7 +111,7 @@ export const deletePrediction = async (predictionId) => {
 }
 
 // Export to Excel
-export const exportToExcel = async (limit = 1000) => {
+export const exportToExcel = async (limit = null) => {  // null = seluruh riwayat
   try {
     const response = await api.get('/api/v1/dataset/export/excel', {
       params: { limit },
@@ -135,12 +135,30 @@ export const login = async (credentials) => {
   }
 }
 
-// Retrain model with DB data
+// Retrain model with DB data (runs as a background job, returns the job)
 export const retrainModel = async () => {
   try {
-    const response = await api.post('/api/v1/predict/retrain', {}, {
-      timeout: 300000  // 5 minutes — retraining can be slow
-    })
+    const response = await api.post('/api/v1/predict/retrain', {})
+    return response.data
+  } catch (error) {
+    handleApiError(error)
+  }
+}
+
+// Poll retrain job status (stage and fold progress)
+export const getRetrainJob = async (jobId) => {
+  try {
+    const response = await api.get(`/api/v1/predict/retrain/jobs/${jobId}`)
+    return response.data
+  } catch (error) {
+    handleApiError(error)
+  }
+}
+
+// Cancel a running retrain job
+export const cancelRetrainJob = async (jobId) => {
+  try {
+    const response = await api.post(`/api/v1/predict/retrain/jobs/${jobId}/cancel`, {})
     return response.data
   } catch (error) {
     handleApiError(error)
@@ -0,0 +1,36 @@
+"""
+🧩 Backfill tabel prediction_allergens
+
+Memecah kolom teks predicted_allergens di dataset_results menjadi satu baris
+per (prediction_id, alergen) untuk riwayat yang belum punya baris anak.
+Backend menjalankan backfill otomatis saat tabel pertama kali dibuat; script
+ini untuk menjalankannya ulang secara manual (aman diulang, per chunk).
+
+Usage (dari root project):
+    python scripts/maintenance/backfill_prediction_allergens.py --chunk-size 1000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Baris dataset_results per transaksi")
+    args = parser.parse_args()
+
+    from app.database.allergen_database import database_manager
+
+    if not database_manager.db_available:
+        raise SystemExit("Database tidak tersedia, cek konfigurasi MYSQL_*")
+
+    backfilled = database_manager.backfill_prediction_allergens(chunk_size=args.chunk_size)
+    print(f"✅ {backfilled} prediksi di-backfill ke prediction_allergens")
+
+
+if __name__ == "__main__":
+    main()
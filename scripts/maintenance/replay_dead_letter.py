@@ -0,0 +1,65 @@
+"""
+📮 Replay dead-letter prediksi
+
+Write-behind buffer menulis record prediksi yang gagal disimpan (database
+tidak terjangkau setelah retry, atau record yang ditolak MySQL) ke file JSONL
+(WRITE_BEHIND_DEAD_LETTER_FILE). Script ini mencoba menyimpannya lagi per
+batch, lalu per record untuk batch yang ditolak. Record yang tetap gagal
+ditulis kembali ke file, jadi script aman diulang.
+
+Usage (dari root project):
+    python scripts/maintenance/replay_dead_letter.py --batch-size 200
+    python scripts/maintenance/replay_dead_letter.py --file backend/logs/prediction_dead_letter.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", type=Path, default=None, help="File dead-letter (default: dari settings)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Record per INSERT")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.database.allergen_database import database_manager
+
+    if not database_manager.db_available:
+        raise SystemExit("Database tidak tersedia, cek konfigurasi MYSQL_*")
+
+    path = args.file or BACKEND_DIR / settings.write_behind_dead_letter_file
+    if not path.exists():
+        print(f"ℹ️ Tidak ada file dead-letter di {path}")
+        return
+
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    remaining = []
+    saved = 0
+    for start in range(0, len(entries), args.batch_size):
+        chunk = entries[start:start + args.batch_size]
+        try:
+            saved += database_manager.save_prediction_results([entry["record"] for entry in chunk])
+            continue
+        except Exception:
+            pass
+        for entry in chunk:
+            try:
+                saved += database_manager.save_prediction_results([entry["record"]])
+            except Exception as e:
+                remaining.append({**entry, "error": str(e)})
+
+    path.write_text(
+        "".join(json.dumps(entry, ensure_ascii=False, default=str) + "\n" for entry in remaining),
+        encoding="utf-8"
+    )
+    print(f"✅ {saved} dari {len(entries)} record disimpan, {len(remaining)} tetap di {path}")
+
+
+if __name__ == "__main__":
+    main()
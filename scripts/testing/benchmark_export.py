@@ -0,0 +1,139 @@
+"""
+📤 Export throughput benchmark: Excel vs CSV / NDJSON / Parquet
+
+Mengukur rows/detik, ukuran file dan puncak memori (RSS) setiap format
+export riwayat prediksi. Setiap format dijalankan di proses Python baru:
+
+- excel: write_excel_export() (workbook write-only + spooled temp file),
+  jalur /dataset/export/excel
+- csv / ndjson / parquet: iter_stream_export() dari server-side cursor,
+  jalur /dataset/export?format=...
+
+Default memakai database MySQL dari konfigurasi backend (.env / MYSQL_*).
+Tanpa server MySQL, --synthetic N membuat tabel dataset_results sintetis
+berisi N baris di file SQLite sementara dan mengarahkan database_manager ke
+sana.
+
+Usage (dari root project):
+    python scripts/testing/benchmark_export.py --limit 50000
+    python scripts/testing/benchmark_export.py --synthetic 100000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+FORMATS = ["excel", "csv", "ndjson", "parquet"]
+
+# Dijalankan di proses anak: satu export penuh, byte dibuang setelah dihitung
+CHILD = """
+import json, resource, sqlite3, sys, time
+fmt, limit, sqlite_path = sys.argv[1], sys.argv[2], sys.argv[3]
+limit = int(limit) if limit != "0" else None
+from app.database.allergen_database import database_manager
+if sqlite_path:
+    from sqlalchemy import create_engine
+    database_manager.engine = create_engine(
+        f"sqlite:///{sqlite_path}", connect_args={"detect_types": sqlite3.PARSE_DECLTYPES}
+    )
+    database_manager.db_available = True
+from app.database.export import file_size, iter_file, iter_stream_export, write_excel_export
+
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if fmt == "excel":
+    output, rows = write_excel_export(limit=limit, include_training=False, include_summary=False)
+    size = file_size(output)
+    for _ in iter_file(output):
+        pass
+else:
+    size = 0
+    for chunk in iter_stream_export(fmt, limit=limit):
+        size += len(chunk)
+    rows = None
+elapsed = time.perf_counter() - t0
+print(json.dumps({"rows": rows, "bytes": size, "seconds": elapsed,
+                  "peak_rss_delta_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss}))
+"""
+
+
+def create_synthetic(path, n_rows):
+    """Tabel dataset_results sintetis (kolom sama dengan MySQL) di SQLite"""
+    import sqlite3
+    from datetime import datetime, timedelta
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE dataset_results (
+            id INTEGER PRIMARY KEY, product_name TEXT, bahan_utama TEXT, pemanis TEXT,
+            lemak_minyak TEXT, penyedap_rasa TEXT, ingredients_input TEXT,
+            predicted_allergens TEXT, allergen_count INT, confidence_score REAL,
+            risk_level TEXT, processing_time_ms REAL, model_version TEXT,
+            keterangan TEXT, created_at timestamp
+        )
+    """)
+    conn.execute("CREATE INDEX idx_created_at ON dataset_results (created_at, id)")
+    start = datetime(2025, 1, 1)
+    conn.executemany(
+        "INSERT INTO dataset_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (i, f"Produk Sintetis {i}", "Tepung terigu, telur, susu", "Gula", "Mentega", "Vanili",
+             "Tepung terigu, telur, susu, Gula, Mentega, Vanili",
+             "Gluten, Telur, Susu" if i % 3 else "tidak terdeteksi", 3 if i % 3 else 0,
+             0.8765, "high" if i % 3 else "none", 12.5, "SVM+AdaBoost",
+             f"Form input: Produk Sintetis {i}", (start + timedelta(seconds=i)).isoformat(" "))
+            for i in range(1, n_rows + 1)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_format(fmt, limit, sqlite_path):
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, fmt, str(limit or 0), sqlite_path or ""],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=0, help="Maksimum baris per export (0 = semua)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Pakai N baris sintetis di SQLite, bukan MySQL")
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=FORMATS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="allerscan-export-") as tmp:
+        sqlite_path = None
+        if args.synthetic:
+            sqlite_path = str(Path(tmp) / "dataset_results.db")
+            create_synthetic(sqlite_path, args.synthetic)
+        expected = args.limit or args.synthetic or None
+
+        results = {fmt: run_format(fmt, args.limit, sqlite_path) for fmt in args.formats}
+
+    rows = next((r["rows"] for r in results.values() if r["rows"]), expected)
+    print(f"{'format':<9}{'rows':>9}{'seconds':>10}{'rows/s':>11}{'size MiB':>10}{'peak RSS':>12}")
+    for fmt, result in results.items():
+        rate = rows / result["seconds"] if rows else 0
+        print(f"{fmt:<9}{rows or 0:>9}{result['seconds']:>10.2f}{rate:>11,.0f}"
+              f"{result['bytes'] / 2**20:>10.1f}{result['peak_rss_delta_kib'] / 1024:>8.1f} MiB")
+
+    if "excel" in results and rows:
+        excel_rate = rows / results["excel"]["seconds"]
+        for fmt in results:
+            if fmt != "excel":
+                print(f"{fmt}: {rows / results[fmt]['seconds'] / excel_rate:.1f}x throughput Excel")
+
+
+if __name__ == "__main__":
+    main()
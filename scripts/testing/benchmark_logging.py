@@ -0,0 +1,113 @@
+"""
+📝 Logging overhead benchmark untuk /predict
+
+Mengukur latensi per request POST /api/v1/predict/ dengan beberapa
+konfigurasi logging, masing-masing di proses Python baru (konfigurasi sink
+loguru dibaca saat import):
+
+- off: LOG_LEVEL=CRITICAL (acuan tanpa logging)
+- legacy: seperti sebelumnya, sink sinkron + diagnose, semua baris detail
+  per tahap di level INFO (LOG_DETAIL_SAMPLE_RATE=1)
+- text: default baru, satu baris ringkasan per request (detail di-sampling)
+- json: seperti text, format JSON per baris
+- enqueue: seperti text, sink ditulis thread latar loguru (LOG_ENQUEUE=1)
+
+Konfigurasi dijalankan bergantian sebanyak --rounds putaran dan yang
+dilaporkan adalah median rata-rata per putaran, supaya noise mesin tidak
+tertukar dengan selisih antar konfigurasi. Overhead logging = latensi
+konfigurasi dikurangi latensi "off". Cache
+prediksi dimatikan supaya setiap request benar-benar melewati model.
+Output log console dibuang ke /dev/null, file log ditulis ke direktori
+sementara.
+
+Usage (dari root project):
+    python scripts/testing/benchmark_logging.py --requests 2000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+CONFIGS = {
+    "off": {"LOG_LEVEL": "CRITICAL"},
+    "legacy": {"LOG_ENQUEUE": "0", "LOG_DIAGNOSE": "1", "LOG_DETAIL_SAMPLE_RATE": "1"},
+    "text": {},
+    "json": {"LOG_FORMAT": "json"},
+    "enqueue": {"LOG_ENQUEUE": "1"},
+}
+
+# Dijalankan di proses anak: warmup lalu N request, latensi per request dalam ms
+CHILD = """
+import json, statistics, sys, time
+from fastapi.testclient import TestClient
+from app.main import app
+n = int(sys.argv[1])
+body = {"nama_produk_makanan": "Roti Tawar", "bahan_utama": "tepung terigu, susu, telur",
+        "pemanis": "gula", "lemak_minyak": "mentega", "penyedap_rasa": "garam",
+        "confidence_threshold": 0.3}
+with TestClient(app) as client:
+    for i in range(50):
+        client.post("/api/v1/predict/", json={**body, "nama_produk_makanan": f"Warmup {i}"})
+    latencies = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        response = client.post("/api/v1/predict/", json={**body, "nama_produk_makanan": f"Produk {i}"})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        assert response.status_code == 200, response.text
+latencies.sort()
+print(json.dumps({"mean": statistics.fmean(latencies), "p50": latencies[len(latencies) // 2],
+                  "p95": latencies[int(len(latencies) * 0.95)]}))
+"""
+
+
+def run_config(name, n_requests, log_dir, round_index=0):
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(BACKEND_DIR),
+        PREDICTION_CACHE_SIZE="0",
+        LOG_FILE=str(Path(log_dir) / f"{name}-{round_index}.log"),
+        **CONFIGS[name]
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, str(n_requests)],
+        cwd=log_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    log_file = Path(log_dir) / f"{name}-{round_index}.log"
+    result["log_lines"] = sum(1 for _ in open(log_file, encoding="utf-8")) if log_file.exists() else 0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Jumlah request per konfigurasi")
+    parser.add_argument("--rounds", type=int, default=3, help="Putaran bergantian per konfigurasi")
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    args = parser.parse_args()
+
+    rounds = {name: [] for name in args.configs}
+    with tempfile.TemporaryDirectory(prefix="allerscan-logbench-") as log_dir:
+        for round_index in range(args.rounds):
+            for name in args.configs:
+                rounds[name].append(run_config(name, args.requests, log_dir, round_index))
+
+    results = {}
+    for name, runs in rounds.items():
+        runs.sort(key=lambda run: run["mean"])
+        results[name] = runs[len(runs) // 2]
+
+    baseline = results.get("off")
+    print(f"{'config':<8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'overhead ms':>13}{'log lines':>11}")
+    for name, result in results.items():
+        overhead = f"{result['mean'] - baseline['mean']:>13.3f}" if baseline else f"{'-':>13}"
+        print(f"{name:<8}{result['mean']:>10.3f}{result['p50']:>10.3f}{result['p95']:>10.3f}{overhead}{result['log_lines']:>11}")
+
+
+if __name__ == "__main__":
+    main()
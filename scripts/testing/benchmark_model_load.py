@@ -0,0 +1,136 @@
+"""
+⏱️ Startup benchmark: pickle model files vs artifact ringkas
+
+Membandingkan waktu muat dingin (cold) dan ukuran file antara:
+- pickle: 5 file joblib (AdaBoost 50 SVC + encoder + kategori) seperti
+  sebelum ada artifact (INFERENCE_ENGINE=sklearn, MODEL_MMAP=false)
+- artifact: satu file model.alsc (engine linear, memmap, checksum)
+
+Versi model aktif disalin ke registry sementara (artifact dibuat jika belum
+ada), lalu setiap percobaan dijalankan di proses Python baru setelah cache
+halaman file model dibuang (posix_fadvise DONTNEED), jadi angka yang
+diukur adalah waktu startup dari disk.
+
+Usage (dari root project):
+    python scripts/testing/benchmark_model_load.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+PICKLE_FILES = [
+    "svm_adaboost_model.pkl", "label_encoder.pkl", "feature_names.pkl",
+    "training_categories.pkl", "feature_encoder.pkl"
+]
+
+# Dijalankan di proses anak: import dulu, lalu ukur load_saved_model() saja
+CHILD = """
+import json, os, time
+t0 = time.perf_counter()
+from app.models.inference.predictor import AllergenPredictor
+predictor = AllergenPredictor()
+t1 = time.perf_counter()
+ok = predictor.load_saved_model()
+t2 = time.perf_counter()
+print(json.dumps({"ok": ok, "engine": predictor.active_engine, "import_s": t1 - t0, "load_s": t2 - t1,
+                  "fingerprint": predictor.model_fingerprint}))
+"""
+
+MODES = {
+    "pickle": {"INFERENCE_ENGINE": "sklearn", "MODEL_MMAP": "false"},
+    "artifact": {"INFERENCE_ENGINE": "linear", "MODEL_MMAP": "true"},
+}
+
+
+def prepare_registry(tmp_dir):
+    """Salin versi aktif ke registry sementara dan pastikan artifact ada"""
+    from app.core.config import settings
+    from app.models.registry import ModelRegistry
+    from app.models.inference.artifact import ARTIFACT_FILE, write_artifact
+    from app.models.inference.predictor import AllergenPredictor
+
+    source = ModelRegistry(settings.model_dir).resolve()
+    if source is None:
+        raise SystemExit("Belum ada model tersimpan; jalankan backend sekali untuk melatih model")
+
+    registry = ModelRegistry(tmp_dir)
+    version = registry.save_version(
+        lambda target: [shutil.copy2(path, target) for path in source.iterdir() if path.is_file()],
+        tag="bench"
+    )
+    version_dir = registry.version_path(version)
+
+    if not (version_dir / ARTIFACT_FILE).exists():
+        # Model lama tanpa artifact: bangun dari pickle sekali
+        builder = AllergenPredictor()
+        builder.inference_engine = "sklearn"
+        builder.registry = registry
+        if not builder.load_saved_model() or builder.snapshot.linear_engine is None:
+            raise SystemExit("Model tidak punya engine linear, artifact tidak bisa dibuat")
+        write_artifact(builder.snapshot, version_dir / ARTIFACT_FILE)
+    return version_dir
+
+
+def drop_page_cache(directory):
+    for path in directory.iterdir():
+        with open(path, "rb") as f:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def run_once(mode, model_dir, version_dir):
+    drop_page_cache(version_dir)
+    env = dict(os.environ, MODEL_DIR=str(model_dir), PYTHONPATH=str(BACKEND_DIR), **MODES[mode])
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Jumlah percobaan per mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="allerscan-bench-") as tmp:
+        model_dir = Path(tmp)
+        version_dir = prepare_registry(model_dir)
+
+        from app.models.inference.artifact import ARTIFACT_FILE
+        sizes = {
+            "pickle": sum((version_dir / name).stat().st_size for name in PICKLE_FILES),
+            "artifact": (version_dir / ARTIFACT_FILE).stat().st_size,
+        }
+
+        results = {}
+        for mode in MODES:
+            runs = [run_once(mode, model_dir, version_dir) for _ in range(args.runs)]
+            if not all(run["ok"] for run in runs):
+                raise SystemExit(f"Mode {mode}: model gagal dimuat")
+            results[mode] = runs
+
+    print(f"{'mode':<10}{'engine':<9}{'size':>12}{'load median':>14}{'load min':>11}{'import':>10}")
+    for mode, runs in results.items():
+        loads = [run["load_s"] * 1000 for run in runs]
+        imports = statistics.median(run["import_s"] for run in runs)
+        print(f"{mode:<10}{runs[0]['engine']:<9}{sizes[mode] / 1024:>9.1f} KiB"
+              f"{statistics.median(loads):>11.1f} ms{min(loads):>8.1f} ms{imports:>8.2f} s")
+
+    fingerprints = {runs[0]["fingerprint"] for runs in results.values()}
+    speedup = statistics.median(r["load_s"] for r in results["pickle"]) / statistics.median(r["load_s"] for r in results["artifact"])
+    print(f"\nLoad {speedup:.1f}x lebih cepat, file {sizes['pickle'] / sizes['artifact']:.1f}x lebih kecil; "
+          f"fingerprint model {'identik' if len(fingerprints) == 1 else 'BERBEDA'}")
+
+
+if __name__ == "__main__":
+    main()
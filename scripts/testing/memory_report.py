@@ -0,0 +1,166 @@
+"""
+🧠 Gunicorn worker memory report (RSS / PSS)
+
+Menjalankan backend dengan gunicorn dua kali — tanpa preload (setiap worker
+memuat model sendiri, MODEL_MMAP=false) dan dengan preload + memmap
+(gunicorn.conf.py default) — lalu membaca /proc/<pid>/smaps_rollup untuk
+master dan setiap worker setelah beberapa request /predict.
+
+RSS menghitung halaman yang dibagi secara penuh di setiap proses; PSS
+membagi halaman bersama dengan jumlah proses yang memakainya, jadi total PSS
+adalah memori fisik sebenarnya.
+
+Usage (dari root project, Linux):
+    python scripts/testing/memory_report.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+MODES = [
+    ("before", {"GUNICORN_PRELOAD": "0", "MODEL_MMAP": "false"}),
+    ("after", {"GUNICORN_PRELOAD": "1", "MODEL_MMAP": "true"}),
+]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_rollup(pid):
+    """RSS, PSS, shared dan private (KiB) dari smaps_rollup"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def worker_pids(master_pid):
+    """PID worker gunicorn (anak master dengan cmdline yang sama)"""
+    with open(f"/proc/{master_pid}/cmdline", "rb") as f:
+        master_cmd = f.read()
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmd = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == master_pid and cmd == master_cmd:
+            pids.append(int(entry))
+    return sorted(pids)
+
+
+def http(method, url, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def wait_ready(base_url, workers, process, timeout):
+    """Tunggu sampai semua worker hidup dan model sudah dimuat"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn berhenti dengan exit code {process.returncode}")
+        try:
+            if len(worker_pids(process.pid)) >= workers and http("GET", f"{base_url}/api/v1/health").get("model_loaded"):
+                return
+        except OSError:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"Backend tidak siap dalam {timeout}s")
+
+
+def measure(mode, overrides, args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, GUNICORN_BIND=f"127.0.0.1:{port}", GUNICORN_WORKERS=str(args.workers), **overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(base_url, args.workers, process, args.timeout)
+        # Sentuh jalur inferensi di setiap worker agar halaman model ikut terhitung
+        for i in range(args.requests):
+            http("POST", f"{base_url}/api/v1/predict/", {
+                "nama_produk_makanan": f"Produk Memori {i}",
+                "bahan_utama": "Tepung terigu, telur, susu",
+                "pemanis": "Gula",
+                "lemak_minyak": "Mentega",
+                "penyedap_rasa": "Vanili",
+            })
+        time.sleep(1)
+        return {
+            "master": read_rollup(process.pid),
+            "workers": [(pid, read_rollup(pid)) for pid in worker_pids(process.pid)],
+        }
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def mib(kib):
+    return f"{kib / 1024:8.1f}"
+
+
+def print_report(mode, overrides, report):
+    flags = ", ".join(f"{k}={v}" for k, v in overrides.items())
+    print(f"\n== {mode} ({flags})")
+    print(f"{'process':<16}{'RSS MiB':>9}{'PSS MiB':>9}{'shared':>9}{'private':>9}")
+    rows = [("master", report["master"])] + [(f"worker {pid}", usage) for pid, usage in report["workers"]]
+    for name, usage in rows:
+        print(f"{name:<16}{mib(usage['rss'])} {mib(usage['pss'])} {mib(usage['shared'])} {mib(usage['private'])}")
+    total_rss = sum(usage["rss"] for _, usage in rows)
+    total_pss = sum(usage["pss"] for _, usage in rows)
+    print(f"{'total':<16}{mib(total_rss)} {mib(total_pss)}")
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="Jumlah worker gunicorn")
+    parser.add_argument("--requests", type=int, default=20, help="Request /predict sebelum pengukuran")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Detik menunggu backend siap")
+    args = parser.parse_args()
+
+    totals = {}
+    for mode, overrides in MODES:
+        totals[mode] = print_report(mode, overrides, measure(mode, overrides, args))
+
+    saved = totals["before"] - totals["after"]
+    print(f"\nTotal PSS: {mib(totals['before']).strip()} → {mib(totals['after']).strip()} MiB "
+          f"({saved / 1024:.1f} MiB lebih hemat dengan {args.workers} worker)")
+
+
+if __name__ == "__main__":
+    main()
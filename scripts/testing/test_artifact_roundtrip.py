@@ -0,0 +1,97 @@
+"""
+📦 Round-trip artifact model ringkas
+
+Menulis snapshot model aktif sebagai artifact ringkas (model.alsc) ke folder
+sementara, membacanya kembali, lalu membandingkan:
+
+- array engine linear, nama fitur, label kelas dan fingerprint
+- kategori training untuk deteksi OOV: sel kosong (NaN / None) ikut
+  disisipkan ke snapshot sebelum ditulis dan tidak boleh muncul kembali
+  sebagai kategori (misalnya string "nan")
+- predict_proba engine hasil baca vs engine asli pada seluruh baris
+  dataset training
+
+Usage (dari root project):
+    python scripts/testing/test_artifact_roundtrip.py
+
+Exit code 1 jika ada yang berbeda.
+"""
+
+import argparse
+import dataclasses
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Array engine yang disimpan di bagian data artifact
+ENGINE_ARRAYS = ("coef", "intercept", "prob_a", "prob_b", "estimator_weights", "classes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--atol", type=float, default=1e-12, help="Toleransi selisih predict_proba")
+    args = parser.parse_args()
+
+    from app.models.inference.artifact import read_artifact, write_artifact
+    from app.models.inference.predictor import AllergenPredictor
+    from app.models.training.dataset import training_dataset
+
+    predictor = AllergenPredictor()
+    predictor.inference_engine = "sklearn"
+    if not predictor.load_saved_model() or predictor.snapshot.linear_engine is None:
+        raise SystemExit("Belum ada model tersimpan dengan engine linear; jalankan backend sekali")
+    snapshot = predictor.snapshot
+
+    # Sel kosong seperti hasil df[col].unique() pada kolom yang punya NaN
+    expected_categories = {
+        field: {str(value) for value in values if value is not None and value == value}
+        for field, values in snapshot.training_categories.items()
+    }
+    with_nulls = {field: set(values) | {float("nan"), None} for field, values in snapshot.training_categories.items()}
+    snapshot = dataclasses.replace(snapshot, training_categories=with_nulls)
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="allerscan-artifact-") as tmp:
+        path = Path(tmp) / "model.alsc"
+        size = write_artifact(snapshot, path)
+        loaded = read_artifact(path, mmap=False)
+        print(f"Artifact {size / 1024:.1f} KiB, {loaded.n_features} fitur, {len(loaded.training_categories)} field kategori")
+
+        for name in ENGINE_ARRAYS:
+            if not np.array_equal(getattr(snapshot.linear_engine, name), getattr(loaded.linear_engine, name)):
+                failures.append(f"array engine {name} berbeda")
+        if list(snapshot.feature_names) != list(loaded.feature_names):
+            failures.append("nama fitur berbeda")
+        if [str(c) for c in snapshot.label_encoder.classes_] != list(loaded.label_encoder.classes_):
+            failures.append("label kelas berbeda")
+        if snapshot.fingerprint != loaded.fingerprint:
+            failures.append("fingerprint berbeda")
+
+        for field, values in loaded.training_categories.items():
+            if set(values) != expected_categories.get(field):
+                failures.append(f"kategori training {field} berbeda")
+            if "nan" in values or "None" in values:
+                failures.append(f"sel kosong tersimpan sebagai kategori di {field}")
+
+        df = training_dataset.load()
+        rows = df[snapshot.feature_encoder.fields].astype(str).to_dict("records")
+        X = snapshot.feature_encoder.transform(rows)
+        diff = float(np.abs(snapshot.linear_engine.predict_proba(X) - loaded.linear_engine.predict_proba(X)).max())
+        print(f"predict_proba pada {len(rows)} baris training: selisih maks={diff:.2e}")
+        if diff > args.atol:
+            failures.append(f"predict_proba berbeda (selisih maks {diff:.2e})")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ Artifact identik setelah round-trip, sel kosong tidak menjadi kategori")
+
+
+if __name__ == "__main__":
+    main()
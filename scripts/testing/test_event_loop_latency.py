@@ -0,0 +1,140 @@
+"""
+⏱️ Event loop responsiveness check
+
+Mengukur latency GET /api/v1/health saat idle, lalu sekali lagi ketika
+/predict dan /dataset/export/excel dibanjiri request secara bersamaan.
+Request dijalankan in-process di satu event loop (httpx ASGI transport),
+sehingga setiap pemanggilan blocking di route langsung terlihat sebagai
+lonjakan latency /health.
+
+Usage (dari root project):
+    python scripts/testing/test_event_loop_latency.py --duration 10 --concurrency 16
+
+Exit code 1 jika p95 /health saat beban melebihi batas yang ditentukan.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def percentile(samples, pct):
+    """Percentile sederhana (nearest-rank) dalam milidetik"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    print(
+        f"{label:<14} n={len(samples):<5} "
+        f"p50={percentile(samples, 50):7.2f}ms  "
+        f"p95={percentile(samples, 95):7.2f}ms  "
+        f"max={max(samples):7.2f}ms  "
+        f"mean={statistics.mean(samples):7.2f}ms"
+    )
+
+
+async def sample_health(client, duration, interval=0.02):
+    """Kirim /health berurutan selama `duration` detik, kembalikan latency (ms)"""
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/v1/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def hammer_predict(client, stop, counter):
+    """Request /predict terus-menerus dengan input unik agar tidak kena cache"""
+    while not stop.is_set():
+        payload = {
+            "nama_produk_makanan": f"Produk Uji {uuid.uuid4().hex[:8]}",
+            "bahan_utama": "Tepung terigu, telur, susu",
+            "pemanis": "Gula",
+            "lemak_minyak": "Mentega",
+            "penyedap_rasa": "Vanili",
+        }
+        await client.post("/api/v1/predict/", json=payload)
+        counter["predict"] += 1
+
+
+async def hammer_export(client, stop, counter, token):
+    """Request /dataset/export/excel terus-menerus"""
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        await client.get("/api/v1/dataset/export/excel?limit=1000", headers=headers)
+        counter["export"] += 1
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+    from app.core.config import settings
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://test", timeout=None) as client:
+            login = await client.post(
+                "/api/v1/auth/login",
+                json={"username": settings.admin_username, "password": args.admin_password}
+            )
+            login.raise_for_status()
+            token = login.json()["access_token"]
+
+            # Pemanasan agar import/lazy init tidak ikut terukur
+            await client.get("/api/v1/health")
+
+            baseline = await sample_health(client, args.baseline)
+
+            stop = asyncio.Event()
+            counter = {"predict": 0, "export": 0}
+            workers = [
+                asyncio.create_task(hammer_predict(client, stop, counter))
+                for _ in range(args.concurrency)
+            ] + [
+                asyncio.create_task(hammer_export(client, stop, counter, token))
+                for _ in range(max(1, args.concurrency // 4))
+            ]
+            await asyncio.sleep(0.5)
+            loaded = await sample_health(client, args.duration)
+            stop.set()
+            await asyncio.gather(*workers)
+
+    print(f"Load: {counter['predict']} /predict, {counter['export']} /dataset/export/excel "
+          f"in {args.duration:.0f}s (concurrency {args.concurrency})")
+    summarize("health idle", baseline)
+    summarize("health loaded", loaded)
+
+    limit = max(args.max_p95_ms, percentile(baseline, 95) * args.max_ratio)
+    loaded_p95 = percentile(loaded, 95)
+    if loaded_p95 > limit:
+        print(f"❌ /health p95 under load {loaded_p95:.2f}ms exceeds {limit:.2f}ms")
+        return 1
+    print(f"✅ /health p95 under load {loaded_p95:.2f}ms within {limit:.2f}ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Detik pengukuran saat beban")
+    parser.add_argument("--baseline", type=float, default=3.0, help="Detik pengukuran saat idle")
+    parser.add_argument("--concurrency", type=int, default=16, help="Jumlah client /predict paralel")
+    parser.add_argument("--max-p95-ms", type=float, default=50.0, help="Batas absolut p95 /health saat beban")
+    parser.add_argument("--max-ratio", type=float, default=5.0, help="Batas p95 relatif terhadap idle")
+    parser.add_argument("--admin-password", default="admin123", help="Password admin untuk endpoint export")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
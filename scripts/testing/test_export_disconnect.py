@@ -0,0 +1,142 @@
+"""
+🔌 Export disconnect check
+
+Memastikan /dataset/export menutup server-side cursor dan mengembalikan
+koneksinya ke pool ketika client memutus koneksi di tengah stream, juga
+saat next() generator masih berjalan di DB executor.
+
+Tabel dataset_results sintetis dibuat di file SQLite sementara (lihat
+benchmark_export.py). Setiap chunk setelah chunk pertama diperlambat agar
+disconnect selalu jatuh saat langkah generator sedang berjalan. Request
+dikirim langsung ke aplikasi ASGI; receive() mengirim http.disconnect
+setelah chunk body pertama diterima.
+
+Usage (dari root project):
+    python scripts/testing/test_export_disconnect.py --rows 5000 --step-delay 0.3
+
+Exit code 1 jika generator tidak ditutup atau koneksi pool tidak kembali.
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def slow_export(iter_stream_export, step_delay, state):
+    """Bungkus iter_stream_export: chunk kedua dst. tertunda di thread executor"""
+    def wrapper(*args, **kwargs):
+        chunks = iter_stream_export(*args, **kwargs)
+        try:
+            for index, chunk in enumerate(chunks):
+                if index:
+                    state["in_flight"].set()
+                    time.sleep(step_delay)
+                yield chunk
+        finally:
+            chunks.close()
+            state["closed"] = True
+    return wrapper
+
+
+async def export_then_disconnect(app, token, state):
+    """GET /dataset/export lewat ASGI mentah, putus setelah chunk pertama"""
+    first_body = asyncio.Event()
+    requested = False
+    messages = []
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await first_body.wait()
+        # Tunggu sampai langkah berikutnya benar-benar berjalan di executor
+        while not state["in_flight"].is_set():
+            await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            first_body.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/api/v1/dataset/export",
+        "raw_path": b"/api/v1/dataset/export", "query_string": b"format=csv",
+        "root_path": "", "server": ("test", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"test"), (b"authorization", f"Bearer {token}".encode())]
+    }
+    await app(scope, receive, send)
+    status = next(m["status"] for m in messages if m["type"] == "http.response.start")
+    return status, sum(len(m.get("body", b"")) for m in messages if m["type"] == "http.response.body")
+
+
+async def run(args, sqlite_path):
+    import httpx
+    from sqlalchemy import create_engine
+    from app.api.v1.routes import dataset_clean
+    from app.core.config import settings
+    from app.database.allergen_database import database_manager
+    from app.main import app
+
+    database_manager.engine = create_engine(
+        f"sqlite:///{sqlite_path}", connect_args={"detect_types": sqlite3.PARSE_DECLTYPES}
+    )
+    database_manager.db_available = True
+    settings.export_chunk_size = args.chunk_size
+
+    state = {"in_flight": threading.Event(), "closed": False}
+    dataset_clean.iter_stream_export = slow_export(dataset_clean.iter_stream_export, args.step_delay, state)
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+            login = await client.post(
+                "/api/v1/auth/login",
+                json={"username": settings.admin_username, "password": args.admin_password}
+            )
+            login.raise_for_status()
+            token = login.json()["access_token"]
+
+        status, sent = await export_then_disconnect(app, token, state)
+
+        # Cleanup harus selesai sebelum response selesai, bukan saat garbage collection
+        pool = database_manager.engine.pool
+        closed, checked_out = state["closed"], pool.checkedout()
+
+    print(f"HTTP {status}, {sent} byte terkirim sebelum disconnect")
+    print(f"generator ditutup: {closed}, koneksi pool checked out: {checked_out}")
+    if status != 200 or not closed or checked_out:
+        print("❌ Cursor export tidak ditutup setelah client disconnect")
+        return 1
+    print("✅ Cursor export ditutup dan koneksi kembali ke pool setelah client disconnect")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Jumlah baris sintetis")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Baris per chunk export")
+    parser.add_argument("--step-delay", type=float, default=0.3, help="Detik tunda setiap chunk setelah yang pertama")
+    parser.add_argument("--admin-password", default="admin123", help="Password admin untuk endpoint export")
+    args = parser.parse_args()
+
+    from benchmark_export import create_synthetic
+
+    with tempfile.TemporaryDirectory(prefix="allerscan-disconnect-") as tmp:
+        sqlite_path = str(Path(tmp) / "dataset_results.db")
+        create_synthetic(sqlite_path, args.rows)
+        sys.exit(asyncio.run(run(args, sqlite_path)))
+
+
+if __name__ == "__main__":
+    main()
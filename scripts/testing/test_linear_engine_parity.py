@@ -0,0 +1,90 @@
+"""
+⚖️ Paritas engine linear vs scikit-learn
+
+Memuat model aktif dari registry (file pickle AdaBoost + SVC linear), lalu
+menskor seluruh baris dataset training (ditambah riwayat prediksi database
+dengan --include-history, seperti data retrain) dengan:
+
+- model sklearn: AdaBoostClassifier.predict_proba (input dense)
+- engine linear hasil ekspor ulang: LinearEnsembleEngine.from_adaboost(model)
+- engine linear yang tersimpan bersama versi model (linear_engine.npz /
+  artifact), jika ada
+
+Probabilitas setiap engine linear harus sama dengan sklearn dalam toleransi
+dan kelas prediksinya harus identik. Ini menjaga skala keputusan SAMME yang
+dikalibrasi secara empiris dari regresi (versi scikit-learn berubah, rumus
+kombinasi estimator diubah, dsb.).
+
+Usage (dari root project):
+    python scripts/testing/test_linear_engine_parity.py --atol 1e-6
+    python scripts/testing/test_linear_engine_parity.py --include-history
+
+Exit code 1 jika ada baris yang melewati toleransi.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def check(label, engine, X, expected_proba, expected_pred, atol):
+    """Bandingkan satu engine linear dengan output sklearn, kembalikan True jika lolos"""
+    proba = engine.predict_proba(X)
+    diff = np.abs(proba - expected_proba).max(axis=1)
+    mismatched = int((diff > atol).sum())
+    label_mismatch = int((engine.predict(X) != expected_pred).sum())
+    print(f"{label:<18} selisih maks={diff.max():.2e}  baris > atol={mismatched}  kelas beda={label_mismatch}")
+    return mismatched == 0 and label_mismatch == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--atol", type=float, default=1e-6, help="Toleransi selisih absolut predict_proba")
+    parser.add_argument("--version", default=None, help="Versi model di registry (default: versi aktif)")
+    parser.add_argument("--include-history", action="store_true", help="Tambahkan riwayat prediksi dari database")
+    args = parser.parse_args()
+
+    from app.models.inference.linear_engine import LinearEnsembleEngine
+    from app.models.inference.predictor import AllergenPredictor
+    from app.models.training.dataset import prediction_rows, prediction_rows_to_training, training_dataset
+
+    # Engine sklearn memaksa file pickle dimuat, bukan artifact ringkas
+    predictor = AllergenPredictor()
+    predictor.inference_engine = "sklearn"
+    if not predictor.load_saved_model(args.version):
+        raise SystemExit("Belum ada model tersimpan; jalankan backend sekali untuk melatih model")
+    snapshot = predictor.snapshot
+
+    df = training_dataset.load()
+    if args.include_history:
+        history, _ = prediction_rows.sync()
+        df = pd.concat([df, prediction_rows_to_training(history)], ignore_index=True)
+    rows = df[snapshot.feature_encoder.fields].astype(str).to_dict("records")
+    X_dense = snapshot.feature_encoder.transform(rows, dense=True)
+    X_sparse = snapshot.feature_encoder.transform(rows)
+
+    expected_proba = snapshot.model.predict_proba(X_dense)
+    expected_pred = snapshot.model.predict(X_dense)
+    print(f"Model versi {snapshot.version}: {len(rows)} baris, {snapshot.feature_encoder.n_features} fitur")
+
+    engines = [("ekspor ulang", LinearEnsembleEngine.from_adaboost(snapshot.model))]
+    if snapshot.linear_engine is not None:
+        engines.append(("tersimpan", snapshot.linear_engine))
+    else:
+        print("ℹ️ Versi model ini tidak menyimpan engine linear")
+
+    ok = all([check(label, engine, X_sparse, expected_proba, expected_pred, args.atol) for label, engine in engines])
+    if not ok:
+        print(f"❌ Engine linear tidak identik dengan predict_proba sklearn (atol={args.atol:g})")
+        sys.exit(1)
+    print(f"✅ Engine linear identik dengan predict_proba sklearn pada semua baris (atol={args.atol:g})")
+
+
+if __name__ == "__main__":
+    main()